@@ -1,10 +1,11 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import cameras, persons, auth, alerts_ws, events, rules, alerts
+from app.api.api_v1.endpoints import cameras, persons, auth, alerts_ws, events, rules, alerts, zones
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(cameras.router, prefix="/cameras", tags=["cameras"])
+api_router.include_router(zones.router, prefix="/zones", tags=["zones"])
 api_router.include_router(persons.router, prefix="/persons", tags=["persons"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(rules.router, prefix="/rules", tags=["rules"])
@@ -73,6 +73,37 @@ async def create_event(
     return event
 
 
+@router.post("/bulk", response_model=event_schema.EventBulkResult)
+async def create_events_bulk(
+    bulk_in: event_schema.EventBulkCreate,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Create many detection events in one transaction.
+    Called by the vision service's batching reporter.
+    No auth required so the vision service can call it freely.
+    """
+    events = [
+        EventModel(
+            camera_id=event_in.camera_id,
+            type=event_in.type,
+            event_metadata=event_in.event_metadata,
+            snapshot_path=event_in.snapshot_path,
+        )
+        for event_in in bulk_in.events
+    ]
+    db.add_all(events)
+    await db.commit()
+
+    # Load active rules once for the whole batch
+    result = await db.execute(select(RuleModel).where(RuleModel.is_active == True))
+    rules = result.scalars().all()
+    for event in events:
+        await _check_rules_and_alert(db, event, rules)
+
+    return event_schema.EventBulkResult(created=len(events))
+
+
 @router.get("/{event_id}", response_model=event_schema.Event)
 async def get_event(
     event_id: int,
@@ -87,13 +118,19 @@ async def get_event(
     return event
 
 
-async def _check_rules_and_alert(db: AsyncSession, event: EventModel) -> None:
+async def _check_rules_and_alert(
+    db: AsyncSession,
+    event: EventModel,
+    rules: Optional[List[RuleModel]] = None,
+) -> None:
     """
     Check all active rules against the new event.
     If a rule matches, create an Alert and broadcast it via WebSocket.
+    Pass `rules` to reuse already loaded active rules.
     """
-    result = await db.execute(select(RuleModel).where(RuleModel.is_active == True))
-    rules = result.scalars().all()
+    if rules is None:
+        result = await db.execute(select(RuleModel).where(RuleModel.is_active == True))
+        rules = result.scalars().all()
 
     for rule in rules:
         conditions = rule.conditions or {}
@@ -0,0 +1,99 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.api.dependencies import require_role
+from app.db.session import get_db
+from app.models.camera import Camera as CameraModel
+from app.models.zone import Zone as ZoneModel
+from app.models.user import User
+from app.schemas import zone as zone_schema
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[zone_schema.Zone])
+async def list_zones(
+    camera_id: Optional[int] = Query(None, description="Filter by camera"),
+    active: Optional[bool] = Query(None, description="Filter by active state"),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    List zones, optionally for one camera.
+    No auth required so the vision service can fetch zone polygons.
+    """
+    query = select(ZoneModel)
+    if camera_id is not None:
+        query = query.where(ZoneModel.camera_id == camera_id)
+    if active is not None:
+        query = query.where(ZoneModel.is_active == active)
+
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.post("/", response_model=zone_schema.Zone)
+async def create_zone(
+    zone_in: zone_schema.ZoneCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "operator")),
+) -> Any:
+    """Create a zone on a camera."""
+    result = await db.execute(select(CameraModel).where(CameraModel.id == zone_in.camera_id))
+    if not result.scalars().first():
+        raise HTTPException(status_code=404, detail="Camera not found")
+    if len(zone_in.polygon) < 3 or any(len(point) != 2 for point in zone_in.polygon):
+        raise HTTPException(status_code=400, detail="Polygon needs at least 3 [x, y] points")
+
+    zone = ZoneModel(
+        camera_id=zone_in.camera_id,
+        name=zone_in.name,
+        type=zone_in.type,
+        polygon=zone_in.polygon,
+        is_active=zone_in.is_active,
+    )
+    db.add(zone)
+    await db.commit()
+    await db.refresh(zone)
+    return zone
+
+
+@router.put("/{zone_id}", response_model=zone_schema.Zone)
+async def update_zone(
+    zone_id: int,
+    zone_in: zone_schema.ZoneUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "operator")),
+) -> Any:
+    """Update a zone."""
+    result = await db.execute(select(ZoneModel).where(ZoneModel.id == zone_id))
+    zone = result.scalars().first()
+    if not zone:
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    update_data = zone_in.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(zone, field, value)
+
+    db.add(zone)
+    await db.commit()
+    await db.refresh(zone)
+    return zone
+
+
+@router.delete("/{zone_id}", response_model=zone_schema.Zone)
+async def delete_zone(
+    zone_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("admin")),
+) -> Any:
+    """Delete a zone. Admin only."""
+    result = await db.execute(select(ZoneModel).where(ZoneModel.id == zone_id))
+    zone = result.scalars().first()
+    if not zone:
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    await db.delete(zone)
+    await db.commit()
+    return zone
@@ -10,7 +10,7 @@ class Event(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     camera_id: Mapped[int] = mapped_column(ForeignKey("cameras.id"))
-    type: Mapped[str]  # person_detected, unknown_face, weapon_detected
+    type: Mapped[str]  # person_detected, unknown_face, person_left, weapon_detected
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     event_metadata: Mapped[dict] = mapped_column("metadata", JSON, default=dict)
     snapshot_path: Mapped[Optional[str]] = mapped_column(String, nullable=True, default=None)
@@ -1,4 +1,5 @@
 from .camera import Camera, CameraCreate, CameraUpdate
+from .zone import Zone, ZoneCreate, ZoneUpdate
 from .person import Person, PersonCreate, PersonUpdate
 from .user import User, UserCreate, UserUpdate, UserInDB
 from .auth import (
@@ -6,6 +7,6 @@ from .auth import (
     UserLogin, UserRegister,
     PasswordResetRequest, PasswordReset
 )
-from .event import Event, EventCreate, EventList
+from .event import Event, EventCreate, EventList, EventBulkCreate, EventBulkResult
 from .rule import Rule, RuleCreate, RuleUpdate
 from .alert import AlertOut, AlertUpdate
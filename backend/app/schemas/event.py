@@ -6,11 +6,21 @@ from datetime import datetime
 class EventCreate(BaseModel):
     """Sent by the vision service when a detection occurs."""
     camera_id: int
-    type: str  # person_detected, unknown_face, weapon_detected
+    type: str  # person_detected, unknown_face, person_left, weapon_detected
     event_metadata: dict[str, Any] = {}
     snapshot_path: Optional[str] = None
 
 
+class EventBulkCreate(BaseModel):
+    """Batch of detections flushed by the vision service."""
+    events: list[EventCreate]
+
+
+class EventBulkResult(BaseModel):
+    """Outcome of a bulk insert."""
+    created: int
+
+
 class Event(BaseModel):
     """Returned to clients."""
     id: int
@@ -0,0 +1,34 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class ZoneCreate(BaseModel):
+    """Create a monitoring zone on a camera."""
+    camera_id: int
+    name: str
+    type: str = "restricted"  # restricted, safe, monitoring
+    # [[x, y], ...]. If every coordinate is in [0, 1] the polygon is read as
+    # fractions of the frame size, otherwise as pixels of the camera frame
+    polygon: list[list[float]]
+    is_active: bool = True
+
+
+class ZoneUpdate(BaseModel):
+    """Update an existing zone."""
+    name: Optional[str] = None
+    type: Optional[str] = None
+    polygon: Optional[list[list[float]]] = None
+    is_active: Optional[bool] = None
+
+
+class Zone(BaseModel):
+    """Returned to clients."""
+    id: int
+    camera_id: int
+    name: str
+    type: str
+    polygon: list[list[float]]
+    is_active: bool
+
+    class Config:
+        from_attributes = True
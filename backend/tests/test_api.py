@@ -71,3 +71,102 @@ async def test_create_person(async_client: AsyncClient, auth_token: str):
     data = response.json()
     assert data["name"] == "API Test Person"
     assert data["type"] == "vip" 
+
+
+@pytest.mark.asyncio
+async def test_zones_for_camera(async_client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    camera = await async_client.post(
+        "/api/v1/cameras/",
+        headers=headers,
+        json={"name": "Zone Camera", "rtsp_url": "rtsp://zone", "location": "Lobby"}
+    )
+    camera_id = camera.json()["id"]
+
+    response = await async_client.post(
+        "/api/v1/zones/",
+        headers=headers,
+        json={
+            "camera_id": camera_id,
+            "name": "Door",
+            "type": "monitoring",
+            "polygon": [[0, 0], [100, 0], [100, 100], [0, 100]]
+        }
+    )
+    assert response.status_code == 200
+    zone_id = response.json()["id"]
+
+    await async_client.post(
+        "/api/v1/zones/",
+        headers=headers,
+        json={
+            "camera_id": camera_id,
+            "name": "Disabled",
+            "polygon": [[0, 0], [1, 0], [1, 1]],
+            "is_active": False
+        }
+    )
+
+    # Listing needs no token so the vision service can read zones
+    response = await async_client.get(f"/api/v1/zones/?camera_id={camera_id}&active=true")
+    assert response.status_code == 200
+    zones = response.json()
+    assert [zone["id"] for zone in zones] == [zone_id]
+    assert zones[0]["polygon"] == [[0, 0], [100, 0], [100, 100], [0, 100]]
+
+
+@pytest.mark.asyncio
+async def test_create_zone_rejects_invalid_polygon(async_client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    camera = await async_client.post(
+        "/api/v1/cameras/",
+        headers=headers,
+        json={"name": "Polygon Camera", "rtsp_url": "rtsp://poly", "location": "Hall"}
+    )
+
+    response = await async_client.post(
+        "/api/v1/zones/",
+        headers=headers,
+        json={"camera_id": camera.json()["id"], "name": "Line", "polygon": [[0, 0], [1, 1]]}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_create_events_bulk(async_client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    camera = await async_client.post(
+        "/api/v1/cameras/",
+        headers=headers,
+        json={"name": "Bulk Camera", "rtsp_url": "rtsp://bulk", "location": "Gate"}
+    )
+    camera_id = camera.json()["id"]
+    await async_client.post(
+        "/api/v1/rules/",
+        headers=headers,
+        json={
+            "name": "Unknown faces",
+            "conditions": {"event_type": "unknown_face"},
+            "action": {"alert_type": "intrusion", "priority": "critical"}
+        }
+    )
+
+    response = await async_client.post(
+        "/api/v1/events/bulk",
+        json={"events": [
+            {"camera_id": camera_id, "type": "person_detected", "event_metadata": {"person_name": "A"}},
+            {"camera_id": camera_id, "type": "unknown_face"},
+            {"camera_id": camera_id, "type": "unknown_face"},
+        ]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"created": 3}
+
+    events = await async_client.get(f"/api/v1/events/?camera_id={camera_id}", headers=headers)
+    assert events.json()["total"] == 3
+
+    # Only the two unknown faces match the rule
+    event_ids = {event["id"] for event in events.json()["items"]}
+    alerts = await async_client.get("/api/v1/alerts/", headers=headers)
+    raised = [alert for alert in alerts.json() if alert["event_id"] in event_ids]
+    assert len(raised) == 2
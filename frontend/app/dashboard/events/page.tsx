@@ -46,6 +46,7 @@ const EVENT_ICON: Record<string, string> = {
   unknown_face: "❓",
   weapon_detected: "⚠️",
   face_detected: "👁️",
+  person_left: "🚶",
 };
 
 function formatTime(ts: string) {
@@ -0,0 +1,146 @@
+"""
+Async serving mode for the relay.
+
+Same endpoints as the Flask app in main.py, but every MJPEG viewer is a
+coroutine awaiting its session's next frame instead of an OS thread blocked
+in _frame_generator. Capture, reaping and analysis still run in main.py's
+capture threads; they wake the event loop through CameraSession.frame_listeners.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    RELAY_SERVER=asgi python main.py
+"""
+import asyncio
+from typing import Dict, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+
+import main
+
+
+app = FastAPI(title="SafeSight Camera Relay")
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+
+class FrameSignal:
+    """Wakes every coroutine waiting on a session when its capture thread stores a frame."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def notify_threadsafe(self) -> None:
+        self._loop.call_soon_threadsafe(self._publish)
+
+    def _publish(self) -> None:
+        # Swap in a fresh event so waiters that arrive later block until the next frame
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+SIGNALS: Dict[int, FrameSignal] = {}
+
+
+def _signal_for(session: main.CameraSession) -> FrameSignal:
+    signal = SIGNALS.get(session.camera_id)
+    if signal is None:
+        signal = SIGNALS[session.camera_id] = FrameSignal(asyncio.get_running_loop())
+        with session.lock:
+            session.frame_listeners.append(signal.notify_threadsafe)
+    return signal
+
+
+async def _variant_chunk(variant: main.FeedVariant, seq: int, image: np.ndarray) -> Optional[bytes]:
+    if variant.seq == seq:
+        # Already encoded by another subscriber
+        return variant.chunk
+    # Resizing and encoding are CPU work, so they run in a thread; subscribers
+    # that wake for the same frame await that one encode instead of each
+    # hopping to a thread just to find the result cached. The future lives on
+    # the variant, so it goes away with the variant's last subscriber
+    pending = variant.pending
+    if pending is None or pending[0] != seq:
+        pending = variant.pending = (seq, asyncio.ensure_future(asyncio.to_thread(variant.chunk_for, seq, image)))
+    # A viewer disconnecting must not cancel the encode the others are waiting on
+    return await asyncio.shield(pending[1])
+
+
+async def _frame_stream(session: main.CameraSession, variant: Optional[main.FeedVariant]):
+    signal = _signal_for(session)
+    variant = main._add_viewer(session, variant)
+    seen_seq = 0
+    try:
+        while True:
+            with session.lock:
+                fresh = session.frame_seq > seen_seq
+            if not fresh:
+                # On timeout resend the current frame to keep the connection alive
+                await signal.wait(timeout=1.0)
+
+            with session.lock:
+                seen_seq = session.frame_seq
+                chunk = session.latest_chunk
+                image = session.latest_image
+
+            if variant is not None and image is not None:
+                chunk = await _variant_chunk(variant, seen_seq, image) or chunk
+            if chunk is None:
+                # Renders and encodes a placeholder, so keep it off the event loop
+                chunk = await asyncio.to_thread(main._waiting_chunk, session)
+            yield chunk
+    finally:
+        main._remove_viewer(session, variant)
+
+
+@app.get("/")
+async def root():
+    return main._service_info()
+
+
+@app.get("/health")
+async def health():
+    return main._health_info()
+
+
+@app.get("/sessions")
+async def list_sessions():
+    return {"items": [session.to_dict() for session in main.SESSIONS.values()]}
+
+
+@app.get("/sessions/{camera_id}")
+async def get_session(camera_id: int):
+    return main._session_for(camera_id).to_dict()
+
+
+@app.post("/sessions/{camera_id}/analysis")
+async def subscribe_analysis(camera_id: int):
+    return main._set_analysis(camera_id, True).to_dict()
+
+
+@app.delete("/sessions/{camera_id}/analysis")
+async def unsubscribe_analysis(camera_id: int):
+    return main._set_analysis(camera_id, False).to_dict()
+
+
+@app.get("/video_feed")
+async def video_feed(
+    camera_id: Optional[int] = None,
+    width: Optional[int] = Query(None, description="Downscaled width, aspect ratio kept"),
+    quality: Optional[int] = Query(None, description="JPEG quality"),
+):
+    if camera_id is None:
+        raise HTTPException(status_code=400, detail="camera_id is required")
+
+    session = main._ensure_capture(camera_id)
+    return StreamingResponse(
+        _frame_stream(session, main._feed_variant(width, quality)),
+        media_type="multipart/x-mixed-replace; boundary=frame",
+    )
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Relay Viewer Capacity Load Test
+Measures how many concurrent MJPEG viewers the relay sustains per CPU core
+in the Flask (thread per viewer) and ASGI (coroutine per viewer) modes.
+
+The relay is started as a subprocess against a stub backend that serves
+every camera as a demo source, so no database or real cameras are needed.
+Viewers are raw asyncio connections counting multipart frames. For each
+viewer count the test reports the frame rate each viewer received, the
+relay's CPU use (from /proc, Linux only), thread count, how many viewers
+were sustained (at least 90% of --target-fps) and sustained viewers per
+fully used core. The client shares the machine, so run it on a host with
+spare cores, or compare modes at equal settings.
+
+Usage:
+    python benchmarks/viewer_capacity.py --modes flask asgi --viewers 50 200 1000
+    python benchmarks/viewer_capacity.py --modes asgi --viewers 2000 --cameras 4 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RELAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+FRAME_MARKER = b"--frame\r\n"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _stub_backend(source: str) -> ThreadingHTTPServer:
+    """Answers /api/v1/cameras/<id> with the demo source for every camera."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({"id": int(self.path.rstrip("/").split("/")[-1]), "rtsp_url": source}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", _free_port()), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of the full line
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def _threads(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("Threads:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _start_relay(mode: str, port: int, backend_url: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "RELAY_SERVER": mode,
+        "RELAY_PORT": str(port),
+        "BACKEND_API_URL": backend_url,
+        "ENABLE_ANALYSIS": "false",
+        "PYTHONUNBUFFERED": "1",
+    }
+    process = subprocess.Popen([sys.executable, "main.py"], cwd=RELAY_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Relay ({mode}) did not start on port {port}")
+
+
+async def _viewer(port: int, camera_id: int, query: str, counts: list, index: int, stop: asyncio.Event) -> None:
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 22)
+    except OSError:
+        counts[index] = -1
+        return
+    writer.write(f"GET /video_feed?camera_id={camera_id}{query} HTTP/1.1\r\nHost: relay\r\n\r\n".encode())
+    await writer.drain()
+    tail = b""
+    try:
+        while not stop.is_set():
+            try:
+                data = await asyncio.wait_for(reader.read(1 << 16), timeout=1.0)
+            except asyncio.TimeoutError:
+                # A slow frame under load is not a lost viewer; re-check stop and keep reading
+                continue
+            if not data:
+                break
+            data = tail + data
+            counts[index] += data.count(FRAME_MARKER)
+            # Enough to complete a marker split across reads, too short to hold a counted one
+            tail = data[-(len(FRAME_MARKER) - 1):]
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _measure(port: int, viewers: int, cameras: int, query: str, warmup: float, duration: float,
+                   target_fps: float, pid: int):
+    counts = [0] * viewers
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(_viewer(port, 1 + i % cameras, query, counts, i, stop)) for i in range(viewers)]
+
+    await asyncio.sleep(warmup)
+    before = list(counts)
+    cpu_before, started = _cpu_seconds(pid), time.monotonic()
+    await asyncio.sleep(duration)
+    cpu_used, elapsed = _cpu_seconds(pid) - cpu_before, time.monotonic() - started
+    delivered = [after - start for after, start in zip(counts, before) if after >= 0]
+    threads = _threads(pid)
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    fps = sorted(count / elapsed for count in delivered)
+    sustained = sum(1 for rate in fps if rate >= 0.9 * target_fps)
+    cores = cpu_used / elapsed
+    return {
+        "viewers": viewers,
+        "connected": len(delivered),
+        "sustained": sustained,
+        "fps_mean": round(sum(fps) / len(fps), 2) if fps else 0.0,
+        "fps_p5": round(fps[len(fps) // 20], 2) if fps else 0.0,
+        "cores": round(cores, 3),
+        "threads": threads,
+        "viewers_per_core": round(sustained / cores, 1) if cores else None,
+    }
+
+
+def run(args):
+    backend = _stub_backend(args.source)
+    backend_url = f"http://127.0.0.1:{backend.server_address[1]}/api/v1"
+    query = "".join(f"&{name}={value}" for name, value in (("width", args.width), ("quality", args.quality)) if value)
+
+    results = []
+    for mode in args.modes:
+        port = _free_port()
+        process = _start_relay(mode, port, backend_url)
+        try:
+            for viewers in args.viewers:
+                row = asyncio.run(_measure(port, viewers, args.cameras, query, args.warmup, args.duration,
+                                         args.target_fps, process.pid))
+                row["mode"] = mode
+                results.append(row)
+                print(f"{mode:<6} {row['viewers']:>7} {row['connected']:>9} {row['sustained']:>9} {row['fps_mean']:>8.2f} "
+                      f"{row['fps_p5']:>7.2f} {row['cores']:>6.2f} {row['threads']:>7} "
+                      f"{row['viewers_per_core'] or '-':>10}")
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    backend.shutdown()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "cpus": os.cpu_count(),
+            "source": args.source,
+            "cameras": args.cameras,
+            "width": args.width,
+            "quality": args.quality,
+            "duration": args.duration,
+            "target_fps": args.target_fps,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test relay viewer capacity per CPU core")
+    parser.add_argument("--modes", nargs="+", default=["flask", "asgi"], choices=["flask", "asgi"])
+    parser.add_argument("--viewers", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--cameras", type=int, default=1, help="Spread viewers over this many cameras")
+    parser.add_argument("--source", default="demo://lobby", help="Source every stub camera streams")
+    parser.add_argument("--width", type=int, help="Request this variant width from /video_feed")
+    parser.add_argument("--quality", type=int, help="Request this variant JPEG quality from /video_feed")
+    parser.add_argument("--target-fps", type=float, default=float(os.getenv("OUTPUT_FPS", "15")),
+                        help="Frame rate a viewer must get to count as sustained (the relay's OUTPUT_FPS)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds before measuring")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per viewer count")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'viewers':>7} {'connected':>9} {'sustained':>9} {'fps':>8} {'p5 fps':>7} {'cores':>6} {'threads':>7} "
+          f"{'viewers/core':>10}")
+    report = run(args)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
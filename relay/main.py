@@ -1,9 +1,10 @@
 import os
 from pathlib import Path
+import struct
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -17,14 +18,42 @@ BACKEND_ACCESS_TOKEN = os.getenv("BACKEND_ACCESS_TOKEN")
 BACKEND_USERNAME = os.getenv("BACKEND_USERNAME")
 BACKEND_PASSWORD = os.getenv("BACKEND_PASSWORD")
 VISION_API_URL = os.getenv("VISION_API_URL")
+# Opt-in: post uncompressed frames to the vision service's raw ingest endpoint
+VISION_RAW_API_URL = os.getenv("VISION_RAW_API_URL")
+VISION_RAW_FORMAT = os.getenv("VISION_RAW_FORMAT", "bgr").lower()
 ENABLE_ANALYSIS = os.getenv("ENABLE_ANALYSIS", "false").lower() == "true"
 ANALYZE_INTERVAL = float(os.getenv("ANALYZE_INTERVAL", "2.0"))
+# Cameras analyzed without a call to /sessions/<id>/analysis, e.g. "1,4"
+ANALYSIS_CAMERAS = {int(camera_id) for camera_id in os.getenv("ANALYSIS_CAMERAS", "").split(",") if camera_id.strip()}
 RECONNECT_DELAY = float(os.getenv("RECONNECT_DELAY", "2.0"))
+# "latest": grab at source rate, encode only the newest frame at OUTPUT_FPS;
+# "sleep": read, encode and sleep FRAME_SLEEP per frame
+CAPTURE_MODE = os.getenv("CAPTURE_MODE", "latest").lower()
+OUTPUT_FPS = float(os.getenv("OUTPUT_FPS", "15"))
 FRAME_SLEEP = float(os.getenv("FRAME_SLEEP", "0.05"))
 JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "80"))
+# "flask": one thread per viewer; "asgi": viewers are coroutines (see asgi.py)
+RELAY_SERVER = os.getenv("RELAY_SERVER", "flask").lower()
+RELAY_PORT = int(os.getenv("RELAY_PORT", "5000"))
+# Bounds for the per-viewer /video_feed width and quality parameters
+MIN_VARIANT_WIDTH = int(os.getenv("MIN_VARIANT_WIDTH", "64"))
+MIN_VARIANT_QUALITY = int(os.getenv("MIN_VARIANT_QUALITY", "10"))
+MAX_VARIANT_QUALITY = int(os.getenv("MAX_VARIANT_QUALITY", "95"))
+# Stop captures nobody watches or analyzes after this many seconds (0 = never)
+IDLE_GRACE_PERIOD = float(os.getenv("IDLE_GRACE_PERIOD", "30"))
+REAPER_INTERVAL = float(os.getenv("REAPER_INTERVAL", "5"))
 DEMO_ASSETS_DIR = Path(os.getenv("DEMO_ASSETS_DIR", Path(__file__).resolve().parent / "assets"))
 
 
+# Raw ingest header, must match vision/services/raw_frame.py:
+# magic, version, pixel format, width, height, camera_id, capture timestamp
+RAW_FRAME_HEADER = struct.Struct("<4sBBHHId")
+RAW_FRAME_FORMATS = {"bgr": 0, "i420": 1}
+VIDEO_FILE_SUFFIXES = (".mp4", ".mov", ".avi")
+# Files that do not report a frame rate are paced at this one
+DEFAULT_FILE_FPS = 25.0
+
+
 app = Flask(__name__)
 CORS(app)
 
@@ -60,28 +89,108 @@ def _placeholder_frame(camera_id: int, message: str) -> bytes:
     return buffer.tobytes() if ok else b""
 
 
+def _multipart_chunk(frame_bytes: bytes) -> bytes:
+    return b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n"
+
+
+def _encode_jpeg(frame: np.ndarray, quality: int) -> Optional[bytes]:
+    encoded, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buffer.tobytes() if encoded else None
+
+
+@dataclass
+class FeedVariant:
+    """A downscaled and/or recompressed stream, encoded on demand for its subscribers."""
+
+    width: Optional[int]
+    quality: int
+    subscribers: int = 0
+    seq: int = -1
+    chunk: Optional[bytes] = None
+    # In-flight encode in ASGI mode as (frame seq, future); dropped with the variant
+    pending: Optional[Tuple[int, Any]] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def key(self) -> str:
+        return f"{self.width or 'full'}@q{self.quality}"
+
+    def chunk_for(self, seq: int, image: np.ndarray) -> Optional[bytes]:
+        # The first subscriber to see a new frame encodes it, the rest reuse that
+        with self.lock:
+            if self.seq != seq:
+                height, width = image.shape[:2]
+                if self.width and self.width < width:
+                    size = (self.width, max(1, round(height * self.width / width)))
+                    image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+                frame_bytes = _encode_jpeg(image, self.quality)
+                self.chunk = _multipart_chunk(frame_bytes) if frame_bytes else None
+                self.seq = seq
+            return self.chunk
+
+
 @dataclass
 class CameraSession:
     camera_id: int
     thread: Optional[threading.Thread] = None
     latest_frame: Optional[bytes] = None
+    # Multipart part for latest_frame, built once and shared by every viewer
+    latest_chunk: Optional[bytes] = None
+    # Decoded latest_frame, shared by variants; None for placeholders
+    latest_image: Optional[np.ndarray] = None
+    variants: Dict[str, FeedVariant] = field(default_factory=dict)
+    # Called from the capture thread after each stored frame, e.g. to wake async viewers
+    frame_listeners: List[Callable[[], None]] = field(default_factory=list)
+    # Bumped on every stored frame; viewers wait for a sequence newer than theirs
+    frame_seq: int = 0
     latest_source: Optional[str] = None
     last_frame_at: Optional[float] = None
     last_error: Optional[str] = None
     status: str = "idle"
     viewers: int = 0
+    # Set through /sessions/<id>/analysis or ANALYSIS_CAMERAS; only subscribed
+    # sessions are analyzed, and they keep the capture running without viewers
+    analysis_subscribed: bool = False
+    # Posts frames to vision while subscribed; cleared by the worker when it exits
+    analysis_thread: Optional[threading.Thread] = None
+    # When the last viewer left (or an unwatched capture started); None while watched
+    idle_since: Optional[float] = None
     captures_started: int = 0
+    captures_reaped: int = 0
+    source_fps: Optional[float] = None
+    frames_grabbed: int = 0
+    # Grabbed to keep the source drained, but not encoded
+    frames_skipped: int = 0
+    # Smoothed age of published frames: decoder lag behind the stream plus processing
+    staleness_ms: Optional[float] = None
+    # Newest frame waiting for the analysis worker as (frame, jpeg, captured_at); overwritten, never queued
+    analysis_frame: Optional[Tuple[np.ndarray, bytes, float]] = None
+    # Published frames are offered for analysis from this time on (unix seconds)
+    next_analysis_at: float = 0.0
     lock: threading.Lock = field(default_factory=threading.Lock)
-    new_frame: threading.Event = field(default_factory=threading.Event)
     stop_event: threading.Event = field(default_factory=threading.Event)
 
+    def __post_init__(self) -> None:
+        # Shares `lock`, so frame updates and viewer wake-ups are atomic
+        self.frame_ready = threading.Condition(self.lock)
+        self.analysis_ready = threading.Condition(self.lock)
+
     def to_dict(self) -> Dict[str, Any]:
         with self.lock:
             return {
                 "camera_id": self.camera_id,
                 "status": self.status,
                 "viewers": self.viewers,
+                "analysis_subscribed": self.analysis_subscribed,
+                "idle_since": self.idle_since,
                 "captures_started": self.captures_started,
+                "captures_reaped": self.captures_reaped,
+                "frame_seq": self.frame_seq,
+                "source_fps": self.source_fps,
+                "frames_grabbed": self.frames_grabbed,
+                "frames_skipped": self.frames_skipped,
+                "staleness_ms": self.staleness_ms,
+                "variants": {key: variant.subscribers for key, variant in self.variants.items()},
                 "last_frame_at": self.last_frame_at,
                 "last_error": self.last_error,
                 "latest_source": self.latest_source,
@@ -90,8 +199,12 @@ class CameraSession:
 
 SESSIONS: Dict[int, CameraSession] = {}
 SESSIONS_LOCK = threading.Lock()
+REAPER_LOCK = threading.Lock()
+REAPER_THREAD: Optional[threading.Thread] = None
 AUTH_LOCK = threading.Lock()
 AUTH_TOKEN: Optional[str] = BACKEND_ACCESS_TOKEN
+# One keep-alive HTTP session per analysis thread for posting frames to vision
+VISION_HTTP = threading.local()
 
 
 def _normalized_backend_api_url() -> str:
@@ -118,7 +231,7 @@ def _resolve_source(source: str) -> str:
     if candidate.is_file():
         return str(candidate)
 
-    for suffix in (".mp4", ".mov", ".avi"):
+    for suffix in VIDEO_FILE_SUFFIXES:
         video_file = candidate.with_suffix(suffix)
         if video_file.is_file():
             return str(video_file)
@@ -174,42 +287,256 @@ def _session_for(camera_id: int) -> CameraSession:
     with SESSIONS_LOCK:
         session = SESSIONS.get(camera_id)
         if session is None:
-            session = CameraSession(camera_id=camera_id)
+            session = CameraSession(camera_id=camera_id, analysis_subscribed=camera_id in ANALYSIS_CAMERAS)
             SESSIONS[camera_id] = session
         return session
 
 
-def _store_frame(session: CameraSession, frame_bytes: bytes, status: str, error: Optional[str] = None) -> None:
-    with session.lock:
+def _store_frame(
+    session: CameraSession,
+    frame_bytes: bytes,
+    status: str,
+    error: Optional[str] = None,
+    image: Optional[np.ndarray] = None,
+) -> None:
+    chunk = _multipart_chunk(frame_bytes)
+    with session.frame_ready:
         session.latest_frame = frame_bytes
+        session.latest_chunk = chunk
+        session.latest_image = image
+        session.frame_seq += 1
         session.last_frame_at = _now()
         session.status = status
         session.last_error = error
-    session.new_frame.set()
+        session.frame_ready.notify_all()
+        listeners = list(session.frame_listeners)
+    for listener in listeners:
+        listener()
+
+
+def _vision_session() -> requests.Session:
+    session = getattr(VISION_HTTP, "session", None)
+    if session is None:
+        session = VISION_HTTP.session = requests.Session()
+    return session
+
+
+def _raw_frame(camera_id: int, frame: np.ndarray, captured_at: float) -> bytes:
+    pixel_format = RAW_FRAME_FORMATS.get(VISION_RAW_FORMAT, 0)
+    height, width = frame.shape[:2]
+    if pixel_format == RAW_FRAME_FORMATS["i420"] and not (width % 2 or height % 2):
+        pixels = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+    else:
+        pixel_format = RAW_FRAME_FORMATS["bgr"]
+        pixels = np.ascontiguousarray(frame)
+    header = RAW_FRAME_HEADER.pack(b"SSRF", 1, pixel_format, width, height, camera_id, captured_at)
+    return header + pixels.tobytes()
 
 
-def _maybe_analyze(camera_id: int, frame_bytes: bytes, last_sent_at: float) -> float:
-    if not ENABLE_ANALYSIS or not VISION_API_URL:
-        return last_sent_at
-    if _now() - last_sent_at < ANALYZE_INTERVAL:
-        return last_sent_at
+def _analysis_enabled() -> bool:
+    return ENABLE_ANALYSIS and bool(VISION_RAW_API_URL or VISION_API_URL)
 
+
+def _analyze(camera_id: int, frame: np.ndarray, frame_bytes: bytes, captured_at: float) -> float:
+    """Post one frame to vision; returns when the next frame is due."""
+    # Age on our own clock, so vision's staleness check does not depend on the two clocks agreeing
+    frame_age_ms = round((_now() - captured_at) * 1000, 1)
     try:
-        requests.post(
-            VISION_API_URL,
-            files={"file": ("frame.jpg", frame_bytes, "image/jpeg")},
-            params={"camera_id": camera_id},
-            timeout=5,
-        )
+        if VISION_RAW_API_URL:
+            response = _vision_session().post(
+                VISION_RAW_API_URL,
+                data=_raw_frame(camera_id, frame, captured_at),
+                params={"frame_age_ms": frame_age_ms},
+                headers={"Content-Type": "application/octet-stream"},
+                timeout=5,
+            )
+        else:
+            response = _vision_session().post(
+                VISION_API_URL,
+                files={"file": ("frame.jpg", frame_bytes, "image/jpeg")},
+                params={"camera_id": camera_id, "captured_at": captured_at, "frame_age_ms": frame_age_ms},
+                timeout=5,
+            )
+        if response.status_code in (429, 503):
+            # Shed by vision: hold off until it asks us to send again
+            return _now() + _retry_after(response)
+        return _now() + ANALYZE_INTERVAL
+    except Exception:
         return _now()
+
+
+def _offer_for_analysis(session: CameraSession, frame: np.ndarray, frame_bytes: bytes, captured_at: float) -> None:
+    if not _analysis_enabled():
+        return
+    with session.lock:
+        if not session.analysis_subscribed or _now() < session.next_analysis_at:
+            return
+        session.analysis_frame = (frame, frame_bytes, captured_at)
+        session.analysis_ready.notify()
+
+
+def _ensure_analysis(session: CameraSession) -> None:
+    # Called with session.lock held
+    if not (session.analysis_subscribed and _analysis_enabled()) or session.analysis_thread is not None:
+        return
+    session.analysis_thread = threading.Thread(
+        target=_analysis_loop,
+        args=(session,),
+        daemon=True,
+        name=f"camera-analysis-{session.camera_id}",
+    )
+    session.analysis_thread.start()
+
+
+def _analysis_loop(session: CameraSession) -> None:
+    # Posting to vision can take seconds; doing it here keeps the grab loop
+    # draining the source while a request is in flight
+    while True:
+        with session.analysis_ready:
+            session.analysis_ready.wait_for(
+                lambda: session.analysis_frame is not None or not session.analysis_subscribed,
+                timeout=1.0,
+            )
+            if not session.analysis_subscribed or session.stop_event.is_set():
+                # Exit under the lock so a new subscription always finds the slot free
+                session.analysis_thread = None
+                session.analysis_frame = None
+                return
+            pending, session.analysis_frame = session.analysis_frame, None
+        if pending is None:
+            continue
+        next_analysis_at = _analyze(session.camera_id, *pending)
+        with session.lock:
+            session.next_analysis_at = next_analysis_at
+            # Offered while the request was in flight, before the next one was due
+            session.analysis_frame = None
+
+
+def _retry_after(response) -> float:
+    try:
+        return float(response.json()["retry_after"])
     except Exception:
-        return last_sent_at
+        pass
+    try:
+        return float(response.headers.get("Retry-After", ANALYZE_INTERVAL))
+    except ValueError:
+        return ANALYZE_INTERVAL
+
+
+def _publish(
+    session: CameraSession,
+    frame: np.ndarray,
+    captured_at: float,
+    stream_lag: float,
+) -> None:
+    frame_bytes = _encode_jpeg(frame, JPEG_QUALITY)
+    if frame_bytes is None:
+        raise RuntimeError("Frame encoding failed")
+
+    _store_frame(session, frame_bytes, "streaming", image=frame)
+    staleness_ms = (stream_lag + _now() - captured_at) * 1000
+    with session.lock:
+        previous = session.staleness_ms
+        session.staleness_ms = round(staleness_ms if previous is None else 0.9 * previous + 0.1 * staleness_ms, 1)
+    _offer_for_analysis(session, frame, frame_bytes, captured_at)
+
+
+class _StreamClock:
+    """Tracks how far wall-clock time runs ahead of the stream's own timestamps."""
+
+    def __init__(self) -> None:
+        self.origin: Optional[tuple] = None
+
+    def lag(self, capture: cv2.VideoCapture, grabbed_at: float) -> float:
+        media_at = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if media_at <= 0:
+            # Source without usable timestamps
+            return 0.0
+        if self.origin is None or media_at < self.origin[1]:
+            self.origin = (grabbed_at, media_at)
+        return max(0.0, (grabbed_at - self.origin[0]) - (media_at - self.origin[1]))
+
+
+def _stream_latest(
+    session: CameraSession,
+    stop_event: threading.Event,
+    capture: cv2.VideoCapture,
+    is_file: bool,
+) -> None:
+    # Grab every frame as the source produces it so the decoder's buffer never
+    # fills up, but only convert and encode the newest one at OUTPUT_FPS.
+    # Files have no natural rate limit, so they are paced to their native FPS.
+    source_fps = capture.get(cv2.CAP_PROP_FPS) or None
+    file_interval = 1.0 / (source_fps or DEFAULT_FILE_FPS) if is_file else 0.0
+    output_interval = 1.0 / OUTPUT_FPS if OUTPUT_FPS > 0 else 0.0
+    with session.lock:
+        session.source_fps = source_fps
+
+    clock = _StreamClock()
+    next_grab_at = next_output_at = time.monotonic()
+    while not stop_event.is_set():
+        if file_interval:
+            delay = next_grab_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            # Running late: carry on from now rather than bursting to catch up
+            next_grab_at = max(next_grab_at + file_interval, time.monotonic())
+
+        if not capture.grab():
+            if is_file:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                clock = _StreamClock()
+                continue
+            raise RuntimeError("Stream read failed or video ended")
+        grabbed_at = _now()
+        if stop_event.is_set():
+            break
+        stream_lag = clock.lag(capture, grabbed_at)
+
+        now = time.monotonic()
+        if now < next_output_at:
+            with session.lock:
+                session.frames_grabbed += 1
+                session.frames_skipped += 1
+            continue
+        next_output_at = max(next_output_at + output_interval, now)
+        with session.lock:
+            session.frames_grabbed += 1
+
+        ok, frame = capture.retrieve()
+        if not ok or frame is None:
+            raise RuntimeError("Frame decode failed")
+        _publish(session, frame, grabbed_at, stream_lag)
+
+
+def _stream_sleeping(
+    session: CameraSession,
+    stop_event: threading.Event,
+    capture: cv2.VideoCapture,
+    is_file: bool,
+) -> None:
+    clock = _StreamClock()
+    while not stop_event.is_set():
+        ok, frame = capture.read()
+        captured_at = _now()
+        if stop_event.is_set():
+            break
+        if not ok or frame is None:
+            # If it's a local video file like .mp4, loop it!
+            if is_file:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                clock = _StreamClock()
+                continue
+            raise RuntimeError("Stream read failed or video ended")
 
+        with session.lock:
+            session.frames_grabbed += 1
+        _publish(session, frame, captured_at, clock.lag(capture, captured_at))
+        time.sleep(FRAME_SLEEP)
 
-def _capture_loop(session: CameraSession) -> None:
-    last_sent_at = 0.0
 
-    while not session.stop_event.is_set():
+def _capture_loop(session: CameraSession, stop_event: threading.Event) -> None:
+    while not stop_event.is_set():
         capture = None
         try:
             camera = _fetch_camera(session.camera_id)
@@ -228,32 +555,23 @@ def _capture_loop(session: CameraSession) -> None:
             if not capture.isOpened():
                 raise RuntimeError(f"Unable to open source: {source}")
 
+            is_file = isinstance(resolved_source, str) and resolved_source.lower().endswith(VIDEO_FILE_SUFFIXES)
+            if not is_file:
+                # Keep the backend's own queue short where it supports it
+                capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
             with session.lock:
                 session.status = "streaming"
                 session.last_error = None
+                session.staleness_ms = None
 
-            while not session.stop_event.is_set():
-                ok, frame = capture.read()
-                if not ok or frame is None:
-                    # If it's a local video file like .mp4, loop it!
-                    if isinstance(resolved_source, str) and resolved_source.lower().endswith((".mp4", ".mov", ".avi")):
-                        capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                        continue
-                    raise RuntimeError("Stream read failed or video ended")
-
-                encoded, buffer = cv2.imencode(
-                    ".jpg",
-                    frame,
-                    [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY],
-                )
-                if not encoded:
-                    raise RuntimeError("Frame encoding failed")
-
-                frame_bytes = buffer.tobytes()
-                _store_frame(session, frame_bytes, "streaming")
-                last_sent_at = _maybe_analyze(session.camera_id, frame_bytes, last_sent_at)
-                time.sleep(FRAME_SLEEP)
+            if CAPTURE_MODE == "sleep":
+                _stream_sleeping(session, stop_event, capture, is_file)
+            else:
+                _stream_latest(session, stop_event, capture, is_file)
         except Exception as exc:
+            if stop_event.is_set():
+                break
             message = str(exc)
             placeholder = _placeholder_frame(session.camera_id, message)
             _store_frame(session, placeholder, "offline", message)
@@ -266,66 +584,173 @@ def _capture_loop(session: CameraSession) -> None:
 
 
 def _ensure_capture(camera_id: int) -> CameraSession:
+    _ensure_reaper()
     session = _session_for(camera_id)
     with session.lock:
-        if session.thread and session.thread.is_alive():
-            return session
-        session.stop_event.clear()
-        session.thread = threading.Thread(
-            target=_capture_loop,
-            args=(session,),
-            daemon=True,
-            name=f"camera-relay-{camera_id}",
-        )
-        session.thread.start()
+        if session.viewers == 0 and not session.analysis_subscribed:
+            # Restart the grace period so a capture reused right before its reap is not stopped
+            session.idle_since = _now()
+        if not (session.thread and session.thread.is_alive() and not session.stop_event.is_set()):
+            # A reaped thread may still be winding down; the new one gets its own stop event
+            session.stop_event = threading.Event()
+            session.thread = threading.Thread(
+                target=_capture_loop,
+                args=(session, session.stop_event),
+                daemon=True,
+                name=f"camera-relay-{camera_id}",
+            )
+            session.thread.start()
+        _ensure_analysis(session)
     return session
 
 
-def _frame_generator(session: CameraSession):
+def _reap_idle_captures() -> None:
+    now = _now()
+    for session in list(SESSIONS.values()):
+        with session.lock:
+            idle = (
+                session.thread is not None
+                and session.thread.is_alive()
+                and not session.stop_event.is_set()
+                and session.viewers == 0
+                and not session.analysis_subscribed
+                and session.idle_since is not None
+                and now - session.idle_since >= IDLE_GRACE_PERIOD
+            )
+            if not idle:
+                continue
+            session.stop_event.set()
+            session.status = "idle"
+            # A later viewer should wait for a fresh frame, not see a stale one
+            session.latest_frame = None
+            session.latest_chunk = None
+            session.latest_image = None
+            session.analysis_frame = None
+            session.captures_reaped += 1
+
+
+def _reaper_loop() -> None:
+    while True:
+        time.sleep(REAPER_INTERVAL)
+        try:
+            _reap_idle_captures()
+        except Exception as exc:
+            print(f"Capture reaper error: {exc}")
+
+
+def _ensure_reaper() -> None:
+    global REAPER_THREAD
+
+    if IDLE_GRACE_PERIOD <= 0:
+        return
+    with REAPER_LOCK:
+        if REAPER_THREAD and REAPER_THREAD.is_alive():
+            return
+        REAPER_THREAD = threading.Thread(target=_reaper_loop, daemon=True, name="camera-relay-reaper")
+        REAPER_THREAD.start()
+
+
+def _add_viewer(session: CameraSession, variant: Optional[FeedVariant]) -> Optional[FeedVariant]:
     with session.lock:
         session.viewers += 1
+        session.idle_since = None
+        if variant is not None:
+            # Viewers asking for the same size and quality share one encoder
+            variant = session.variants.setdefault(variant.key, variant)
+            variant.subscribers += 1
+    return variant
+
+
+def _remove_viewer(session: CameraSession, variant: Optional[FeedVariant]) -> None:
+    with session.lock:
+        session.viewers = max(0, session.viewers - 1)
+        if session.viewers == 0:
+            session.idle_since = _now()
+        if variant is not None:
+            variant.subscribers -= 1
+            if variant.subscribers == 0:
+                session.variants.pop(variant.key, None)
 
+
+def _waiting_chunk(session: CameraSession) -> bytes:
+    return _multipart_chunk(_placeholder_frame(session.camera_id, "Waiting for first frame"))
+
+
+def _frame_generator(session: CameraSession, variant: Optional[FeedVariant] = None):
+    variant = _add_viewer(session, variant)
+    seen_seq = 0
     try:
         while True:
-            frame = session.latest_frame
-            if frame is None:
-                session.new_frame.wait(timeout=1.0)
-                session.new_frame.clear()
-                frame = session.latest_frame or _placeholder_frame(session.camera_id, "Waiting for first frame")
-
-            yield (
-                b"--frame\r\n"
-                b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
-            )
-            time.sleep(FRAME_SLEEP)
+            # Sleep until a newer frame is published; on timeout resend the
+            # current one so the connection stays alive through a stalled source
+            with session.frame_ready:
+                session.frame_ready.wait_for(lambda: session.frame_seq > seen_seq, timeout=1.0)
+                seen_seq = session.frame_seq
+                chunk = session.latest_chunk
+                image = session.latest_image
+
+            if variant is not None and image is not None:
+                chunk = variant.chunk_for(seen_seq, image) or chunk
+            yield chunk or _waiting_chunk(session)
     finally:
-        with session.lock:
-            session.viewers = max(0, session.viewers - 1)
+        _remove_viewer(session, variant)
+
+
+def _feed_variant(width: Optional[int], quality: Optional[int]) -> Optional[FeedVariant]:
+    """The variant a viewer asked for, or None for the full-size stream at JPEG_QUALITY."""
+    if width is not None:
+        width = max(MIN_VARIANT_WIDTH, width)
+    if quality is not None:
+        quality = min(MAX_VARIANT_QUALITY, max(MIN_VARIANT_QUALITY, quality))
+    if width is None and quality in (None, JPEG_QUALITY):
+        return None
+    return FeedVariant(width=width, quality=quality or JPEG_QUALITY)
+
+
+def _set_analysis(camera_id: int, subscribed: bool) -> CameraSession:
+    session = _session_for(camera_id)
+    with session.lock:
+        session.analysis_subscribed = subscribed
+        if subscribed:
+            session.idle_since = None
+        else:
+            # Wake the analysis worker so it exits now rather than on its next timeout
+            session.analysis_ready.notify_all()
+            if session.viewers == 0:
+                session.idle_since = _now()
+    if subscribed:
+        _ensure_capture(camera_id)
+    return session
+
+
+def _service_info() -> Dict[str, Any]:
+    return {
+        "service": "SafeSight Camera Relay",
+        "status": "running",
+        "server": RELAY_SERVER,
+        "analysis_enabled": ENABLE_ANALYSIS,
+        "backend_api_url": BACKEND_API_URL,
+        "normalized_backend_api_url": _normalized_backend_api_url(),
+        "active_sessions": len(SESSIONS),
+    }
+
+
+def _health_info() -> Dict[str, Any]:
+    return {
+        "status": "healthy",
+        "active_sessions": len(SESSIONS),
+        "analysis_enabled": ENABLE_ANALYSIS,
+    }
 
 
 @app.get("/")
 def root():
-    return jsonify(
-        {
-            "service": "SafeSight Camera Relay",
-            "status": "running",
-            "analysis_enabled": ENABLE_ANALYSIS,
-            "backend_api_url": BACKEND_API_URL,
-            "normalized_backend_api_url": _normalized_backend_api_url(),
-            "active_sessions": len(SESSIONS),
-        }
-    )
+    return jsonify(_service_info())
 
 
 @app.get("/health")
 def health():
-    return jsonify(
-        {
-            "status": "healthy",
-            "active_sessions": len(SESSIONS),
-            "analysis_enabled": ENABLE_ANALYSIS,
-        }
-    )
+    return jsonify(_health_info())
 
 
 @app.get("/sessions")
@@ -339,15 +764,27 @@ def get_session(camera_id: int):
     return jsonify(session.to_dict())
 
 
+@app.post("/sessions/<int:camera_id>/analysis")
+def subscribe_analysis(camera_id: int):
+    return jsonify(_set_analysis(camera_id, True).to_dict())
+
+
+@app.delete("/sessions/<int:camera_id>/analysis")
+def unsubscribe_analysis(camera_id: int):
+    return jsonify(_set_analysis(camera_id, False).to_dict())
+
+
 @app.get("/video_feed")
 def video_feed():
     camera_id = request.args.get("camera_id", type=int)
     if camera_id is None:
         return jsonify({"detail": "camera_id is required"}), 400
 
+    # Optional downscaled width (aspect ratio kept) and JPEG quality for this viewer
+    variant = _feed_variant(request.args.get("width", type=int), request.args.get("quality", type=int))
     session = _ensure_capture(camera_id)
     return Response(
-        _frame_generator(session),
+        _frame_generator(session, variant),
         mimetype="multipart/x-mixed-replace; boundary=frame",
     )
 
@@ -358,6 +795,12 @@ if __name__ == "__main__":
     print("=" * 60)
     print(f"Backend API: {_normalized_backend_api_url()}")
     print(f"Analysis enabled: {ENABLE_ANALYSIS}")
-    print("Relay feed format: /video_feed?camera_id=<id>")
+    print("Relay feed format: /video_feed?camera_id=<id>[&width=<px>][&quality=<1-100>]")
+    print(f"Serving mode: {RELAY_SERVER}")
     print("=" * 60)
-    app.run(host="0.0.0.0", port=5000, debug=False, use_reloader=False, threaded=True)
+    if RELAY_SERVER == "asgi":
+        import uvicorn
+
+        uvicorn.run("asgi:app", host="0.0.0.0", port=RELAY_PORT, log_level="warning")
+    else:
+        app.run(host="0.0.0.0", port=RELAY_PORT, debug=False, use_reloader=False, threaded=True)
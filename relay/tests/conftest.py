@@ -0,0 +1,39 @@
+"""
+Pytest configuration for the camera relay
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Import main the way gunicorn and asgi.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def sessions():
+    yield main.SESSIONS
+    for session in main.SESSIONS.values():
+        with session.lock:
+            session.analysis_subscribed = False
+            session.analysis_ready.notify_all()
+        session.stop_event.set()
+    main.SESSIONS.clear()
+
+
+@pytest.fixture
+def session():
+    return main._session_for(1)
+
+
+@pytest.fixture
+def frame():
+    def make(value=0, width=160, height=120):
+        image = np.full((height, width, 3), value, dtype=np.uint8)
+        # Some texture so every frame encodes differently
+        image[: height // 2, : width // 2] = 255 - value
+        return image
+    return make
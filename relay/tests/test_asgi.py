@@ -0,0 +1,110 @@
+"""
+Tests for the async viewers in asgi.py
+"""
+import asyncio
+import threading
+
+import pytest
+
+import asgi
+import main
+
+
+@pytest.fixture(autouse=True)
+def signals():
+    yield asgi.SIGNALS
+    asgi.SIGNALS.clear()
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    calls = []
+    chunk_for = main.FeedVariant.chunk_for
+
+    def counting(variant, seq, image):
+        calls.append(seq)
+        return chunk_for(variant, seq, image)
+
+    monkeypatch.setattr(main.FeedVariant, "chunk_for", counting)
+    return calls
+
+
+class TestVariantChunk:
+    """Test that concurrent subscribers await one encode per frame"""
+
+    def test_subscribers_share_the_encode(self, frame, encodes):
+        variant = main.FeedVariant(width=80, quality=50)
+        image = frame()
+
+        async def run():
+            return await asyncio.gather(*(asgi._variant_chunk(variant, 1, image) for _ in range(4)))
+
+        chunks = asyncio.run(run())
+        assert encodes == [1]
+        assert all(chunk is variant.chunk for chunk in chunks)
+        assert variant.pending[0] == 1
+
+    def test_new_frame_replaces_the_pending_encode(self, frame, encodes):
+        variant = main.FeedVariant(width=80, quality=50)
+
+        async def run():
+            await asgi._variant_chunk(variant, 1, frame(10))
+            await asgi._variant_chunk(variant, 2, frame(20))
+
+        asyncio.run(run())
+        assert encodes == [1, 2]
+        assert variant.pending[0] == 2
+
+    def test_cancelled_viewer_does_not_cancel_the_encode(self, frame):
+        variant = main.FeedVariant(width=80, quality=50)
+        image = frame()
+
+        async def run():
+            leaving = asyncio.create_task(asgi._variant_chunk(variant, 1, image))
+            staying = asyncio.create_task(asgi._variant_chunk(variant, 1, image))
+            await asyncio.sleep(0)
+            leaving.cancel()
+            return await staying
+
+        assert asyncio.run(run()) is variant.chunk
+
+
+class TestFrameStream:
+    """Test the coroutine viewer against frames stored by a capture thread"""
+
+    def test_streams_published_frames(self, session, frame):
+        async def run():
+            stream = asgi._frame_stream(session, main.FeedVariant(width=80, quality=50))
+            main._publish(session, frame(), main._now(), 0.0)
+            chunk = await stream.__anext__()
+            variant = session.variants["80@q50"]
+            await stream.aclose()
+            return chunk, variant
+
+        chunk, variant = asyncio.run(run())
+        assert chunk is variant.chunk
+        # The last subscriber took the variant and its pending encode with it
+        assert session.variants == {}
+        assert session.viewers == 0
+
+    def test_waiting_chunk_is_rendered_off_the_loop(self, session, monkeypatch):
+        threads = []
+        waiting_chunk = main._waiting_chunk
+
+        def recording(waiting_session):
+            threads.append(threading.current_thread())
+            return waiting_chunk(waiting_session)
+
+        monkeypatch.setattr(main, "_waiting_chunk", recording)
+
+        async def run():
+            stream = asgi._frame_stream(session, None)
+            with session.lock:
+                session.frame_seq = 1
+            chunk = await stream.__anext__()
+            await stream.aclose()
+            return chunk
+
+        chunk = asyncio.run(run())
+        assert chunk.startswith(b"--frame\r\n")
+        assert threads and threads[0] is not threading.main_thread()
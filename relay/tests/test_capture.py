@@ -0,0 +1,238 @@
+"""
+Tests for the latest-frame capture mode and the analysis worker
+"""
+import threading
+import time
+
+import cv2
+import pytest
+
+import main
+
+
+class FakeTime:
+    """Stands in for the time module so pacing runs without real sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class FakeCapture:
+    """A source of numbered frames that advances the clock at its own frame rate."""
+
+    def __init__(self, clock, frames, fps=25.0, stop_after=None, stop_event=None, live=True):
+        self.clock = clock
+        # Live sources block in grab() until the next frame; files return at once
+        self.live = live
+        self.frames = frames
+        self.fps = fps
+        self.position = 0
+        self.grabs = 0
+        self.retrieved = []
+        self.rewinds = 0
+        self.stop_after = stop_after
+        self.stop_event = stop_event
+
+    def grab(self):
+        if self.stop_after is not None and self.grabs >= self.stop_after:
+            self.stop_event.set()
+        if self.position >= len(self.frames):
+            return False
+        self.grabs += 1
+        self.position += 1
+        if self.live:
+            self.clock.now += 1.0 / self.fps
+        return True
+
+    def retrieve(self):
+        self.retrieved.append(self.position - 1)
+        return True, self.frames[self.position - 1]
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.position * 1000.0 / self.fps
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(value)
+            self.rewinds += 1
+        return True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(main, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def frames(frame):
+    return [frame(value) for value in range(0, 250, 5)]
+
+
+class TestStreamLatest:
+    """Test that the latest-frame mode grabs everything but encodes at OUTPUT_FPS"""
+
+    def test_encodes_at_output_rate(self, session, clock, frames, monkeypatch):
+        monkeypatch.setattr(main, "OUTPUT_FPS", 5.0)
+        capture = FakeCapture(clock, frames, fps=25.0)
+
+        with pytest.raises(RuntimeError, match="Stream read failed"):
+            main._stream_latest(session, session.stop_event, capture, is_file=False)
+
+        assert session.frames_grabbed == 50
+        assert session.frames_skipped == 40
+        assert session.frame_seq == 10
+        assert capture.retrieved == list(range(0, 50, 5))
+        assert session.source_fps == 25.0
+
+    def test_publishes_the_newest_frame(self, session, clock, frames, monkeypatch):
+        monkeypatch.setattr(main, "OUTPUT_FPS", 0.0)
+        capture = FakeCapture(clock, frames[:3])
+
+        with pytest.raises(RuntimeError):
+            main._stream_latest(session, session.stop_event, capture, is_file=False)
+
+        assert session.frame_seq == 3
+        assert (session.latest_image == frames[2]).all()
+        assert session.status == "streaming"
+
+    def test_files_loop_at_their_native_rate(self, session, clock, frames, monkeypatch):
+        monkeypatch.setattr(main, "OUTPUT_FPS", 0.0)
+        capture = FakeCapture(clock, frames[:3], fps=10.0, stop_after=9, stop_event=session.stop_event, live=False)
+        published_at = []
+        session.frame_listeners.append(lambda: published_at.append(clock.now))
+
+        main._stream_latest(session, session.stop_event, capture, is_file=True)
+
+        # Three passes over the file, the last rewind found the stop
+        assert capture.rewinds == 3
+        assert session.frame_seq == 9
+        gaps = [later - earlier for earlier, later in zip(published_at, published_at[1:])]
+        assert min(gaps) == pytest.approx(0.1)
+
+    def test_stops_without_publishing_after_stop(self, session, clock, frames):
+        capture = FakeCapture(clock, frames, stop_after=0, stop_event=session.stop_event)
+
+        main._stream_latest(session, session.stop_event, capture, is_file=False)
+        assert session.frame_seq == 0
+
+
+class TestStreamClock:
+    """Test the decoder lag measured against stream timestamps"""
+
+    class _Source:
+        def __init__(self):
+            self.media_ms = 0.0
+
+        def get(self, prop):
+            return self.media_ms
+
+    def test_lag_grows_when_wall_clock_runs_ahead(self):
+        clock, source = main._StreamClock(), self._Source()
+        source.media_ms = 1000.0
+        assert clock.lag(source, 50.0) == 0.0
+
+        source.media_ms = 1500.0
+        assert clock.lag(source, 51.0) == pytest.approx(0.5)
+
+    def test_rewound_stream_resets_the_origin(self):
+        clock, source = main._StreamClock(), self._Source()
+        source.media_ms = 5000.0
+        clock.lag(source, 50.0)
+
+        source.media_ms = 100.0
+        assert clock.lag(source, 60.0) == 0.0
+
+    def test_source_without_timestamps(self):
+        assert main._StreamClock().lag(self._Source(), 50.0) == 0.0
+
+
+class TestAnalysisWorker:
+    """Test the single-slot hand-off between the capture and analysis threads"""
+
+    @pytest.fixture
+    def subscribed(self, session, monkeypatch):
+        monkeypatch.setattr(main, "ENABLE_ANALYSIS", True)
+        monkeypatch.setattr(main, "VISION_API_URL", "http://vision/analyze")
+        session.analysis_subscribed = True
+        return session
+
+    def test_slot_keeps_only_the_newest_frame(self, subscribed, frame):
+        main._offer_for_analysis(subscribed, frame(1), b"first", 1.0)
+        main._offer_for_analysis(subscribed, frame(2), b"second", 2.0)
+
+        assert subscribed.analysis_frame[1:] == (b"second", 2.0)
+
+    def test_frames_before_the_next_interval_are_not_offered(self, subscribed, frame, monkeypatch):
+        monkeypatch.setattr(main, "_now", lambda: 100.0)
+        subscribed.next_analysis_at = 102.0
+
+        main._offer_for_analysis(subscribed, frame(), b"early", 100.0)
+        assert subscribed.analysis_frame is None
+
+    def test_frames_offered_in_flight_are_dropped(self, subscribed, frame, monkeypatch):
+        posted, started, release = [], threading.Event(), threading.Event()
+
+        def analyze(camera_id, image, frame_bytes, captured_at):
+            posted.append(frame_bytes)
+            started.set()
+            release.wait(2.0)
+            return 123.0
+
+        monkeypatch.setattr(main, "_analyze", analyze)
+        with subscribed.lock:
+            main._ensure_analysis(subscribed)
+        worker = subscribed.analysis_thread
+
+        main._offer_for_analysis(subscribed, frame(1), b"first", 1.0)
+        assert started.wait(2.0)
+        main._offer_for_analysis(subscribed, frame(2), b"during", 2.0)
+        release.set()
+
+        deadline = time.monotonic() + 2.0
+        while subscribed.next_analysis_at != 123.0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert posted == [b"first"]
+        assert subscribed.next_analysis_at == 123.0
+        assert subscribed.analysis_frame is None
+
+        main._set_analysis(subscribed.camera_id, False)
+        worker.join(timeout=2.0)
+        assert not worker.is_alive()
+
+    def test_shed_frames_wait_for_retry_after(self, frame, monkeypatch):
+        sent = {}
+
+        class Response:
+            status_code = 429
+            headers = {}
+
+            def json(self):
+                return {"retry_after": 7}
+
+        class Session:
+            def post(self, url, **kwargs):
+                sent.update(kwargs)
+                return Response()
+
+        monkeypatch.setattr(main, "VISION_API_URL", "http://vision/analyze")
+        monkeypatch.setattr(main, "VISION_RAW_API_URL", None)
+        monkeypatch.setattr(main, "_vision_session", Session)
+        monkeypatch.setattr(main, "_now", lambda: 100.0)
+
+        assert main._analyze(3, frame(), b"jpeg", 99.5) == 107.0
+        assert sent["params"] == {"camera_id": 3, "captured_at": 99.5, "frame_age_ms": 500.0}
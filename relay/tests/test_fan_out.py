@@ -0,0 +1,79 @@
+"""
+Tests for publishing frames to many viewers through the session condition
+"""
+import threading
+
+import main
+
+
+def _next(generator, results):
+    results.append(next(generator))
+
+
+class TestFanOut:
+    """Test that one published frame wakes every viewer with the same chunk"""
+
+    def test_viewers_share_the_published_chunk(self, session, frame):
+        viewers = [main._frame_generator(session) for _ in range(3)]
+        main._publish(session, frame(10), main._now(), 0.0)
+
+        chunks = [next(viewer) for viewer in viewers]
+        assert chunks[0].startswith(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n")
+        assert all(chunk is session.latest_chunk for chunk in chunks)
+        assert session.viewers == 3
+        assert session.frame_seq == 1
+
+    def test_waiting_viewers_wake_on_publish(self, session, frame):
+        viewers = [main._frame_generator(session) for _ in range(2)]
+        results = []
+        threads = [threading.Thread(target=_next, args=(viewer, results)) for viewer in viewers]
+        for thread in threads:
+            thread.start()
+
+        main._publish(session, frame(20), main._now(), 0.0)
+        for thread in threads:
+            thread.join(timeout=0.5)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert results == [session.latest_chunk, session.latest_chunk]
+
+    def test_viewer_skips_to_the_newest_frame(self, session, frame):
+        viewer = main._frame_generator(session)
+        main._publish(session, frame(30), main._now(), 0.0)
+        main._publish(session, frame(40), main._now(), 0.0)
+
+        assert next(viewer) is session.latest_chunk
+        assert session.frame_seq == 2
+
+    def test_listeners_run_after_each_frame(self, session, frame):
+        calls = []
+        session.frame_listeners.append(lambda: calls.append(session.frame_seq))
+
+        main._publish(session, frame(50), main._now(), 0.0)
+        main._publish(session, frame(60), main._now(), 0.0)
+        assert calls == [1, 2]
+
+    def test_closing_the_last_viewer_starts_the_idle_period(self, session, frame, monkeypatch):
+        monkeypatch.setattr(main, "_now", lambda: 100.0)
+        first = main._frame_generator(session)
+        second = main._frame_generator(session)
+        main._publish(session, frame(70), main._now(), 0.0)
+        next(first)
+        next(second)
+        assert session.idle_since is None
+
+        first.close()
+        assert session.viewers == 1
+        assert session.idle_since is None
+
+        second.close()
+        assert session.viewers == 0
+        assert session.idle_since == 100.0
+
+    def test_staleness_is_smoothed(self, session, frame, monkeypatch):
+        monkeypatch.setattr(main, "_now", lambda: 10.0)
+        main._publish(session, frame(80), 9.9, 0.0)
+        assert session.staleness_ms == 100.0
+
+        main._publish(session, frame(90), 10.0, 1.0)
+        assert session.staleness_ms == 190.0
@@ -0,0 +1,111 @@
+"""
+Tests for per-viewer feed variants encoded on demand
+"""
+import cv2
+import numpy as np
+import pytest
+
+import main
+
+
+def _decode(chunk):
+    frame_bytes = chunk.split(b"\r\n\r\n", 1)[1][:-2]
+    return cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    calls = []
+    encode = main._encode_jpeg
+
+    def counting(image, quality):
+        calls.append((image.shape[1], quality))
+        return encode(image, quality)
+
+    monkeypatch.setattr(main, "_encode_jpeg", counting)
+    return calls
+
+
+class TestFeedVariant:
+    """Test that a variant encodes each frame once for all its subscribers"""
+
+    def test_encodes_once_per_frame(self, frame, encodes):
+        variant = main.FeedVariant(width=80, quality=50)
+        image = frame(10)
+
+        first = variant.chunk_for(1, image)
+        assert variant.chunk_for(1, image) is first
+        assert encodes == [(80, 50)]
+
+        assert variant.chunk_for(2, frame(20)) is not first
+        assert len(encodes) == 2
+
+    def test_downscales_keeping_aspect_ratio(self, frame):
+        chunk = main.FeedVariant(width=80, quality=50).chunk_for(1, frame(width=160, height=120))
+        assert _decode(chunk).shape == (60, 80, 3)
+
+    def test_never_upscales(self, frame):
+        chunk = main.FeedVariant(width=640, quality=50).chunk_for(1, frame(width=160, height=120))
+        assert _decode(chunk).shape == (120, 160, 3)
+
+    def test_key_names_size_and_quality(self):
+        assert main.FeedVariant(width=320, quality=60).key == "320@q60"
+        assert main.FeedVariant(width=None, quality=60).key == "full@q60"
+
+
+class TestRequestedVariant:
+    """Test how /video_feed parameters map to variants"""
+
+    def test_default_stream_has_no_variant(self):
+        assert main._feed_variant(None, None) is None
+        assert main._feed_variant(None, main.JPEG_QUALITY) is None
+
+    def test_parameters_are_clamped(self):
+        variant = main._feed_variant(1, 500)
+        assert variant.width == main.MIN_VARIANT_WIDTH
+        assert variant.quality == main.MAX_VARIANT_QUALITY
+
+        assert main._feed_variant(None, 1).quality == main.MIN_VARIANT_QUALITY
+        assert main._feed_variant(320, None).quality == main.JPEG_QUALITY
+
+
+class TestVariantSubscribers:
+    """Test that viewers of the same variant share it and the last one removes it"""
+
+    def test_viewers_share_one_encode(self, session, frame, encodes):
+        viewers = [main._frame_generator(session, main.FeedVariant(width=80, quality=50)) for _ in range(3)]
+        main._publish(session, frame(), main._now(), 0.0)
+        chunks = [next(viewer) for viewer in viewers]
+
+        variant = session.variants["80@q50"]
+        assert variant.subscribers == 3
+        assert all(chunk is variant.chunk for chunk in chunks)
+        # One full-size encode by the capture thread, one for the variant
+        assert encodes == [(160, main.JPEG_QUALITY), (80, 50)]
+
+    def test_full_size_viewers_do_not_encode(self, session, frame, encodes):
+        viewer = main._frame_generator(session)
+        main._publish(session, frame(), main._now(), 0.0)
+
+        assert next(viewer) is session.latest_chunk
+        assert len(encodes) == 1
+        assert session.variants == {}
+
+    def test_last_subscriber_removes_the_variant(self, session, frame):
+        first = main._frame_generator(session, main.FeedVariant(width=80, quality=50))
+        second = main._frame_generator(session, main.FeedVariant(width=80, quality=50))
+        main._publish(session, frame(), main._now(), 0.0)
+        next(first)
+        next(second)
+
+        first.close()
+        assert session.variants["80@q50"].subscribers == 1
+        second.close()
+        assert session.variants == {}
+
+    def test_placeholder_is_sent_unscaled(self, session, encodes):
+        viewer = main._frame_generator(session, main.FeedVariant(width=80, quality=50))
+        main._store_frame(session, main._placeholder_frame(1, "offline"), "offline", "offline")
+
+        assert next(viewer) is session.latest_chunk
+        assert encodes == []
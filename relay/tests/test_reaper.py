@@ -0,0 +1,175 @@
+"""
+Tests for reaping idle captures and the analysis subscription
+"""
+import time
+
+import pytest
+
+import main
+
+
+def _idle_capture(session, stop_event):
+    stop_event.wait()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(main, "_now", lambda: now["t"])
+    return now
+
+
+@pytest.fixture(autouse=True)
+def captures(monkeypatch):
+    # Capture threads that only wait to be stopped; the tests run the reaper themselves
+    monkeypatch.setattr(main, "_capture_loop", _idle_capture)
+    monkeypatch.setattr(main, "_ensure_reaper", lambda: None)
+    monkeypatch.setattr(main, "IDLE_GRACE_PERIOD", 30.0)
+
+
+@pytest.fixture
+def analysis(monkeypatch):
+    posted = []
+
+    def analyze(camera_id, frame, frame_bytes, captured_at):
+        posted.append(camera_id)
+        return main._now()
+
+    monkeypatch.setattr(main, "ENABLE_ANALYSIS", True)
+    monkeypatch.setattr(main, "VISION_API_URL", "http://vision/analyze")
+    monkeypatch.setattr(main, "_analyze", analyze)
+    return posted
+
+
+def _running(session):
+    return session.thread.is_alive() and not session.stop_event.is_set()
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestReaper:
+    """Test that only unwatched, unsubscribed captures are stopped"""
+
+    def test_unwatched_capture_is_reaped_after_the_grace_period(self, clock):
+        session = main._ensure_capture(1)
+
+        clock["t"] += 29.0
+        main._reap_idle_captures()
+        assert _running(session)
+
+        clock["t"] += 1.0
+        main._reap_idle_captures()
+        assert session.stop_event.is_set()
+        assert session.status == "idle"
+        assert session.captures_reaped == 1
+
+    def test_subscribed_capture_is_kept(self, clock):
+        session = main._set_analysis(1, True)
+
+        clock["t"] += 300.0
+        main._reap_idle_captures()
+        assert _running(session)
+
+    def test_subscribed_capture_is_kept_with_analysis_enabled(self, clock, analysis):
+        subscribed = main._set_analysis(1, True)
+        unsubscribed = main._ensure_capture(2)
+
+        clock["t"] += 300.0
+        main._reap_idle_captures()
+        assert _running(subscribed)
+        assert unsubscribed.stop_event.is_set()
+
+    def test_watched_capture_is_kept(self, clock, frame):
+        session = main._ensure_capture(1)
+        viewer = main._frame_generator(session)
+        main._publish(session, frame(), main._now(), 0.0)
+        next(viewer)
+
+        clock["t"] += 300.0
+        main._reap_idle_captures()
+        assert _running(session)
+
+        viewer.close()
+        clock["t"] += 30.0
+        main._reap_idle_captures()
+        assert session.stop_event.is_set()
+
+    def test_unsubscribing_starts_the_grace_period(self, clock):
+        session = main._set_analysis(1, True)
+        clock["t"] += 100.0
+        main._set_analysis(1, False)
+
+        clock["t"] += 29.0
+        main._reap_idle_captures()
+        assert _running(session)
+
+        clock["t"] += 1.0
+        main._reap_idle_captures()
+        assert session.stop_event.is_set()
+
+    def test_reused_capture_restarts_the_grace_period(self, clock):
+        session = main._ensure_capture(1)
+        clock["t"] += 29.0
+        main._ensure_capture(1)
+
+        clock["t"] += 29.0
+        main._reap_idle_captures()
+        assert _running(session)
+
+    def test_reaped_capture_is_restarted(self, clock):
+        session = main._ensure_capture(1)
+        stopped = session.stop_event
+        clock["t"] += 30.0
+        main._reap_idle_captures()
+
+        assert main._ensure_capture(1) is session
+        assert stopped.is_set()
+        assert _running(session)
+
+
+class TestAnalysisSubscription:
+    """Test that frames are only analyzed for subscribed sessions"""
+
+    def test_worker_runs_only_while_subscribed(self, analysis):
+        unsubscribed = main._ensure_capture(1)
+        assert unsubscribed.analysis_thread is None
+
+        session = main._set_analysis(2, True)
+        worker = session.analysis_thread
+        assert worker.is_alive()
+
+        main._set_analysis(2, False)
+        worker.join(timeout=2.0)
+        assert not worker.is_alive()
+        assert session.analysis_thread is None
+
+    def test_only_subscribed_frames_are_posted(self, analysis, frame):
+        unsubscribed = main._ensure_capture(1)
+        subscribed = main._set_analysis(2, True)
+
+        main._publish(unsubscribed, frame(), main._now(), 0.0)
+        assert unsubscribed.analysis_frame is None
+
+        main._publish(subscribed, frame(), main._now(), 0.0)
+        assert _wait_for(lambda: analysis == [2])
+
+    def test_resubscribing_restarts_the_worker(self, analysis, frame):
+        session = main._set_analysis(1, True)
+        first = session.analysis_thread
+        main._set_analysis(1, False)
+        first.join(timeout=2.0)
+
+        main._set_analysis(1, True)
+        assert session.analysis_thread is not first
+        main._publish(session, frame(), main._now(), 0.0)
+        assert _wait_for(lambda: analysis == [1])
+
+    def test_analysis_cameras_are_subscribed(self, monkeypatch):
+        monkeypatch.setattr(main, "ANALYSIS_CAMERAS", {4})
+        assert main._session_for(4).analysis_subscribed
+        assert not main._session_for(5).analysis_subscribed
@@ -4,5 +4,14 @@ Contains modular analyzers for different detection tasks
 """
 
 from .face_analyzer import FaceAnalyzer
+from .embedding_store import EmbeddingStore
+from .face_gallery import FaceGallery
+from .ann_index import ExactIndex, IVFIndex
+from .face_tracker import FaceTracker
+from .face_quality import FaceQualityGate
+from .detector_cascade import DetectorCascade
+from .motion_gate import MotionGate
+from .zone_filter import ZoneFilter
 
-__all__ = ['FaceAnalyzer']
+__all__ = ['FaceAnalyzer', 'FaceGallery', 'EmbeddingStore', 'ExactIndex', 'IVFIndex', 'FaceTracker',
+           'FaceQualityGate', 'DetectorCascade', 'MotionGate', 'ZoneFilter']
@@ -0,0 +1,236 @@
+"""
+ANN Index Module
+Nearest-neighbour indexes over L2-normalized face embeddings
+"""
+
+import numpy as np
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+Match = Optional[Tuple[Hashable, float]]  # (id, cosine similarity)
+
+
+class ExactIndex:
+    """
+    Brute-force index
+    Scores every query against every stored vector with one matrix product
+    """
+
+    def __init__(self):
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._ids: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._rows
+
+    @property
+    def ids(self) -> List[Hashable]:
+        return list(self._ids)
+
+    def build(self, ids: Sequence[Hashable], vectors: np.ndarray) -> None:
+        self._matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._ids = list(ids)
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+
+    def export(self) -> Tuple[List[Hashable], np.ndarray]:
+        return list(self._ids), self._matrix
+
+    def add(self, item_id: Hashable, vector: np.ndarray) -> None:
+        if item_id in self._rows:
+            self._matrix[self._rows[item_id]] = vector
+            return
+
+        if len(self._ids) == 0:
+            self._matrix = np.ascontiguousarray(vector[np.newaxis, :], dtype=np.float32)
+        else:
+            self._matrix = np.ascontiguousarray(np.vstack([self._matrix, vector]))
+        self._rows[item_id] = len(self._ids)
+        self._ids.append(item_id)
+
+    def remove(self, item_id: Hashable) -> bool:
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return False
+
+        # Move the last row into the freed slot to keep the matrix contiguous
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._ids.pop()
+        self._matrix = self._matrix[:last]
+        return True
+
+    def search(self, queries: np.ndarray) -> List[Match]:
+        if len(self._ids) == 0:
+            return [None] * len(queries)
+
+        similarities = queries @ self._matrix.T
+        best_rows = np.argmax(similarities, axis=1)
+        best = similarities[np.arange(len(queries)), best_rows]
+        return [(self._ids[row], float(sim)) for row, sim in zip(best_rows, best)]
+
+
+class IVFIndex:
+    """
+    Inverted-file index
+    Vectors are bucketed under spherical k-means centroids; a query only scans
+    the `nprobe` buckets whose centroids are closest to it. Raising nprobe
+    trades latency for recall, nprobe == nlist is an exact search.
+    """
+
+    def __init__(self, nprobe: int = 8, nlist: Optional[int] = None,
+                 train_iterations: int = 10, seed: int = 0):
+        """
+        Initialize an empty index
+
+        Args:
+            nprobe: Number of buckets scanned per query (recall/latency knob)
+            nlist: Number of buckets; defaults to ~sqrt(n) at build time
+            train_iterations: k-means iterations when training centroids
+            seed: Seed for centroid initialization
+        """
+        self.nprobe = nprobe
+        self.nlist = nlist
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self._centroids = np.empty((0, 0), dtype=np.float32)
+        self._lists: List[np.ndarray] = []
+        self._list_ids: List[List[Hashable]] = []
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._where
+
+    @property
+    def ids(self) -> List[Hashable]:
+        return [item_id for list_ids in self._list_ids for item_id in list_ids]
+
+    def build(self, ids: Sequence[Hashable], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self._where = {}
+        self._trained_size = len(ids)
+        if len(ids) == 0:
+            self._centroids = np.empty((0, 0), dtype=np.float32)
+            self._lists, self._list_ids = [], []
+            return
+
+        nlist = self.nlist or max(1, int(np.sqrt(len(ids))))
+        nlist = min(nlist, len(ids))
+        self._centroids = self._train(vectors, nlist)
+
+        assignments = np.argmax(vectors @ self._centroids.T, axis=1)
+        self._lists, self._list_ids = [], []
+        for bucket in range(nlist):
+            rows = np.flatnonzero(assignments == bucket)
+            self._lists.append(np.ascontiguousarray(vectors[rows]))
+            self._list_ids.append([ids[row] for row in rows])
+            for pos, row in enumerate(rows):
+                self._where[ids[row]] = (bucket, pos)
+
+    def _train(self, vectors: np.ndarray, nlist: int) -> np.ndarray:
+        """Spherical k-means on a sample of the vectors."""
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(vectors), 64 * nlist)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(self.train_iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Keep the previous centroid for buckets that attracted no vectors
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]
+            norms[empty] = 1.0
+            centroids = sums / norms
+
+        return np.ascontiguousarray(centroids, dtype=np.float32)
+
+    def export(self) -> Tuple[List[Hashable], np.ndarray]:
+        ids = self.ids
+        if not ids:
+            return [], np.empty((0, 0), dtype=np.float32)
+        return ids, np.vstack([vectors for vectors in self._lists if len(vectors)])
+
+    def add(self, item_id: Hashable, vector: np.ndarray) -> None:
+        vector = np.asarray(vector, dtype=np.float32)
+        self.remove(item_id)
+
+        if len(self._centroids) == 0:
+            self.build([item_id], vector[np.newaxis, :])
+            return
+
+        bucket = int(np.argmax(self._centroids @ vector))
+        self._lists[bucket] = np.vstack([self._lists[bucket], vector]) if len(self._lists[bucket]) else vector[np.newaxis, :]
+        self._where[item_id] = (bucket, len(self._list_ids[bucket]))
+        self._list_ids[bucket].append(item_id)
+
+        # Centroids drift out of date as the index grows; retrain once it has doubled
+        if len(self._where) > 2 * max(self._trained_size, 1):
+            self.build(*self.export())
+
+    def remove(self, item_id: Hashable) -> bool:
+        location = self._where.pop(item_id, None)
+        if location is None:
+            return False
+
+        bucket, pos = location
+        list_ids = self._list_ids[bucket]
+        last = len(list_ids) - 1
+        if pos != last:
+            moved_id = list_ids[last]
+            self._lists[bucket][pos] = self._lists[bucket][last]
+            list_ids[pos] = moved_id
+            self._where[moved_id] = (bucket, pos)
+        list_ids.pop()
+        self._lists[bucket] = self._lists[bucket][:last]
+        return True
+
+    def search(self, queries: np.ndarray) -> List[Match]:
+        if len(self._where) == 0:
+            return [None] * len(queries)
+
+        nprobe = max(1, min(self.nprobe, len(self._centroids)))
+        centroid_sims = queries @ self._centroids.T
+        probes = np.argpartition(-centroid_sims, nprobe - 1, axis=1)[:, :nprobe]
+
+        results: List[Match] = []
+        for query, buckets in zip(queries, probes):
+            best: Match = None
+            for bucket in buckets:
+                vectors = self._lists[bucket]
+                if len(vectors) == 0:
+                    continue
+                sims = vectors @ query
+                pos = int(np.argmax(sims))
+                if best is None or sims[pos] > best[1]:
+                    best = (self._list_ids[bucket][pos], float(sims[pos]))
+            results.append(best)
+        return results
+
+
+def create_index(kind: str = "exact", **options):
+    """
+    Create an index by name
+
+    Args:
+        kind: "exact" or "ivf"
+        options: Keyword arguments for the index constructor
+    """
+    if kind == "exact":
+        return ExactIndex()
+    if kind == "ivf":
+        return IVFIndex(**options)
+    raise ValueError(f"Unknown index kind: {kind}")
@@ -0,0 +1,200 @@
+"""
+Detector Cascade Module
+Cheap first-stage face proposals that gate the expensive detector and embedder
+"""
+
+import threading
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+Rect = Tuple[int, int, int, int]  # x, y, w, h
+
+MODES = ("off", "haar", "downscale")
+
+
+@dataclass
+class _CameraStats:
+    frames: int = 0
+    fired: int = 0
+    proposals: int = 0
+    confirmed_frames: int = 0
+    faces: int = 0
+
+
+def _merge(rects: List[Rect]) -> List[Rect]:
+    """Union overlapping rectangles until none overlap."""
+    merged = list(rects)
+    changed = True
+    while changed:
+        changed = False
+        result: List[Rect] = []
+        for rect in merged:
+            for i, other in enumerate(result):
+                if (rect[0] < other[0] + other[2] and other[0] < rect[0] + rect[2] and
+                        rect[1] < other[1] + other[3] and other[1] < rect[1] + rect[3]):
+                    x1, y1 = min(rect[0], other[0]), min(rect[1], other[1])
+                    x2 = max(rect[0] + rect[2], other[0] + other[2])
+                    y2 = max(rect[1] + rect[3], other[1] + other[3])
+                    result[i] = (x1, y1, x2 - x1, y2 - y1)
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        merged = result
+    return merged
+
+
+class DetectorCascade:
+    """
+    Two-stage face detection, configurable per camera
+    A cheap first stage ("haar": OpenCV's Haar cascade on a small grayscale
+    copy, or "downscale": the regular detector on a heavily downscaled copy)
+    proposes face regions. The expensive detector, and so the embedder, only
+    runs on padded proposal regions, and frames with no proposal are skipped.
+    Per-camera counters give the first stage's fire rate and how often the
+    second stage confirms it, for tuning each camera's mode.
+    """
+
+    def __init__(self, mode: str = "off", camera_modes: Optional[Dict[Hashable, str]] = None,
+                 coarse_detect: Optional[Callable[[np.ndarray], List[Sequence[int]]]] = None,
+                 haar_width: int = 320, roi_padding: float = 0.5, max_roi_fraction: float = 0.6):
+        """
+        Initialize the cascade
+
+        Args:
+            mode: Default first stage, one of "off", "haar" or "downscale"
+            camera_modes: Per-camera overrides of the mode
+            coarse_detect: Full-resolution face boxes from a cheap detector pass, for "downscale"
+            haar_width: Width of the grayscale copy the Haar stage scans
+            roi_padding: Padding around each proposal, as a fraction of its size
+            max_roi_fraction: If proposals cover more of the frame than this, run on the whole frame
+        """
+        for value in [mode, *(camera_modes or {}).values()]:
+            if value not in MODES:
+                raise ValueError(f"Unknown cascade mode: {value}")
+        self.mode = mode
+        self.camera_modes = dict(camera_modes or {})
+        self.coarse_detect = coarse_detect
+        self.haar_width = haar_width
+        self.roi_padding = roi_padding
+        self.max_roi_fraction = max_roi_fraction
+        self._haar = None
+        # CascadeClassifier.detectMultiScale is not safe to call from several threads at once
+        self._haar_lock = threading.Lock()
+        self._stats: Dict[Hashable, _CameraStats] = {}
+        self._lock = threading.Lock()
+
+    def mode_for(self, camera_id: Optional[Hashable]) -> str:
+        return self.camera_modes.get(camera_id, self.mode)
+
+    def _haar_classifier(self):
+        if self._haar is None:
+            classifier = None
+            # Some OpenCV builds ship without the cascade module or its files
+            if hasattr(cv2, "CascadeClassifier"):
+                classifier = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+                if classifier.empty():
+                    classifier = None
+            if classifier is None:
+                print("⚠️ Haar cascade unavailable, using the downscale first stage")
+            self._haar = classifier or False
+        return self._haar or None
+
+    def _haar_boxes(self, frame: np.ndarray) -> List[Rect]:
+        classifier = self._haar_classifier()
+        if classifier is None:
+            return self._coarse_boxes(frame)
+
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.haar_width / float(width))
+        small = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA) if scale < 1.0 else frame
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        # Permissive settings: a false proposal costs one ROI, a miss costs a face
+        with self._haar_lock:
+            boxes = classifier.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=2, minSize=(12, 12))
+        return [tuple(int(round(v / scale)) for v in box) for box in boxes]
+
+    def _coarse_boxes(self, frame: np.ndarray) -> List[Rect]:
+        if self.coarse_detect is None:
+            raise RuntimeError("The downscale cascade stage needs a coarse detector")
+        return [tuple(int(v) for v in box) for box in self.coarse_detect(frame)]
+
+    def propose(self, camera_id: Optional[Hashable], frame: np.ndarray) -> Optional[List[Rect]]:
+        """
+        Regions the expensive detector should scan
+
+        Returns:
+            None to scan the whole frame (cascade off or proposals too large),
+            an empty list when the frame can be skipped, otherwise padded regions
+        """
+        mode = self.mode_for(camera_id)
+        if mode == "off":
+            return None
+
+        boxes = self._haar_boxes(frame) if mode == "haar" else self._coarse_boxes(frame)
+        height, width = frame.shape[:2]
+
+        regions = []
+        for x, y, w, h in boxes:
+            pad_x, pad_y = int(w * self.roi_padding), int(h * self.roi_padding)
+            x1, y1 = max(0, x - pad_x), max(0, y - pad_y)
+            x2, y2 = min(width, x + w + pad_x), min(height, y + h + pad_y)
+            if x2 > x1 and y2 > y1:
+                regions.append((x1, y1, x2 - x1, y2 - y1))
+        regions = _merge(regions)
+
+        with self._lock:
+            stats = self._stats.setdefault(camera_id, _CameraStats())
+            stats.frames += 1
+            if regions:
+                stats.fired += 1
+                stats.proposals += len(regions)
+
+        if sum(w * h for _, _, w, h in regions) > self.max_roi_fraction * width * height:
+            return None
+        return regions
+
+    def record(self, camera_id: Optional[Hashable], faces: int) -> None:
+        """Count what the second stage found after the first stage fired."""
+        if self.mode_for(camera_id) == "off":
+            return
+        with self._lock:
+            stats = self._stats.setdefault(camera_id, _CameraStats())
+            stats.faces += faces
+            if faces:
+                stats.confirmed_frames += 1
+
+    def detect(self, camera_id: Optional[Hashable], frame: np.ndarray,
+               detect: Callable[[np.ndarray], List[Dict]]) -> List[Dict]:
+        """Run `detect` only where the first stage fired and map faces back to frame coordinates."""
+        regions = self.propose(camera_id, frame)
+        if regions is None:
+            faces = detect(frame)
+        else:
+            faces = []
+            for x, y, w, h in regions:
+                for face in detect(frame[y:y + h, x:x + w]):
+                    fx, fy, fw, fh = face["bbox"]
+                    face["bbox"] = [fx + x, fy + y, fw, fh]
+                    faces.append(face)
+        if regions != []:
+            self.record(camera_id, len(faces))
+        return faces
+
+    def stats(self) -> Dict:
+        with self._lock:
+            per_camera = {}
+            for camera_id, stats in self._stats.items():
+                per_camera[str(camera_id)] = {
+                    "mode": self.mode_for(camera_id),
+                    "frames": stats.frames,
+                    "fire_rate": stats.fired / stats.frames if stats.frames else None,
+                    "confirm_rate": stats.confirmed_frames / stats.fired if stats.fired else None,
+                    "proposals": stats.proposals,
+                    "faces": stats.faces,
+                }
+        return {"mode": self.mode, "cameras": per_camera}
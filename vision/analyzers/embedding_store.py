@@ -0,0 +1,149 @@
+"""
+Embedding Store Module
+Persists known-person face embeddings on disk, keyed by photo checksum
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file, matching the photo_checksum computed by the backend."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Checksum-keyed embedding cache
+    Embeddings are kept in a single .npy matrix that is memory-mapped on load,
+    with a JSON index mapping each photo checksum to its row
+    """
+
+    MATRIX_FILE = "embeddings.npy"
+    INDEX_FILE = "index.json"
+
+    def __init__(self, path: str = "./embedding_cache", model_name: str = "SFace"):
+        """
+        Initialize the store
+
+        Args:
+            path: Directory holding the matrix and index files
+            model_name: Model that produced the embeddings; a mismatch invalidates the cache
+        """
+        self.path = path
+        self.model_name = model_name
+        self._matrix: Optional[np.ndarray] = None
+        self._rows: Dict[str, int] = {}
+        self._pending: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    def __contains__(self, checksum: str) -> bool:
+        return checksum in self._pending or checksum in self._rows
+
+    @property
+    def _matrix_path(self) -> str:
+        return os.path.join(self.path, self.MATRIX_FILE)
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.path, self.INDEX_FILE)
+
+    def load(self) -> int:
+        """
+        Memory-map the stored embeddings
+
+        Returns:
+            Number of cached embeddings available
+        """
+        self._matrix = None
+        self._rows = {}
+        self._pending = {}
+
+        if not (os.path.exists(self._matrix_path) and os.path.exists(self._index_path)):
+            return 0
+
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("model") != self.model_name:
+                print(f"⚠️ Embedding cache was built with {index.get('model')}, ignoring it")
+                return 0
+
+            matrix = np.load(self._matrix_path, mmap_mode="r")
+            checksums = index.get("checksums", [])
+            if matrix.ndim != 2 or matrix.shape[0] != len(checksums):
+                print("⚠️ Embedding cache index does not match matrix, ignoring it")
+                return 0
+        except Exception as e:
+            print(f"⚠️ Failed to load embedding cache: {e}")
+            return 0
+
+        self._matrix = matrix
+        self._rows = {checksum: row for row, checksum in enumerate(checksums)}
+        return len(self._rows)
+
+    def get(self, checksum: str) -> Optional[np.ndarray]:
+        """Return the embedding cached for a checksum, or None."""
+        if checksum in self._pending:
+            return self._pending[checksum]
+        row = self._rows.get(checksum)
+        if row is None or self._matrix is None:
+            return None
+        return np.asarray(self._matrix[row], dtype=np.float32)
+
+    def take(self, checksums: List[str]) -> np.ndarray:
+        """Gather the embeddings of several cached checksums into one matrix."""
+        if not checksums:
+            return np.empty((0, 0), dtype=np.float32)
+        if all(checksum in self._rows for checksum in checksums) and self._matrix is not None:
+            rows = np.fromiter((self._rows[c] for c in checksums), dtype=np.int64, count=len(checksums))
+            return np.asarray(self._matrix[rows], dtype=np.float32)
+        return np.stack([self.get(checksum) for checksum in checksums])
+
+    def put(self, checksum: str, embedding: np.ndarray) -> None:
+        """Stage a new embedding; it is written to disk on the next save()."""
+        self._pending[checksum] = np.asarray(embedding, dtype=np.float32)
+
+    def save(self, keep: Optional[Iterable[str]] = None) -> None:
+        """
+        Write the store to disk and re-map it
+
+        Args:
+            keep: Checksums to retain; embeddings for any other checksum are dropped.
+                  Keeps everything when omitted.
+        """
+        known = list(self._rows) + [c for c in self._pending if c not in self._rows]
+        if keep is not None:
+            keep_set = set(keep)
+            checksums = [c for c in known if c in keep_set]
+        else:
+            checksums = known
+
+        if not self._pending and len(checksums) == len(self._rows):
+            return  # Nothing changed since the last load
+
+        os.makedirs(self.path, exist_ok=True)
+        matrix = self.take(checksums)
+
+        # Write to temp files and swap them in so a crash never leaves a torn cache
+        tmp_matrix = self._matrix_path + ".tmp"
+        tmp_index = self._index_path + ".tmp"
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, matrix)
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "checksums": checksums}, f)
+
+        # Drop the old mapping before replacing the file underneath it
+        self._matrix = None
+        os.replace(tmp_matrix, self._matrix_path)
+        os.replace(tmp_index, self._index_path)
+        self.load()
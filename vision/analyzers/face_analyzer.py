@@ -4,11 +4,24 @@ Handles face detection, encoding, and recognition using DeepFace
 """
 
 from deepface import DeepFace
+from deepface.commons import distance as dst, functions
 import numpy as np
 import cv2
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import httpx
+import asyncio
 import os
+import shutil
+import threading
+import time
+from contextlib import nullcontext
+
+from .embedding_store import EmbeddingStore, file_checksum
+from .face_gallery import FaceGallery
+from .face_quality import FaceQualityGate
+from .detector_cascade import DetectorCascade
+from .face_tracker import FaceTracker
+from .zone_filter import ZoneFilter
 
 
 class FaceAnalyzer:
@@ -25,76 +38,391 @@ class FaceAnalyzer:
             backend_url: URL of the backend API to fetch known persons
         """
         self.model_name = "SFace"
+        self.detector_backend = os.getenv("FACE_DETECTOR", "opencv")
         self.backend_url = backend_url or os.getenv("BACKEND_URL", "http://localhost:8000")
-        self.known_persons = {}  # Cache of known persons {id: {name, type, path}}
-        self.db_path = "./known_faces"  # Local cache directory for DeepFace
+        self.known_persons = {}  # Cache of known persons {id: {name, type, path, photo, checksum}}
+        self.db_path = "./known_faces"  # Local cache directory for downloaded photos
+        self.persons_source = None  # "backend" or "filesystem", whichever loaded known_persons
+        # Photo download tuning for (re)loading large watchlists
+        self.download_concurrency = int(os.getenv("PHOTO_DOWNLOAD_CONCURRENCY", "16"))
+        self.download_retries = int(os.getenv("PHOTO_DOWNLOAD_RETRIES", "3"))
+        self.download_backoff = float(os.getenv("PHOTO_DOWNLOAD_BACKOFF", "0.5"))
+        # Embeddings of all known persons, matched in one vectorized pass per frame
+        self.gallery = FaceGallery(
+            threshold=dst.findThreshold(self.model_name, "cosine"),
+            index=os.getenv("FACE_INDEX", "auto"),
+            ann_min_size=int(os.getenv("FACE_ANN_MIN_SIZE", "10000")),
+            nprobe=int(os.getenv("FACE_ANN_NPROBE", "8"))
+        )
+        self.target_size = functions.find_target_size(model_name=self.model_name)
+        # Two-resolution pipeline: detect on a downscaled copy, embed native-resolution crops
+        self.detection_scale = float(os.getenv("DETECT_SCALE", "1.0"))
+        self.detection_scales = _parse_camera_scales(os.getenv("DETECT_SCALE_CAMERAS", ""))
+        self.crop_padding = 0.25
+        # Per-camera face tracks; known tracks reuse their identity instead of re-embedding
+        self.tracker = FaceTracker(
+            iou_threshold=float(os.getenv("TRACK_IOU_THRESHOLD", "0.3")),
+            max_misses=int(os.getenv("TRACK_MAX_MISSES", "5")),
+            reembed_interval=int(os.getenv("TRACK_REEMBED_INTERVAL", "10")),
+            # Defaults to the recognition cutoff, so any accepted match can be reused
+            min_confidence=float(os.getenv("TRACK_MIN_CONFIDENCE") or 1.0 - self.gallery.threshold)
+        ) if os.getenv("FACE_TRACKING", "true").lower() == "true" else None
+        # Quality thresholds a face must pass before it is embedded
+        self.quality_gate = FaceQualityGate(
+            min_size=int(os.getenv("FACE_MIN_SIZE", "40")),
+            min_sharpness=float(os.getenv("FACE_MIN_SHARPNESS", "30")),
+            min_brightness=float(os.getenv("FACE_MIN_BRIGHTNESS", "40")),
+            max_brightness=float(os.getenv("FACE_MAX_BRIGHTNESS", "220")),
+            max_pose=float(os.getenv("FACE_MAX_POSE", "0.4"))
+        ) if os.getenv("FACE_QUALITY_GATE", "true").lower() == "true" else None
+        # Cheap first-stage detector; the expensive detector only scans where it fired
+        self.cascade_scale = float(os.getenv("FACE_CASCADE_SCALE", "0.25"))
+        self.cascade = DetectorCascade(
+            mode=os.getenv("FACE_CASCADE", "off"),
+            camera_modes=_parse_camera_modes(os.getenv("FACE_CASCADE_CAMERAS", "")),
+            coarse_detect=lambda frame: [face["bbox"] for face in self.detect_faces(frame, self.cascade_scale)],
+            roi_padding=float(os.getenv("FACE_CASCADE_PADDING", "0.5"))
+        )
+        # Camera zone polygons; detection only runs inside them
+        self.zones = ZoneFilter(
+            backend_url=self.backend_url,
+            refresh_seconds=float(os.getenv("ZONE_REFRESH_SECONDS", "60"))
+        ) if os.getenv("ZONE_FILTER", "true").lower() == "true" else None
+        # Embeddings persisted across restarts, keyed by photo checksum
+        self.embedding_store = EmbeddingStore(
+            path=os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache"),
+            model_name=self.model_name
+        )
+        # Optional services.metrics.Metrics receiving per-stage timings
+        self.metrics = None
+        # DeepFace keeps one cached detector and SFace (cv2.dnn) model per process,
+        # which is not safe to run from several inference threads at once
+        self._model_lock = threading.Lock()
         
     async def load_known_persons(self):
         """
         Load known persons from backend API.
-        Downloads face photos and stores them locally for DeepFace recognition.
+        Embeddings are looked up by photo checksum in the persistent store;
+        only photos with an unseen checksum are downloaded and embedded.
+        Downloads run concurrently over a pooled keep-alive client.
+        The new persons and gallery are built aside and swapped in together,
+        so matching keeps using the previous ones until the load completes.
         """
+        known_persons = {}
+        self.embedding_store.load()
+        timings = {}
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._photo_client() as client:
+                started = time.perf_counter()
                 response = await client.get(
                     f"{self.backend_url}/api/v1/persons",
                     timeout=10.0
                 )
+                timings["fetch_persons"] = time.perf_counter() - started
                 
                 if response.status_code == 200:
-                    persons = response.json()
+                    persons = [person for person in response.json() if person.get("photo_path")]
                     
                     # Create local cache directory
                     os.makedirs(self.db_path, exist_ok=True)
                     
-                    for person in persons:
+                    cached_ids, cached_checksums = [], []
+                    fresh_ids, fresh_embeddings = [], []
+                    pending = []  # (person_id, person, info) needing a fresh embedding
+                    
+                    # Hashes legacy photos on disk, so keep it off the event loop
+                    infos = await asyncio.to_thread(lambda: [self._person_info(person) for person in persons])
+                    
+                    for person, info in zip(persons, infos):
                         person_id = person.get("id")
-                        person_name = person.get("name")
-                        photo_path = person.get("photo_path")
+                        checksum = info["checksum"]
                         
-                        if photo_path:
-                            # Create person directory (DeepFace uses folder name as identity)
-                            person_dir = os.path.join(self.db_path, person_name)
-                            os.makedirs(person_dir, exist_ok=True)
-                            
-                            # Download photo from backend
-                            photo_url = f"{self.backend_url}{photo_path}"
-                            local_photo = os.path.join(person_dir, f"photo{os.path.splitext(photo_path)[1] or '.jpg'}")
-                            
-                            # Only download if not already cached
-                            if not os.path.exists(local_photo):
-                                try:
-                                    photo_response = await client.get(photo_url, timeout=10.0)
-                                    if photo_response.status_code == 200:
-                                        with open(local_photo, "wb") as f:
-                                            f.write(photo_response.content)
-                                        print(f"  📸 Downloaded photo for {person_name}")
-                                except Exception as e:
-                                    print(f"  ⚠️ Failed to download photo for {person_name}: {e}")
-                                    continue
-                            
-                            # Store person info
-                            self.known_persons[person_id] = {
-                                "name": person_name,
-                                "type": person.get("type", "NORMAL"),
-                                "path": person_dir
-                            }
-                            
-                    print(f"✅ Loaded {len(self.known_persons)} known persons from database")
+                        if checksum and checksum in self.embedding_store:
+                            # Unchanged photo: reuse the stored embedding, no download
+                            cached_ids.append(person_id)
+                            cached_checksums.append(checksum)
+                            known_persons[person_id] = info
+                        else:
+                            pending.append((person_id, person, info))
+                    
+                    started = time.perf_counter()
+                    downloaded = await self._download_photos(client, [
+                        (person["photo_path"], info) for _, person, info in pending
+                    ])
+                    timings["download"] = time.perf_counter() - started
+                    
+                    started = time.perf_counter()
+                    for (person_id, _, info), ok in zip(pending, downloaded):
+                        # Skip persons whose photo could not be downloaded
+                        if not ok:
+                            continue
+                        known_persons[person_id] = info
+                        # Model inference; keep the event loop serving /analyze meanwhile
+                        embedding = await asyncio.to_thread(self._embed_person, info)
+                        if embedding is not None:
+                            fresh_ids.append(person_id)
+                            fresh_embeddings.append(embedding)
+                    timings["embed"] = time.perf_counter() - started
+                    
+                    started = time.perf_counter()
+                    self._build_gallery(known_persons, cached_ids, cached_checksums, fresh_ids, fresh_embeddings)
+                    timings["build_gallery"] = time.perf_counter() - started
+                    
+                    self.persons_source = "backend"
+                    print(f"✅ Loaded {len(self.known_persons)} known persons from database "
+                          f"({len(cached_ids)} from cache, {len(fresh_ids)} embedded)")
+                    print("⏱️ Load phases: " + ", ".join(
+                        f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in timings.items()
+                    ))
                 else:
                     print(f"⚠️ Failed to load persons from backend: {response.status_code}")
-                    self._load_from_filesystem()
+                    await self._fallback_to_filesystem()
                     
         except Exception as e:
             print(f"⚠️ Error loading known persons: {e}")
-            # Fallback to file system if API fails
-            self._load_from_filesystem()
+            await self._fallback_to_filesystem()
+    
+    async def _fallback_to_filesystem(self):
+        """Load persons from ./known_faces unless a previous load is still being served."""
+        if self.persons_source is not None:
+            print(f"⚠️ Keeping the {len(self.known_persons)} persons already loaded")
+            return
+        await asyncio.to_thread(self._load_from_filesystem)
+    
+    async def sync_known_persons(self) -> Dict[str, int]:
+        """
+        Incrementally sync known persons with the backend.
+        Compares the backend list against the loaded persons by photo checksum
+        and applies only the added, updated and deleted persons to the gallery.
+        
+        Returns:
+            Counts of added, updated, removed and unchanged persons
+        """
+        if self.persons_source != "backend":
+            # Nothing keyed by backend id to diff against yet
+            await self.load_known_persons()
+            return {"added": len(self.known_persons), "updated": 0, "removed": 0, "unchanged": 0}
+        
+        async with self._photo_client() as client:
+            response = await client.get(
+                f"{self.backend_url}/api/v1/persons",
+                timeout=10.0
+            )
+            response.raise_for_status()
+            persons = {
+                person.get("id"): person
+                for person in response.json()
+                if person.get("photo_path")
+            }
+            
+            summary = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+            os.makedirs(self.db_path, exist_ok=True)
+            
+            for person_id in [pid for pid in self.known_persons if pid not in persons]:
+                self._forget_person(person_id)
+                summary["removed"] += 1
+            
+            infos = await asyncio.to_thread(
+                lambda: {person_id: self._person_info(person) for person_id, person in persons.items()}
+            )
+            changed = []  # (person_id, person, info, current) whose photo changed or is new
+            for person_id, person in persons.items():
+                info = infos[person_id]
+                current = self.known_persons.get(person_id)
+                
+                if current is not None and current["checksum"] and current["checksum"] == info["checksum"]:
+                    if current["name"] != info["name"] or current["type"] != info["type"]:
+                        # Metadata-only edit: the embedding stays valid
+                        self.known_persons[person_id] = {**info, "path": current["path"], "photo": current["photo"]}
+                        summary["updated"] += 1
+                    else:
+                        summary["unchanged"] += 1
+                    continue
+                changed.append((person_id, person, info, current))
+            
+            # Only photos whose embedding is not stored yet need to be fetched
+            needs_photo = [
+                not (info["checksum"] and info["checksum"] in self.embedding_store)
+                for _, _, info, _ in changed
+            ]
+            downloaded = iter(await self._download_photos(client, [
+                (person["photo_path"], info)
+                for (_, person, info, _), needed in zip(changed, needs_photo) if needed
+            ]))
+            
+            for (person_id, person, info, current), needed in zip(changed, needs_photo):
+                if needed:
+                    # Model inference; keep the event loop serving /analyze meanwhile
+                    embedding = await asyncio.to_thread(self._embed_person, info) if next(downloaded) else None
+                else:
+                    embedding = self.embedding_store.get(info["checksum"])
+                
+                if current is not None and current["path"] != info["path"]:
+                    self._remove_photo_dir(person_id, current["path"])
+                
+                self.known_persons[person_id] = info
+                if embedding is None:
+                    self.gallery.remove(person_id)
+                else:
+                    self.gallery.add(person_id, embedding)
+                summary["added" if current is None else "updated"] += 1
+        
+        if summary["added"] or summary["updated"] or summary["removed"]:
+            self._save_embedding_store()
+            # Tracks may carry identities that no longer exist or have changed
+            if self.tracker:
+                self.tracker.reset()
+        return summary
+    
+    def _person_info(self, person: Dict) -> Dict:
+        """
+        Build the known_persons entry for a backend person record.
+        Persons enrolled before the backend stored photo checksums have none;
+        their photo is identified by the checksum of its local copy instead.
+        """
+        person_name = person.get("name")
+        photo_path = person.get("photo_path")
+        person_dir = os.path.join(self.db_path, _dir_name(person_name, person.get("id")))
+        photo = os.path.join(person_dir, f"photo{os.path.splitext(photo_path)[1] or '.jpg'}")
+        checksum = person.get("photo_checksum")
+        if not checksum and os.path.exists(photo):
+            checksum = file_checksum(photo)
+        return {
+            "name": person_name,
+            "type": person.get("type", "NORMAL"),
+            "path": person_dir,
+            "photo": photo,
+            "checksum": checksum
+        }
+    
+    def _photo_client(self) -> httpx.AsyncClient:
+        """HTTP client whose keep-alive pool matches the download concurrency."""
+        return httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=self.download_concurrency,
+            max_keepalive_connections=self.download_concurrency
+        ))
+    
+    async def _download_photos(self, client: httpx.AsyncClient, jobs: List[Tuple[str, Dict]]) -> List[bool]:
+        """
+        Download photos concurrently, at most download_concurrency at a time.
+        
+        Args:
+            client: Shared HTTP client
+            jobs: (photo_path, person info) pairs
+            
+        Returns:
+            Whether a usable local photo exists for each job, in job order
+        """
+        if not jobs:
+            return []
+        
+        semaphore = asyncio.Semaphore(self.download_concurrency)
+        total = len(jobs)
+        step = max(1, total // 10)
+        done = 0
+        
+        async def fetch(photo_path: str, info: Dict) -> bool:
+            nonlocal done
+            async with semaphore:
+                # A stale file is only trusted when the backend has no checksum for it
+                if not info["checksum"] and os.path.exists(info["photo"]):
+                    ok = True
+                else:
+                    ok = await self._download_photo(client, photo_path, info)
+            done += 1
+            if done % step == 0 or done == total:
+                print(f"  📸 Photos {done}/{total}")
+            return ok
+        
+        return await asyncio.gather(*(fetch(photo_path, info) for photo_path, info in jobs))
+    
+    async def _download_photo(self, client: httpx.AsyncClient, photo_path: str, info: Dict) -> bool:
+        """
+        Download one photo with retry and exponential backoff.
+        The file is written to a temporary name and renamed into place, so a
+        partial download never replaces a good photo.
+        """
+        person_name = info["name"]
+        photo_url = f"{self.backend_url}{photo_path}"
+        error = None
+        
+        for attempt in range(self.download_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.download_backoff * (2 ** (attempt - 1)))
+            try:
+                photo_response = await client.get(photo_url, timeout=10.0)
+            except httpx.HTTPError as e:
+                error = str(e) or type(e).__name__
+                continue
+            
+            if photo_response.status_code == 200:
+                os.makedirs(info["path"], exist_ok=True)
+                partial = info["photo"] + ".part"
+                with open(partial, "wb") as f:
+                    f.write(photo_response.content)
+                os.replace(partial, info["photo"])
+                return True
+            
+            error = f"HTTP {photo_response.status_code}"
+            # Client errors will not fix themselves on retry
+            if photo_response.status_code < 500 and photo_response.status_code != 429:
+                break
+        
+        print(f"  ⚠️ Failed to download photo for {person_name}: {error}")
+        return False
+    
+    def _embed_person(self, info: Dict) -> Optional[np.ndarray]:
+        """
+        Embed a person's local photo.
+        New embeddings are staged in the embedding store under the photo checksum.
+        """
+        if not info["checksum"]:
+            # Freshly downloaded photo without a backend checksum
+            info["checksum"] = file_checksum(info["photo"])
+        embedding = self._embed_photo(info["photo"])
+        if embedding is None:
+            print(f"  ⚠️ No face found in photo for {info['name']}")
+        elif info["checksum"]:
+            self.embedding_store.put(info["checksum"], embedding)
+        return embedding
+    
+    def _forget_person(self, person_id) -> None:
+        """Drop a deleted person from the gallery, the cache and ./known_faces."""
+        info = self.known_persons.pop(person_id)
+        self.gallery.remove(person_id)
+        self._remove_photo_dir(person_id, info["path"])
+        print(f"  🗑️ Removed {info['name']} from known persons")
+    
+    def _remove_photo_dir(self, person_id, person_dir: str) -> None:
+        """Delete a person's photo directory unless another known person shares it."""
+        if any(info["path"] == person_dir for pid, info in self.known_persons.items() if pid != person_id):
+            return
+        # Never delete db_path itself or anything outside it
+        root = os.path.realpath(self.db_path)
+        target = os.path.realpath(person_dir)
+        if target == root or os.path.commonpath([root, target]) != root:
+            print(f"  ⚠️ Refusing to delete {person_dir}: not inside {self.db_path}")
+            return
+        shutil.rmtree(target, ignore_errors=True)
+    
+    def _save_embedding_store(self) -> None:
+        """Persist the embedding store, keeping only checksums still in use."""
+        try:
+            self.embedding_store.save(keep=[
+                info["checksum"] for info in self.known_persons.values() if info.get("checksum")
+            ])
+        except Exception as e:
+            print(f"⚠️ Failed to persist embedding cache: {e}")
     
     def _load_from_filesystem(self):
         """
         Fallback: Load known persons from file system
         Used when backend API is unavailable
         """
+        known_persons = {}
+        cached_ids, cached_checksums = [], []
+        fresh_ids, fresh_embeddings = [], []
+        
         if os.path.exists(self.db_path):
             for person_name in os.listdir(self.db_path):
                 person_dir = os.path.join(self.db_path, person_name)
@@ -103,40 +431,108 @@ class FaceAnalyzer:
                     images = [f for f in os.listdir(person_dir) 
                               if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
                     if images:
-                        self.known_persons[person_name] = {
+                        photo = os.path.join(person_dir, sorted(images)[0])
+                        checksum = file_checksum(photo)
+                        known_persons[person_name] = {
                             "name": person_name,
                             "type": "UNKNOWN",
-                            "path": person_dir
+                            "path": person_dir,
+                            "photo": photo,
+                            "checksum": checksum
                         }
+                        
+                        if checksum in self.embedding_store:
+                            cached_ids.append(person_name)
+                            cached_checksums.append(checksum)
+                            continue
+                        
+                        embedding = self._embed_photo(photo)
+                        if embedding is None:
+                            print(f"  ⚠️ No face found in photo for {person_name}")
+                            continue
+                        fresh_ids.append(person_name)
+                        fresh_embeddings.append(embedding)
+                        self.embedding_store.put(checksum, embedding)
+            
+            self._build_gallery(known_persons, cached_ids, cached_checksums, fresh_ids, fresh_embeddings)
+            self.persons_source = "filesystem"
             print(f"📁 Loaded {len(self.known_persons)} persons from filesystem (fallback)")
     
-    def analyze(self, frame: np.ndarray) -> List[Dict]:
+    def _build_gallery(self, known_persons: Dict, cached_ids: List, cached_checksums: List[str],
+                       fresh_ids: List, fresh_embeddings: List[np.ndarray]):
+        """
+        Rebuild the in-memory gallery from cached and freshly computed embeddings
+        and swap it in with its persons, then persist the store keeping only
+        checksums still in use.
+        """
+        matrices = []
+        if cached_ids:
+            matrices.append(self.embedding_store.take(cached_checksums))
+        if fresh_ids:
+            matrices.append(np.stack(fresh_embeddings))
+        
+        # Build before swapping anything, so a failure leaves the previous state intact
+        ids = cached_ids + fresh_ids
+        embeddings = np.vstack(matrices) if matrices else np.empty((0, 0), dtype=np.float32)
+        self.gallery.build(ids, embeddings)
+        self.known_persons = known_persons
+        if self.tracker:
+            self.tracker.reset()
+        
+        self._save_embedding_store()
+        print(f"🧬 Gallery holds {len(self.gallery)} face embeddings")
+    
+    def _embed_photo(self, photo_path: str) -> Optional[np.ndarray]:
+        """Embed the first face found in an enrollment photo."""
+        try:
+            results = self._represent(
+                img_path=photo_path,
+                model_name=self.model_name,
+                enforce_detection=False,
+                detector_backend=self.detector_backend
+            )
+        except Exception as e:
+            print(f"  ⚠️ Failed to embed {photo_path}: {e}")
+            return None
+        
+        if not results:
+            return None
+        return np.asarray(results[0]["embedding"], dtype=np.float32)
+    
+    def analyze(self, frame: np.ndarray, camera_id: Optional[int] = None,
+                scale: Optional[float] = None) -> List[Dict]:
         """
         Analyze a frame for faces.
         If known persons exist, performs recognition. Otherwise, just detects faces.
         
         Args:
             frame: Video frame as numpy array (BGR format)
+            camera_id: Source camera; enables tracking so known tracks skip re-embedding
+            scale: Detection downscale factor overriding the camera's, e.g. under load
             
         Returns:
-            List of detection dicts with type, person_name, confidence, bbox
+            List of detection dicts with type, person_name, confidence, bbox, track_id
         """
         detections = []
         
         try:
-            if self.known_persons and os.path.exists(self.db_path):
+            if len(self.gallery) > 0:
                 # We have known persons — do recognition
-                detections = self._recognize_faces(frame)
+                detections = self._recognize_faces(frame, camera_id, scale)
             else:
                 # No known persons — just detect faces as "Unknown"
-                faces = self.detect_faces(frame)
-                for face in faces:
+                scale = self._effective_scale(scale, camera_id)
+                with self._timed("detection", camera_id):
+                    faces = self._detect_in_zones(frame, camera_id, lambda region: self.detect_faces(region, scale))
+                tracks = self._track(camera_id, faces)
+                for face, track in zip(faces, tracks):
                     detections.append({
                         "type": "unknown_face",
                         "person_name": "Unknown",
                         "person_type": "UNKNOWN",
                         "confidence": face.get("confidence", 0.0),
-                        "bbox": face["bbox"]
+                        "bbox": face["bbox"],
+                        "track_id": track.track_id if track else None
                     })
                     
         except Exception as e:
@@ -144,76 +540,327 @@ class FaceAnalyzer:
         
         return detections
     
-    def _recognize_faces(self, frame: np.ndarray) -> List[Dict]:
-        """Run DeepFace.find to recognize faces against known persons DB."""
-        detections = []
+    def analyze_batch(self, frames: List[np.ndarray], camera_ids: Optional[List[int]] = None,
+                      scales: Optional[List[Optional[float]]] = None) -> List[List[Dict]]:
+        """
+        Analyze several frames in one call.
+        Faces from all frames are matched against the gallery in a single pass.
         
-        try:
-            results = DeepFace.find(
-                img_path=frame,
-                db_path=self.db_path,
-                enforce_detection=False,
-                silent=True,
-                model_name=self.model_name
-            )
+        Args:
+            frames: Video frames as numpy arrays (BGR format)
+            camera_ids: Source camera of each frame, for tracking
+            scales: Per-frame detection downscale overrides (None keeps the camera's)
             
-            for df in results:
-                if not df.empty:
-                    row = df.iloc[0]
-                    
-                    # Extract person name from path (folder name = person name)
-                    identity_path = row['identity']
-                    person_name = identity_path.split(os.sep)[-2]
-                    
-                    # Find person info from cache
-                    person_info = None
-                    for pid, info in self.known_persons.items():
-                        if info["name"] == person_name:
-                            person_info = info
-                            break
-                    
-                    detection = {
-                        "type": "person_detected" if person_info else "unknown_face",
-                        "person_name": person_name,
-                        "person_type": person_info.get("type", "UNKNOWN") if person_info else "UNKNOWN",
-                        "confidence": float(1.0 - row.get('distance', 0.0)),
-                        "bbox": [
-                            int(row['source_x']),
-                            int(row['source_y']),
-                            int(row['source_w']),
-                            int(row['source_h'])
-                        ]
-                    }
-                    
-                    detections.append(detection)
-                    
+        Returns:
+            One list of detection dicts per input frame, in input order
+        """
+        camera_ids = camera_ids or [None] * len(frames)
+        scales = scales or [None] * len(frames)
+        if len(self.gallery) == 0:
+            return [self.analyze(frame, camera_id, scale) for frame, camera_id, scale in zip(frames, camera_ids, scales)]
+        
+        try:
+            return self._recognize_batch(frames, camera_ids, scales)
+        except Exception as e:
+            print(f"❌ Face analysis error: {e}")
+            return [[] for _ in frames]
+    
+    def _recognize_faces(self, frame: np.ndarray, camera_id: Optional[int] = None,
+                         scale: Optional[float] = None) -> List[Dict]:
+        """Embed every face in the frame once and match them against the gallery."""
+        try:
+            return self._recognize_batch([frame], [camera_id], [scale])[0]
         except Exception as e:
             print(f"❌ Face recognition error: {e}")
+            return []
+    
+    def _recognize_batch(self, frames: List[np.ndarray], camera_ids: List[Optional[int]],
+                         scales: Optional[List[Optional[float]]] = None) -> List[List[Dict]]:
+        """
+        Detect the faces of every frame, embed those whose track needs a fresh
+        identity and that pass the quality gate, and match all new embeddings
+        with one gallery search.
+        """
+        frame_faces = []
+        frame_tracks = []
+        crops = []
+        owners = []  # (frame index, face index) of each crop
+        rejected = {}  # (frame index, face index) -> quality rejection reason
         
-        return detections
+        scales = scales or [None] * len(frames)
+        for i, (frame, camera_id) in enumerate(zip(frames, camera_ids)):
+            try:
+                scale = self._effective_scale(scales[i], camera_id)
+                with self._timed("detection", camera_id):
+                    faces = self._detect_in_zones(frame, camera_id, lambda region: self._detect_aligned(region, scale))
+            except Exception as e:
+                print(f"❌ Face recognition error: {e}")
+                faces = []
+            tracks = self._track(camera_id, faces)
+            frame_faces.append(faces)
+            frame_tracks.append(tracks)
+            
+            for j, (face, track) in enumerate(zip(faces, tracks)):
+                if track is None or self.tracker.needs_embedding(track):
+                    reason = self._quality_rejection(face, camera_id)
+                    if reason:
+                        rejected[(i, j)] = reason
+                        continue
+                    crops.append(face["crop"])
+                    owners.append((i, j))
+        
+        matches = {}
+        if crops:
+            # DeepFace embeds one crop per call; matching is one pass for the whole batch
+            batch_camera = camera_ids[0] if len(set(camera_ids)) == 1 else "batch"
+            with self._timed("embedding", batch_camera):
+                embeddings = self._embed_crops(crops)
+            with self._timed("matching", batch_camera):
+                batch_matches = self.gallery.match(embeddings)
+            for owner, match in zip(owners, batch_matches):
+                matches[owner] = match
+                track = frame_tracks[owner[0]][owner[1]]
+                if track is not None:
+                    self.tracker.assign(track, match)
+        
+        results = []
+        for i, (faces, tracks) in enumerate(zip(frame_faces, frame_tracks)):
+            detections = []
+            for j, (face, track) in enumerate(zip(faces, tracks)):
+                if (i, j) in rejected and (track is None or not track.embedded):
+                    # Nothing known about this face yet and this crop is not worth embedding
+                    detection = self._rejected_detection(face, rejected[(i, j)])
+                else:
+                    match = matches[(i, j)] if (i, j) in matches else self.tracker.reuse(track)
+                    detection = self._to_detection(face, match)
+                detection["track_id"] = track.track_id if track else None
+                detections.append(detection)
+            results.append(detections)
+        return results
+    
+    def _detect_in_zones(self, frame: np.ndarray, camera_id: Optional[int], detect) -> List[Dict]:
+        """
+        Run a detector on the camera's zone region only and map faces back to
+        full-frame coordinates, dropping faces outside every zone. Within the
+        region the detector cascade narrows detection further.
+        """
+        if self.zones is None:
+            return self._cascade_detect(frame, camera_id, detect)
+        
+        region, (offset_x, offset_y) = self.zones.crop(camera_id, frame)
+        if region.size == 0:
+            return []
+        
+        faces = []
+        for face in self._cascade_detect(region, camera_id, detect):
+            x, y, w, h = face["bbox"]
+            face["bbox"] = [x + offset_x, y + offset_y, w, h]
+            if self.zones.contains(camera_id, face["bbox"], frame.shape):
+                faces.append(face)
+        return faces
+    
+    def _cascade_detect(self, frame: np.ndarray, camera_id: Optional[int], detect) -> List[Dict]:
+        """Run the detector only on regions the cascade's first stage proposes."""
+        if self.cascade.mode_for(camera_id) == "off":
+            return detect(frame)
+        return self.cascade.detect(camera_id, frame, detect)
+    
+    def _quality_rejection(self, face: Dict, camera_id: Optional[int]) -> Optional[str]:
+        """Why a face should not be embedded, or None when it passes the quality gate."""
+        if self.quality_gate is None:
+            return None
+        reason = self.quality_gate.check(face["crop"], face["bbox"], face.get("landmarks"))
+        if reason and self.metrics is not None:
+            self.metrics.inc("vision_quality_rejected_total", reason=reason, camera_id=camera_id)
+        return reason
+    
+    def _rejected_detection(self, face: Dict, reason: str) -> Dict:
+        """Detection for a face the quality gate kept away from the embedding model."""
+        return {
+            "type": "low_quality_face",
+            "person_name": "Unknown",
+            "person_type": "UNKNOWN",
+            "confidence": face["confidence"],
+            "bbox": face["bbox"],
+            "rejected": reason
+        }
+    
+    def _timed(self, stage: str, camera_id: Optional[int] = None):
+        """Time a block into the attached metrics registry, if any."""
+        return self.metrics.time(stage, camera_id) if self.metrics is not None else nullcontext()
+    
+    def _track(self, camera_id: Optional[int], faces: List[Dict]) -> List:
+        """Associate faces with camera tracks; no tracks when tracking is off or the camera is unknown."""
+        if self.tracker is None or camera_id is None:
+            return [None] * len(faces)
+        return self.tracker.update(camera_id, [face["bbox"] for face in faces])
+    
+    def detection_scale_for(self, camera_id: Optional[int]) -> float:
+        """Detection downscale factor for a camera (1.0 = full resolution)."""
+        return self.detection_scales.get(camera_id, self.detection_scale)
+
+    def _effective_scale(self, scale: Optional[float], camera_id: Optional[int]) -> float:
+        """The smaller of an admission downsample and the camera's own scale, so neither is lost."""
+        camera_scale = self.detection_scale_for(camera_id)
+        return min(scale, camera_scale) if scale else camera_scale
+
+    def _to_detection(self, face: Dict, match: Optional[Tuple]) -> Dict:
+        """Build a detection dict from a detected face and its gallery match."""
+        if match is None:
+            return {
+                "type": "unknown_face",
+                "person_name": "Unknown",
+                "person_type": "UNKNOWN",
+                "confidence": face["confidence"],
+                "bbox": face["bbox"]
+            }
+        
+        person_id, distance = match
+        person_info = self.known_persons.get(person_id, {})
+        return {
+            "type": "person_detected",
+            "person_id": person_id,
+            "person_name": person_info.get("name", str(person_id)),
+            "person_type": person_info.get("type", "UNKNOWN"),
+            "confidence": float(1.0 - distance),
+            "bbox": face["bbox"]
+        }
     
-    def detect_faces(self, frame: np.ndarray) -> List[Dict]:
+    def _detect_aligned(self, frame: np.ndarray, scale: float = 1.0) -> List[Dict]:
+        """
+        Detect faces and return them aligned and resized for the embedding model.
+        With scale < 1 the detector runs on a downscaled copy and each face is
+        then aligned from a native-resolution crop, so the embedding model
+        still sees full-quality pixels.
+        
+        Returns:
+            Face dicts with bbox, confidence and crop (BGR, [0, 1], model input size)
+        """
+        if scale < 1.0:
+            return self._detect_two_resolution(frame, scale)
+        
+        results = self._extract_faces(
+            img_path=frame,
+            target_size=self.target_size,
+            detector_backend=self.detector_backend,
+            enforce_detection=False,
+            align=True
+        )
+        
+        frame_h, frame_w = frame.shape[:2]
+        faces = []
+        for result in results:
+            bbox = _region_to_bbox(result.get("facial_area"))
+            # With enforce_detection=False DeepFace falls back to the whole frame
+            if bbox[2] >= frame_w and bbox[3] >= frame_h:
+                continue
+            faces.append({
+                "bbox": bbox,
+                "confidence": float(result.get("confidence", 0.0)),
+                # extract_faces returns RGB; the embedding path expects BGR like represent() uses
+                "crop": result["face"][:, :, ::-1],
+                "landmarks": _box_landmarks(result.get("facial_area"), bbox)
+            })
+        return faces
+    
+    def _detect_two_resolution(self, frame: np.ndarray, scale: float) -> List[Dict]:
+        """Locate faces on a downscaled copy, then align each from the native frame."""
+        small = _downscale(frame, scale)
+        results = self._extract_faces(
+            img_path=small,
+            target_size=self.target_size,
+            detector_backend=self.detector_backend,
+            enforce_detection=False,
+            align=False
+        )
+        
+        small_h, small_w = small.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        faces = []
+        for result in results:
+            small_bbox = _region_to_bbox(result.get("facial_area"))
+            if small_bbox[2] >= small_w and small_bbox[3] >= small_h:
+                continue
+            x, y, w, h = _scale_bbox(small_bbox, scale, frame.shape)
+            
+            # Pad the native crop so the detector inside it has context to align with
+            pad_x, pad_y = int(w * self.crop_padding), int(h * self.crop_padding)
+            x1, y1 = max(0, x - pad_x), max(0, y - pad_y)
+            x2, y2 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+            faces.append({
+                "bbox": [x, y, w, h],
+                "confidence": float(result.get("confidence", 0.0)),
+                "crop": self._align_crop(frame[y1:y2, x1:x2], frame[y:y + h, x:x + w])
+            })
+        return faces
+    
+    def _align_crop(self, padded: np.ndarray, tight: np.ndarray) -> np.ndarray:
+        """Align a native-resolution face crop; fall back to resizing the tight box."""
+        try:
+            results = self._extract_faces(
+                img_path=padded,
+                target_size=self.target_size,
+                detector_backend=self.detector_backend,
+                enforce_detection=True,
+                align=True
+            )
+            best = max(results, key=lambda result: result.get("confidence", 0.0))
+            return best["face"][:, :, ::-1]
+        except Exception:
+            # The detector can miss a face on a tight crop; embed the box as-is
+            resized = cv2.resize(tight, self.target_size[::-1], interpolation=cv2.INTER_AREA)
+            return resized.astype(np.float32) / 255.0
+    
+    def _extract_faces(self, **kwargs) -> List[Dict]:
+        """DeepFace.extract_faces, one call at a time across threads."""
+        with self._model_lock:
+            return DeepFace.extract_faces(**kwargs)
+    
+    def _represent(self, **kwargs) -> List[Dict]:
+        """DeepFace.represent, one call at a time across threads."""
+        with self._model_lock:
+            return DeepFace.represent(**kwargs)
+    
+    def _embed_crops(self, crops: List[np.ndarray]) -> np.ndarray:
+        """Embed pre-aligned face crops without running detection again."""
+        embeddings = []
+        for crop in crops:
+            result = self._represent(
+                img_path=crop,
+                model_name=self.model_name,
+                enforce_detection=False,
+                detector_backend="skip"
+            )
+            embeddings.append(np.asarray(result[0]["embedding"], dtype=np.float32))
+        return np.stack(embeddings)
+    
+    def detect_faces(self, frame: np.ndarray, scale: float = 1.0) -> List[Dict]:
         """
         Detect faces without recognition (faster).
         Returns list of face bounding boxes.
+        
+        Args:
+            frame: Video frame as numpy array (BGR format)
+            scale: Run the detector on a copy resized by this factor; boxes are
+                   mapped back to full-resolution coordinates
         """
         try:
-            faces = DeepFace.extract_faces(
-                img_path=frame,
+            small = _downscale(frame, scale)
+            faces = self._extract_faces(
+                img_path=small,
                 enforce_detection=False,
-                detector_backend='opencv'
+                detector_backend=self.detector_backend
             )
             
+            small_h, small_w = small.shape[:2]
             detections = []
             for face in faces:
-                facial_area = face.get('facial_area', {})
+                area = _region_to_bbox(face.get('facial_area'))
+                # With enforce_detection=False DeepFace falls back to the whole frame
+                if area[2] >= small_w and area[3] >= small_h:
+                    continue
                 detections.append({
-                    "bbox": [
-                        facial_area.get('x', 0),
-                        facial_area.get('y', 0),
-                        facial_area.get('w', 0),
-                        facial_area.get('h', 0)
-                    ],
+                    "bbox": _scale_bbox(area, scale, frame.shape),
                     "confidence": face.get('confidence', 0.0)
                 })
             
@@ -222,3 +869,82 @@ class FaceAnalyzer:
         except Exception as e:
             print(f"❌ Face detection error: {e}")
             return []
+
+def _region_to_bbox(region) -> List[int]:
+    """Convert a DeepFace facial area (dict or [x, y, w, h]) to an [x, y, w, h] list."""
+    if isinstance(region, dict):
+        return [
+            int(region.get('x', 0)),
+            int(region.get('y', 0)),
+            int(region.get('w', 0)),
+            int(region.get('h', 0))
+        ]
+    if region is not None and len(region) == 4:
+        return [int(v) for v in region]
+    return [0, 0, 0, 0]
+
+
+def _box_landmarks(region, bbox: List[int]) -> Optional[Dict]:
+    """Eye landmarks relative to the face box, when the detector reports them."""
+    if not isinstance(region, dict) or not region.get("left_eye") or not region.get("right_eye"):
+        return None
+    return {
+        key: (region[key][0] - bbox[0], region[key][1] - bbox[1])
+        for key in ("left_eye", "right_eye")
+    }
+
+
+def _downscale(frame: np.ndarray, scale: float) -> np.ndarray:
+    """Resize a frame by `scale` for detection; returns it unchanged for scale >= 1."""
+    if scale >= 1.0:
+        return frame
+    return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def _scale_bbox(bbox: List[int], scale: float, shape) -> List[int]:
+    """Map an [x, y, w, h] box found on a downscaled frame back to full resolution."""
+    if scale >= 1.0:
+        return bbox
+    frame_h, frame_w = shape[:2]
+    x, y = int(bbox[0] / scale), int(bbox[1] / scale)
+    return [x, y, min(int(round(bbox[2] / scale)), frame_w - x), min(int(round(bbox[3] / scale)), frame_h - y)]
+
+
+def _dir_name(person_name: Optional[str], person_id) -> str:
+    """
+    Single path component for a person's photo directory.
+    Backend names are untrusted: separators are replaced, and empty or dot
+    names fall back to the person id, so the directory always lands inside db_path.
+    """
+    name = str(person_name or "").replace("/", "_").replace("\\", "_").replace("\0", "_").strip()
+    if name in ("", ".", ".."):
+        return f"person_{person_id}"
+    return name
+
+
+def _parse_camera_scales(spec: str) -> Dict[int, float]:
+    """Parse per-camera detection scales from "camera_id:scale,..." (e.g. "3:0.5,7:0.25")."""
+    scales = {}
+    for item in spec.split(","):
+        if ":" not in item:
+            continue
+        camera_id, scale = item.split(":", 1)
+        try:
+            scales[int(camera_id)] = float(scale)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid detection scale entry: {item}")
+    return scales
+
+
+def _parse_camera_modes(spec: str) -> Dict[int, str]:
+    """Parse per-camera cascade modes from "camera_id:mode,..." (e.g. "3:haar,7:off")."""
+    modes = {}
+    for item in spec.split(","):
+        if ":" not in item:
+            continue
+        camera_id, mode = item.split(":", 1)
+        try:
+            modes[int(camera_id)] = mode.strip()
+        except ValueError:
+            print(f"⚠️ Ignoring invalid cascade mode entry: {item}")
+    return modes
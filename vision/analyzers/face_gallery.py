@@ -0,0 +1,139 @@
+"""
+Face Gallery Module
+Holds known-person face embeddings in memory for vectorized matching
+"""
+
+import threading
+import numpy as np
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+from .ann_index import ExactIndex, create_index
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize embedding rows so cosine similarity becomes a dot product."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim == 1:
+        embeddings = embeddings[np.newaxis, :]
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class FaceGallery:
+    """
+    In-memory gallery of known-person embeddings
+    Embeddings are searched through a pluggable index: small galleries use an
+    exact matrix scan, large ones switch to an approximate IVF index.
+    Updates may run while inference threads are matching, so index access is locked.
+    """
+
+    def __init__(self, threshold: float = 0.593, index: str = "auto",
+                 ann_min_size: int = 10000, nprobe: int = 8):
+        """
+        Initialize an empty gallery
+
+        Args:
+            threshold: Maximum cosine distance accepted as a match
+            index: "exact", "ivf", or "auto" to pick by gallery size
+            ann_min_size: Gallery size from which "auto" uses the IVF index
+            nprobe: IVF buckets scanned per query (higher = better recall, slower)
+        """
+        self.threshold = threshold
+        self.index_kind = index
+        self.ann_min_size = ann_min_size
+        self.nprobe = nprobe
+        self._index = ExactIndex()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, person_id: Hashable) -> bool:
+        return person_id in self._index
+
+    @property
+    def ids(self) -> List[Hashable]:
+        return self._index.ids
+
+    @property
+    def index_type(self) -> str:
+        return "exact" if isinstance(self._index, ExactIndex) else "ivf"
+
+    def _kind_for(self, size: int) -> str:
+        if self.index_kind == "auto":
+            return "ivf" if size >= self.ann_min_size else "exact"
+        return self.index_kind
+
+    def _new_index(self, kind: str):
+        if kind == "ivf":
+            return create_index("ivf", nprobe=self.nprobe)
+        return create_index("exact")
+
+    def build(self, person_ids: Sequence[Hashable], embeddings) -> None:
+        """
+        Replace the gallery contents in one pass
+
+        Args:
+            person_ids: Identity for each embedding row
+            embeddings: (n, dim) matrix or sequence of vectors, one per identity
+        """
+        if len(person_ids) != len(embeddings):
+            raise ValueError("person_ids and embeddings must have the same length")
+
+        if not person_ids:
+            self.clear()
+            return
+
+        index = self._new_index(self._kind_for(len(person_ids)))
+        index.build(list(person_ids), _normalize(embeddings))
+        with self._lock:
+            self._index = index
+
+    def add(self, person_id: Hashable, embedding: np.ndarray) -> None:
+        """Insert or replace the embedding of a single identity."""
+        with self._lock:
+            self._index.add(person_id, _normalize(embedding)[0])
+            promote = self.index_type == "exact" and self._kind_for(len(self._index)) == "ivf"
+
+        # Promote to the ANN index once an exact gallery outgrows it
+        if promote:
+            self.build(*self._index.export())
+
+    def remove(self, person_id: Hashable) -> bool:
+        """Remove an identity from the gallery. Returns False if it was absent."""
+        with self._lock:
+            return self._index.remove(person_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = ExactIndex()
+
+    def match(self, embeddings: np.ndarray) -> List[Optional[Tuple[Hashable, float]]]:
+        """
+        Match query embeddings against the gallery
+
+        Args:
+            embeddings: (n_faces, dim) matrix of query embeddings
+
+        Returns:
+            One (person_id, cosine_distance) tuple per query, or None when the
+            closest identity is farther than the threshold
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.size == 0:
+            return []
+
+        queries = _normalize(embeddings)
+        with self._lock:
+            hits = self._index.search(queries)
+
+        matches: List[Optional[Tuple[Hashable, float]]] = []
+        for hit in hits:
+            if hit is None:
+                matches.append(None)
+                continue
+            person_id, similarity = hit
+            distance = 1.0 - similarity
+            matches.append((person_id, distance) if distance <= self.threshold else None)
+        return matches
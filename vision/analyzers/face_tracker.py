@@ -0,0 +1,166 @@
+"""
+Face Tracker Module
+Lightweight per-camera multi-object tracking of face boxes
+"""
+
+import threading
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+def _iou(a: np.ndarray, b: np.ndarray) -> float:
+    """Intersection over union of two [x, y, w, h] boxes."""
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2 = min(a[0] + a[2], b[0] + b[2])
+    y2 = min(a[1] + a[3], b[1] + b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return float(inter / union) if union > 0 else 0.0
+
+
+@dataclass
+class Track:
+    """A face followed across frames of one camera."""
+
+    track_id: int
+    bbox: np.ndarray  # [x, y, w, h] of the last matched detection
+    velocity: np.ndarray = field(default_factory=lambda: np.zeros(2, dtype=np.float32))
+    hits: int = 1
+    misses: int = 0
+    frames_since_embed: int = 0
+    embedded: bool = False
+    identity: Optional[Tuple[Hashable, float]] = None  # (person_id, distance) of the last match
+
+    def predicted_bbox(self) -> np.ndarray:
+        """Box expected in the next frame under a constant-velocity model."""
+        predicted = self.bbox.copy()
+        predicted[:2] += self.velocity
+        return predicted
+
+
+class FaceTracker:
+    """
+    IoU + constant-velocity tracker, keyed per camera
+    Detections are associated to existing tracks greedily by IoU against each
+    track's predicted box. A track only needs a fresh embedding when it is new,
+    every `reembed_interval` frames, or when its last match was weak.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 5,
+                 reembed_interval: int = 10, min_confidence: float = 0.407):
+        """
+        Initialize the tracker
+
+        Args:
+            iou_threshold: Minimum IoU to continue a track
+            max_misses: Consecutive frames a track may go undetected before it is dropped
+            reembed_interval: Frames between periodic re-embeddings of a track
+            min_confidence: Match confidence below which a track is re-embedded every frame;
+                the default is SFace's recognition cutoff (1 - 0.593 cosine distance)
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.reembed_interval = reembed_interval
+        self.min_confidence = min_confidence
+        self._tracks: Dict[Hashable, List[Track]] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._embeddings_run = 0
+        self._embeddings_skipped = 0
+
+    def update(self, camera_id: Hashable, bboxes: Sequence[Sequence[float]]) -> List[Track]:
+        """
+        Associate a frame's detections with the camera's tracks
+
+        Args:
+            camera_id: Camera the frame came from
+            bboxes: Detected face boxes as [x, y, w, h]
+
+        Returns:
+            The track for each detection, in detection order
+        """
+        boxes = [np.asarray(bbox, dtype=np.float32) for bbox in bboxes]
+
+        with self._lock:
+            tracks = self._tracks.setdefault(camera_id, [])
+            predictions = [track.predicted_bbox() for track in tracks]
+
+            candidates = []
+            for t, predicted in enumerate(predictions):
+                for d, box in enumerate(boxes):
+                    overlap = _iou(predicted, box)
+                    if overlap >= self.iou_threshold:
+                        candidates.append((overlap, t, d))
+            candidates.sort(reverse=True)
+
+            assigned: List[Optional[Track]] = [None] * len(boxes)
+            matched_tracks = set()
+            for _, t, d in candidates:
+                if t in matched_tracks or assigned[d] is not None:
+                    continue
+                track = tracks[t]
+                movement = boxes[d][:2] - track.bbox[:2]
+                # Smooth velocity so a single jittery box does not throw the prediction off
+                track.velocity = 0.5 * track.velocity + 0.5 * movement
+                track.bbox = boxes[d]
+                track.hits += 1
+                track.misses = 0
+                track.frames_since_embed += 1
+                matched_tracks.add(t)
+                assigned[d] = track
+
+            survivors = []
+            for t, track in enumerate(tracks):
+                if t not in matched_tracks:
+                    track.misses += 1
+                    if track.misses > self.max_misses:
+                        continue
+                survivors.append(track)
+
+            for d, box in enumerate(boxes):
+                if assigned[d] is None:
+                    track = Track(track_id=self._next_id, bbox=box)
+                    self._next_id += 1
+                    survivors.append(track)
+                    assigned[d] = track
+
+            self._tracks[camera_id] = survivors
+            return assigned
+
+    def needs_embedding(self, track: Track) -> bool:
+        """Whether the track's identity should be refreshed with a new embedding."""
+        if not track.embedded or track.frames_since_embed >= self.reembed_interval:
+            return True
+        return track.identity is not None and (1.0 - track.identity[1]) < self.min_confidence
+
+    def assign(self, track: Track, identity: Optional[Tuple[Hashable, float]]) -> None:
+        """Record the gallery match computed from a fresh embedding of the track."""
+        with self._lock:
+            track.identity = identity
+            track.embedded = True
+            track.frames_since_embed = 0
+            self._embeddings_run += 1
+
+    def reuse(self, track: Track) -> Optional[Tuple[Hashable, float]]:
+        """Return the track's cached identity, counting the skipped embedding."""
+        with self._lock:
+            self._embeddings_skipped += 1
+        return track.identity
+
+    def reset(self, camera_id: Optional[Hashable] = None) -> None:
+        """Drop tracks of one camera, or of all cameras."""
+        with self._lock:
+            if camera_id is None:
+                self._tracks.clear()
+            else:
+                self._tracks.pop(camera_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cameras": len(self._tracks),
+                "active_tracks": sum(len(tracks) for tracks in self._tracks.values()),
+                "embeddings_run": self._embeddings_run,
+                "embeddings_skipped": self._embeddings_skipped,
+            }
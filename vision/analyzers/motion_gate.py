@@ -0,0 +1,110 @@
+"""
+Motion Gate Module
+Cheap per-camera frame differencing that skips analysis of static frames
+"""
+
+import threading
+import time
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+
+@dataclass
+class _CameraState:
+    background: Optional[np.ndarray] = None
+    last_analyzed_at: float = 0.0
+    analyzed: int = 0
+    skipped: int = 0
+
+
+class MotionGate:
+    """
+    Per-camera motion detector
+    Frames are downscaled to a small grayscale thumbnail and compared with a
+    running-average background. Frames where too few pixels changed are
+    reported as static and can skip face analysis entirely.
+    """
+
+    def __init__(self, pixel_threshold: int = 25, min_changed_fraction: float = 0.01,
+                 downscale_width: int = 160, learning_rate: float = 0.1,
+                 max_skip_seconds: float = 10.0):
+        """
+        Initialize the gate
+
+        Args:
+            pixel_threshold: Grayscale difference (0-255) for a pixel to count as changed
+            min_changed_fraction: Fraction of changed pixels that counts as motion (sensitivity)
+            downscale_width: Width of the thumbnail used for differencing
+            learning_rate: How fast the background adapts to gradual changes
+            max_skip_seconds: Force an analysis at least this often, so still persons are re-checked
+        """
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.downscale_width = downscale_width
+        self.learning_rate = learning_rate
+        self.max_skip_seconds = max_skip_seconds
+        self._cameras: Dict[Hashable, _CameraState] = {}
+        self._lock = threading.Lock()
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.downscale_width / float(width))
+        small = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0).astype(np.float32)
+
+    def should_analyze(self, camera_id: Hashable, frame: np.ndarray) -> bool:
+        """
+        Update the camera's background and decide whether the frame needs analysis
+
+        Args:
+            camera_id: Camera the frame came from
+            frame: Decoded frame (BGR)
+
+        Returns:
+            True if the frame shows motion (or a periodic re-check is due)
+        """
+        thumbnail = self._thumbnail(frame)
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._cameras.setdefault(camera_id, _CameraState())
+
+            if state.background is None or state.background.shape != thumbnail.shape:
+                state.background = thumbnail
+                motion = True
+            else:
+                changed = np.abs(thumbnail - state.background) > self.pixel_threshold
+                motion = changed.mean() >= self.min_changed_fraction
+                cv2.accumulateWeighted(thumbnail, state.background, self.learning_rate)
+
+            if motion or now - state.last_analyzed_at >= self.max_skip_seconds:
+                state.last_analyzed_at = now
+                state.analyzed += 1
+                return True
+
+            state.skipped += 1
+            return False
+
+    def reset(self, camera_id: Optional[Hashable] = None) -> None:
+        """Forget the background of one camera, or of all cameras."""
+        with self._lock:
+            if camera_id is None:
+                self._cameras.clear()
+            else:
+                self._cameras.pop(camera_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            per_camera = {
+                str(camera_id): {"analyzed": state.analyzed, "skipped": state.skipped}
+                for camera_id, state in self._cameras.items()
+            }
+        return {
+            "analyzed": sum(counts["analyzed"] for counts in per_camera.values()),
+            "skipped": sum(counts["skipped"] for counts in per_camera.values()),
+            "cameras": per_camera,
+        }
@@ -0,0 +1,138 @@
+"""
+Zone Filter Module
+Restricts face analysis to the zone polygons configured for each camera
+"""
+
+import threading
+import time
+import cv2
+import httpx
+import numpy as np
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class ZoneFilter:
+    """
+    Per-camera region-of-interest filter
+    Active zone polygons are fetched from the backend and rasterized once per
+    camera and frame size into a mask plus its bounding rectangle. Detection
+    runs on that rectangle only, and faces whose center falls outside every
+    zone are dropped. Cameras without zones are analyzed in full.
+    """
+
+    def __init__(self, backend_url: str, refresh_seconds: float = 60.0,
+                 client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the filter
+
+        Args:
+            backend_url: URL of the backend API to fetch zones from
+            refresh_seconds: How long fetched zones are trusted before re-fetching
+            client: Shared pooled client for backend requests; may also be set later
+        """
+        self.backend_url = backend_url
+        self.refresh_seconds = refresh_seconds
+        self.client = client
+        self._polygons: Dict[Hashable, List[np.ndarray]] = {}
+        self._fetched_at: Dict[Hashable, float] = {}
+        self._geometry: Dict[Tuple[Hashable, int, int], Tuple[np.ndarray, Tuple[int, int, int, int]]] = {}
+        self._lock = threading.Lock()
+
+    async def refresh(self, camera_id: Hashable) -> None:
+        """Fetch the camera's active zones unless they were fetched recently."""
+        now = time.monotonic()
+        if now - self._fetched_at.get(camera_id, float("-inf")) < self.refresh_seconds:
+            return
+        # Claim the refresh up front so concurrent frames do not all fetch
+        self._fetched_at[camera_id] = now
+
+        try:
+            if self.client is not None:
+                response = await self._fetch(self.client, camera_id)
+            else:
+                async with httpx.AsyncClient() as client:
+                    response = await self._fetch(client, camera_id)
+            if response.status_code != 200:
+                print(f"⚠️ Failed to load zones for camera {camera_id}: {response.status_code}")
+                return
+            self.set_zones(camera_id, [zone.get("polygon") or [] for zone in response.json()])
+        except Exception as e:
+            print(f"⚠️ Failed to load zones for camera {camera_id}: {e}")
+
+    async def _fetch(self, client: httpx.AsyncClient, camera_id: Hashable) -> httpx.Response:
+        return await client.get(
+            f"{self.backend_url}/api/v1/zones/",
+            params={"camera_id": camera_id, "active": "true"},
+            timeout=5.0
+        )
+
+    def set_zones(self, camera_id: Hashable, polygons: Sequence[Sequence[Sequence[float]]]) -> None:
+        """
+        Replace a camera's zone polygons, each [[x, y], ...]
+        A polygon whose coordinates all lie in [0, 1] is read as fractions of
+        the frame size, any other polygon as pixels (see the backend zone schema).
+        """
+        valid = [np.asarray(polygon, dtype=np.float32) for polygon in polygons if len(polygon) >= 3]
+        with self._lock:
+            if valid:
+                self._polygons[camera_id] = valid
+            else:
+                self._polygons.pop(camera_id, None)
+            for key in [key for key in self._geometry if key[0] == camera_id]:
+                del self._geometry[key]
+
+    def _geometry_for(self, camera_id: Hashable, shape: Tuple[int, ...]):
+        """Mask and bounding rect of the camera's zones at this frame size, or None."""
+        height, width = shape[:2]
+        key = (camera_id, height, width)
+
+        with self._lock:
+            if key in self._geometry:
+                return self._geometry[key]
+            polygons = self._polygons.get(camera_id)
+            if not polygons:
+                return None
+
+            mask = np.zeros((height, width), dtype=np.uint8)
+            for polygon in polygons:
+                points = polygon
+                # All coordinates in [0, 1]: fractions of the frame size. In pixels
+                # such a polygon would cover at most one pixel, so this is unambiguous
+                if points.max() <= 1.0:
+                    points = points * np.array([width, height], dtype=np.float32)
+                cv2.fillPoly(mask, [np.round(points).astype(np.int32)], 255)
+
+            x, y, w, h = cv2.boundingRect(mask)
+            geometry = (mask, (x, y, w, h)) if w and h else (mask, (0, 0, 0, 0))
+            self._geometry[key] = geometry
+            return geometry
+
+    def crop(self, camera_id: Optional[Hashable], frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Cut the frame down to the union of the camera's zones
+
+        Returns:
+            (region, (offset_x, offset_y)); pixels outside every zone are blacked out.
+            The full frame with a zero offset when the camera has no zones.
+        """
+        geometry = self._geometry_for(camera_id, frame.shape) if camera_id is not None else None
+        if geometry is None:
+            return frame, (0, 0)
+
+        mask, (x, y, w, h) = geometry
+        region = frame[y:y + h, x:x + w]
+        region_mask = mask[y:y + h, x:x + w]
+        if not region_mask.all():
+            region = cv2.bitwise_and(region, region, mask=region_mask)
+        return region, (x, y)
+
+    def contains(self, camera_id: Optional[Hashable], bbox: Sequence[int], shape: Tuple[int, ...]) -> bool:
+        """Whether the center of a full-frame [x, y, w, h] box lies inside a zone."""
+        geometry = self._geometry_for(camera_id, shape) if camera_id is not None else None
+        if geometry is None:
+            return True
+
+        mask = geometry[0]
+        cx = min(max(int(bbox[0] + bbox[2] / 2), 0), mask.shape[1] - 1)
+        cy = min(max(int(bbox[1] + bbox[3] / 2), 0), mask.shape[0] - 1)
+        return bool(mask[cy, cx])
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+FaceAnalyzer Benchmark Suite
+Measures FaceAnalyzer.analyze, detect_faces and gallery matching across
+frame sizes, faces per frame and gallery sizes.
+
+Synthetic frames are generated from a fixed seed, so runs are reproducible;
+recorded frames can be added with --frames. Every case reports throughput,
+p50/p99 latency and the process's peak RSS. Results are written as JSON and
+can be compared against a previous run with --baseline.
+
+--stub replaces DeepFace with benchmarks/stub_deepface.py, so the suite runs
+without model weights and times everything around the models.
+
+Usage:
+    python benchmarks/analyzer_suite.py --stub --json results.json
+    python benchmarks/analyzer_suite.py --frames ./samples --galleries 10 1000 100000
+    python benchmarks/analyzer_suite.py --stub --json new.json --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _parse_size(spec: str):
+    width, height = spec.lower().split("x")
+    return int(width), int(height)
+
+
+def _synthetic_frame(rng: np.random.Generator, width: int, height: int, faces: int) -> np.ndarray:
+    """Noisy background with `faces` textured face-colored ellipses on a grid."""
+    frame = rng.integers(0, 90, size=(height, width, 3), dtype=np.uint8)
+    if faces == 0:
+        return frame
+
+    columns = int(np.ceil(np.sqrt(faces)))
+    rows = int(np.ceil(faces / columns))
+    cell_w, cell_h = width // columns, height // rows
+    for i in range(faces):
+        cx = (i % columns) * cell_w + cell_w // 2
+        cy = (i // columns) * cell_h + cell_h // 2
+        axes = (max(4, cell_w // 5), max(5, cell_h // 4))
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.ellipse(mask, (cx, cy), axes, 0, 0, 360, 255, -1)
+        # Per-face texture keeps crops (and so embeddings) distinct
+        texture = rng.integers(-15, 15, size=(height, width, 3))
+        face = np.clip(np.array([80, 130, 235]) + texture, 0, 255).astype(np.uint8)
+        frame[mask > 0] = face[mask > 0]
+    return frame
+
+
+def _load_frames(path: str):
+    frames = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png")):
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                frames.append(frame)
+    return frames
+
+
+def _fill_gallery(analyzer, size: int, rng: np.random.Generator, dim: int = 128) -> None:
+    """Replace the analyzer's gallery and known persons with `size` random identities."""
+    ids = list(range(size))
+    embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+    analyzer.known_persons = {person_id: {"name": f"person-{person_id}", "type": "EMPLOYEE"} for person_id in ids}
+    analyzer.gallery.build(ids, embeddings)
+
+
+def _timed(fn, inputs, repeat: int, warmup: int):
+    for item in inputs[:warmup]:
+        fn(item)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            call_started = time.perf_counter()
+            fn(item)
+            latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        "iterations": len(latencies),
+        "throughput_per_s": len(latencies) / elapsed if elapsed else None,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run(args):
+    if args.stub:
+        from benchmarks import stub_deepface
+        stub_deepface.install()
+
+    # Measure the raw pipeline: no tracking shortcuts, no zone fetches from a backend
+    os.environ.setdefault("FACE_TRACKING", "true" if args.tracking else "false")
+    os.environ.setdefault("ZONE_FILTER", "false")
+    from analyzers.face_analyzer import FaceAnalyzer
+
+    rng = np.random.default_rng(args.seed)
+    analyzer = FaceAnalyzer()
+
+    frame_sets = []
+    for size in args.sizes:
+        width, height = _parse_size(size)
+        for faces in args.faces:
+            frames = [_synthetic_frame(rng, width, height, faces) for _ in range(args.frames_per_case)]
+            frame_sets.append({"source": "synthetic", "frame_size": f"{width}x{height}", "faces": faces, "frames": frames})
+    if args.frames:
+        recorded = _load_frames(args.frames)
+        if not recorded:
+            print(f"❌ No images found in {args.frames}")
+            sys.exit(1)
+        frame_sets.append({"source": "recorded", "frame_size": "mixed", "faces": None, "frames": recorded})
+
+    results = []
+
+    if "detect_faces" in args.benches:
+        for frame_set in frame_sets:
+            stats = _timed(analyzer.detect_faces, frame_set["frames"], args.repeat, args.warmup)
+            results.append({"bench": "detect_faces", "source": frame_set["source"],
+                            "frame_size": frame_set["frame_size"], "faces": frame_set["faces"], **stats})
+
+    if "analyze" in args.benches:
+        for gallery_size in args.galleries:
+            _fill_gallery(analyzer, gallery_size, rng)
+            for frame_set in frame_sets:
+                if analyzer.tracker is not None:
+                    analyzer.tracker.reset()
+                stats = _timed(lambda frame: analyzer.analyze(frame, camera_id=1), frame_set["frames"],
+                               args.repeat, args.warmup)
+                results.append({"bench": "analyze", "source": frame_set["source"],
+                                "frame_size": frame_set["frame_size"], "faces": frame_set["faces"],
+                                "gallery": gallery_size, "index": analyzer.gallery.index_type, **stats})
+
+    if "match" in args.benches:
+        for gallery_size in args.galleries:
+            _fill_gallery(analyzer, gallery_size, rng)
+            for faces in [count for count in args.faces if count > 0]:
+                queries = [rng.standard_normal((faces, 128)).astype(np.float32) for _ in range(args.frames_per_case)]
+                stats = _timed(analyzer.gallery.match, queries, args.repeat, args.warmup)
+                results.append({"bench": "match", "faces": faces, "gallery": gallery_size,
+                                "index": analyzer.gallery.index_type, **stats})
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "stub": args.stub,
+            "seed": args.seed,
+            "tracking": args.tracking,
+        },
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "results": results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _case_key(row) -> tuple:
+    return (row["bench"], row.get("source"), row.get("frame_size"), row.get("faces"), row.get("gallery"))
+
+
+def _print_report(report, baseline=None):
+    previous = {_case_key(row): row for row in (baseline or {}).get("results", [])}
+    print(f"{'bench':<13} {'frames':<10} {'faces':>5} {'gallery':>7} {'ops/s':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'rss MB':>7}" + (f" {'p50 Δ':>7}" if baseline else ""))
+    for row in report["results"]:
+        faces = row.get("faces")
+        line = (f"{row['bench']:<13} {row.get('frame_size') or '-':<10} {'-' if faces is None else faces:>5} "
+                f"{row.get('gallery') or '-':>7} {row['throughput_per_s']:>9.1f} "
+                f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['peak_rss_mb']:>7.1f}")
+        before = previous.get(_case_key(row))
+        if baseline:
+            change = f"{(row['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}%" if before and before["p50_ms"] else "new"
+            line += f" {change:>7}"
+        print(line)
+    print(f"📈 Peak RSS: {report['peak_rss_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FaceAnalyzer detection, analysis and matching")
+    parser.add_argument("--benches", nargs="+", default=["detect_faces", "analyze", "match"],
+                        choices=["detect_faces", "analyze", "match"])
+    parser.add_argument("--sizes", nargs="+", default=["640x360", "1280x720", "1920x1080"],
+                        help="Synthetic frame sizes as WIDTHxHEIGHT")
+    parser.add_argument("--faces", type=int, nargs="+", default=[0, 1, 4, 16], help="Faces per synthetic frame")
+    parser.add_argument("--galleries", type=int, nargs="+", default=[10, 1000, 10000, 100000],
+                        help="Known-person gallery sizes")
+    parser.add_argument("--frames", help="Directory of recorded JPEG/PNG frames to include")
+    parser.add_argument("--frames-per-case", type=int, default=5, help="Distinct synthetic frames per case")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over each case's frames")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed calls before each case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracking", action="store_true", help="Keep face tracking on (skips re-embedding)")
+    parser.add_argument("--stub", action="store_true", help="Use the stub DeepFace instead of real models")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Previous --json output to compare p50 latency against")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
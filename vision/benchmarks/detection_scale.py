@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Detection Scale Benchmark
+Measures latency and recall of the two-resolution detect/recognize pipeline.
+
+For every image, faces found at full resolution are the reference; each
+downscale factor is scored by how many reference faces it still finds
+(IoU >= 0.5) and how long detection plus native-resolution alignment takes.
+
+Usage:
+    python benchmarks/detection_scale.py --images ./samples --scales 1.0 0.75 0.5 0.35 0.25
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzers.face_analyzer import FaceAnalyzer
+
+
+def _iou(a, b) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def _recall(reference, found) -> int:
+    """Number of reference boxes matched by a found box (greedy, IoU >= 0.5)."""
+    unused = list(found)
+    hits = 0
+    for ref in reference:
+        best = max(unused, key=lambda box: _iou(ref, box), default=None)
+        if best is not None and _iou(ref, best) >= 0.5:
+            unused.remove(best)
+            hits += 1
+    return hits
+
+
+def _load_images(path: str):
+    images = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png")):
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                images.append((name, frame))
+    return images
+
+
+def run(images, scales, repeat: int):
+    analyzer = FaceAnalyzer()
+    reference = {name: [face["bbox"] for face in analyzer._detect_aligned(frame, 1.0)] for name, frame in images}
+    total_faces = sum(len(boxes) for boxes in reference.values())
+
+    results = []
+    for scale in scales:
+        latencies = []
+        hits = 0
+        for name, frame in images:
+            for attempt in range(repeat):
+                started = time.perf_counter()
+                faces = analyzer._detect_aligned(frame, scale)
+                latencies.append((time.perf_counter() - started) * 1000)
+            hits += _recall(reference[name], [face["bbox"] for face in faces])
+
+        results.append({
+            "scale": scale,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "recall": hits / total_faces if total_faces else None,
+        })
+    return {"images": len(images), "reference_faces": total_faces, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detection downscale factors")
+    parser.add_argument("--images", required=True, help="Directory of JPEG/PNG frames with faces")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.35, 0.25])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per image and scale")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    images = _load_images(args.images)
+    if not images:
+        print(f"❌ No images found in {args.images}")
+        sys.exit(1)
+
+    report = run(images, args.scales, args.repeat)
+
+    print(f"📊 {report['images']} images, {report['reference_faces']} faces at full resolution")
+    print(f"{'scale':>6} {'p50 ms':>9} {'p99 ms':>9} {'recall':>7}")
+    for row in report["results"]:
+        recall = f"{row['recall']:.3f}" if row["recall"] is not None else "n/a"
+        print(f"{row['scale']:>6.2f} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {recall:>7}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Stub DeepFace
+Stand-in for the deepface package so benchmarks run without model weights.
+
+Detection finds the marker-colored faces drawn by the synthetic frame
+generator (falling back to OpenCV's bundled Haar cascade on recorded
+frames), and embeddings are a fixed random projection of the face crop, so
+similar crops get similar vectors. Timings measure the pipeline around the
+models, not the models themselves.
+"""
+import sys
+import types
+
+import cv2
+import numpy as np
+
+
+TARGET_SIZE = (112, 112)
+EMBEDDING_DIM = 128
+THRESHOLD = 0.593
+
+# BGR range of the faces painted by the synthetic generator
+FACE_LOWER = np.array([50, 100, 215], dtype=np.uint8)
+FACE_UPPER = np.array([110, 160, 255], dtype=np.uint8)
+
+_projection = np.random.default_rng(0).standard_normal((32 * 32, EMBEDDING_DIM)).astype(np.float32)
+_haar = None
+
+
+def _find_boxes(frame: np.ndarray):
+    mask = cv2.inRange(frame, FACE_LOWER, FACE_UPPER)
+    if cv2.countNonZero(mask):
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return [cv2.boundingRect(contour) for contour in contours if cv2.contourArea(contour) >= 16]
+
+    global _haar
+    # Some OpenCV builds ship without the cascade module or its files
+    if not hasattr(cv2, "CascadeClassifier"):
+        return []
+    if _haar is None:
+        _haar = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    if _haar.empty():
+        return []
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return [tuple(box) for box in _haar.detectMultiScale(gray, 1.1, 5)]
+
+
+class DeepFace:
+    @staticmethod
+    def extract_faces(img_path, target_size=TARGET_SIZE, detector_backend="opencv",
+                      enforce_detection=True, align=True, grayscale=False):
+        frame = img_path
+        height, width = frame.shape[:2]
+        results = []
+        for x, y, w, h in _find_boxes(frame):
+            crop = cv2.resize(frame[y:y + h, x:x + w], target_size[::-1], interpolation=cv2.INTER_AREA)
+            results.append({
+                "face": crop[:, :, ::-1].astype(np.float32) / 255.0,
+                "facial_area": {"x": int(x), "y": int(y), "w": int(w), "h": int(h)},
+                "confidence": 1.0,
+            })
+
+        if not results:
+            if enforce_detection:
+                raise ValueError("Face could not be detected")
+            # Like DeepFace, fall back to the whole frame
+            resized = cv2.resize(frame, target_size[::-1], interpolation=cv2.INTER_AREA)
+            results.append({
+                "face": resized[:, :, ::-1].astype(np.float32) / 255.0,
+                "facial_area": {"x": 0, "y": 0, "w": width, "h": height},
+                "confidence": 0.0,
+            })
+        return results
+
+    @staticmethod
+    def represent(img_path, model_name="SFace", enforce_detection=True, detector_backend="opencv",
+                  align=True, normalization="base"):
+        crop = np.asarray(img_path, dtype=np.float32)
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).reshape(-1)
+        embedding = (small - small.mean()) @ _projection
+        return [{"embedding": embedding.tolist(), "facial_area": {}, "face_confidence": 1.0}]
+
+    @staticmethod
+    def find(*args, **kwargs):
+        return []
+
+    @staticmethod
+    def build_model(model_name):
+        return None
+
+
+def install() -> None:
+    """Register the stub as the `deepface` package; call before importing analyzers."""
+    package = types.ModuleType("deepface")
+    package.DeepFace = DeepFace
+    commons = types.ModuleType("deepface.commons")
+    distance = types.ModuleType("deepface.commons.distance")
+    distance.findThreshold = lambda model_name, metric: THRESHOLD
+    functions = types.ModuleType("deepface.commons.functions")
+    functions.find_target_size = lambda model_name: TARGET_SIZE
+    commons.distance, commons.functions = distance, functions
+    package.commons = commons
+
+    sys.modules.update({
+        "deepface": package,
+        "deepface.commons": commons,
+        "deepface.commons.distance": distance,
+        "deepface.commons.functions": functions,
+    })
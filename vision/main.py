@@ -3,45 +3,158 @@ Vision Service - SafeSight Analytics
 Handles face detection and recognition using modular analyzers
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
-import httpx
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import numpy as np
 import cv2
+import asyncio
+import math
 import os
+import time
+from typing import List, Optional
 from analyzers.face_analyzer import FaceAnalyzer
+from analyzers.motion_gate import MotionGate
+from services.admission import AdmissionController, FrameShedError
+from services.inference_pool import InferencePool, PoolSaturatedError
+from services.event_reporter import EventReporter
+from services.event_spool import EventSpool
+from services.metrics import Metrics
+from services.presence import PresenceFilter
+from services.raw_frame import RawFrameError, decode_raw_frame
 
 # Configuration from environment variables
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 HOST = os.getenv("VISION_HOST", "0.0.0.0")
 PORT = int(os.getenv("VISION_PORT", "8001"))
+MAX_BATCH_FRAMES = int(os.getenv("MAX_BATCH_FRAMES", "32"))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0")) or None
+INFERENCE_QUEUE_LIMIT = int(os.getenv("INFERENCE_QUEUE_LIMIT", "-1"))
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "100"))
+EVENT_FLUSH_INTERVAL = float(os.getenv("EVENT_FLUSH_INTERVAL", "1.0"))
+EVENT_MAX_PENDING = int(os.getenv("EVENT_MAX_PENDING", "10000"))
+EVENT_SPOOL_DIR = os.getenv("EVENT_SPOOL_DIR", "./event_spool")
+EVENT_SPOOL_MAX_MB = float(os.getenv("EVENT_SPOOL_MAX_MB", "64"))
+EVENT_SPOOL_SEGMENT_KB = int(os.getenv("EVENT_SPOOL_SEGMENT_KB", "1024"))
+EVENT_REPLAY_INTERVAL = float(os.getenv("EVENT_REPLAY_INTERVAL", "5"))
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+CAMERA_MAX_FPS = float(os.getenv("CAMERA_MAX_FPS", "5"))
+CAMERA_BURST = float(os.getenv("CAMERA_BURST", "5"))
+MAX_IN_FLIGHT_FRAMES = int(os.getenv("MAX_IN_FLIGHT_FRAMES", "0"))
+DOWNSAMPLE_AT = float(os.getenv("DOWNSAMPLE_AT", "0.75"))
+DOWNSAMPLE_SCALE = float(os.getenv("DOWNSAMPLE_SCALE", "0.5"))
+MAX_FRAME_AGE = float(os.getenv("MAX_FRAME_AGE", "2.0"))
+PRESENCE_DEDUP = os.getenv("PRESENCE_DEDUP", "true").lower() == "true"
+PRESENCE_COOLDOWN = float(os.getenv("PRESENCE_COOLDOWN", "60"))
+PRESENCE_TIMEOUT = float(os.getenv("PRESENCE_TIMEOUT", "10"))
+# Seconds between sweeps for "left" events, so they are sent even when no frames arrive
+PRESENCE_SWEEP_INTERVAL = 1.0
 
 # Global analyzer instance
 face_analyzer = None
 
+# Serializes person reloads; concurrent syncs would interleave gallery updates
+persons_lock = asyncio.Lock()
+
+# Worker pool running CPU-bound inference off the event loop
+inference_pool = None
+
+# Background task batching detection events to the backend
+event_reporter = None
+
+# Per-camera token buckets and global in-flight budget; sheds frames instead of queueing
+admission = None
+
+# Reports appeared / still present / left per identity instead of an event per frame
+presence = PresenceFilter(
+    cooldown=PRESENCE_COOLDOWN,
+    absence_timeout=PRESENCE_TIMEOUT
+) if PRESENCE_DEDUP else None
+
+# Per-stage latency histograms, frame and error counters served on /metrics
+metrics = Metrics()
+metrics.describe("vision_frames_shed_total", "Frames shed by admission control, by reason")
+metrics.describe("vision_quality_rejected_total", "Faces rejected by the quality gate, by reason")
+
+# Per-camera motion detector that lets static frames skip analysis
+motion_gate = MotionGate(
+    pixel_threshold=int(os.getenv("MOTION_PIXEL_THRESHOLD", "25")),
+    min_changed_fraction=float(os.getenv("MOTION_MIN_CHANGED_FRACTION", "0.01")),
+    downscale_width=int(os.getenv("MOTION_DOWNSCALE_WIDTH", "160")),
+    max_skip_seconds=float(os.getenv("MOTION_MAX_SKIP_SECONDS", "10")),
+) if os.getenv("MOTION_GATE", "true").lower() == "true" else None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Startup and shutdown events
     """
-    global face_analyzer
+    global face_analyzer, inference_pool, event_reporter, admission
+    presence_sweeper = None
     
     # Startup: Initialize analyzers
     print("🚀 Starting Vision Service...")
     print(f"📡 Backend URL: {BACKEND_URL}")
     
     face_analyzer = FaceAnalyzer(backend_url=BACKEND_URL)
+    face_analyzer.metrics = metrics
+    inference_pool = InferencePool(
+        workers=INFERENCE_WORKERS,
+        max_queue=INFERENCE_QUEUE_LIMIT if INFERENCE_QUEUE_LIMIT >= 0 else None
+    )
+    print(f"🧵 Inference pool: {inference_pool.workers} workers, queue limit {inference_pool.max_queue}")
+    if ADMISSION_CONTROL:
+        admission = AdmissionController(
+            camera_fps=CAMERA_MAX_FPS,
+            burst=CAMERA_BURST,
+            # Default: what the pool accepts, but always room for one full batch
+            max_in_flight=MAX_IN_FLIGHT_FRAMES or max(inference_pool.capacity, MAX_BATCH_FRAMES),
+            downsample_at=DOWNSAMPLE_AT,
+            max_frame_age=MAX_FRAME_AGE
+        )
+        print(f"🚦 Admission: {CAMERA_MAX_FPS} fps per camera, {admission.max_in_flight} frames in flight")
+    event_reporter = EventReporter(
+        backend_url=BACKEND_URL,
+        batch_size=EVENT_BATCH_SIZE,
+        flush_interval=EVENT_FLUSH_INTERVAL,
+        max_pending=EVENT_MAX_PENDING,
+        spool=EventSpool(
+            path=EVENT_SPOOL_DIR,
+            max_bytes=int(EVENT_SPOOL_MAX_MB * 1024 * 1024),
+            segment_bytes=EVENT_SPOOL_SEGMENT_KB * 1024
+        ) if EVENT_SPOOL_DIR else None,
+        replay_interval=EVENT_REPLAY_INTERVAL,
+        metrics=metrics
+    )
+    await event_reporter.start()
+    if face_analyzer.zones:
+        # Zone refreshes reuse the reporter's keep-alive pool instead of a client per fetch
+        face_analyzer.zones.client = event_reporter.client
+    
+    metrics.gauge("vision_inference_in_flight", "Inference jobs running or queued", lambda: inference_pool.in_flight)
+    metrics.gauge("vision_inference_queue_depth", "Inference jobs waiting for a worker", lambda: inference_pool.queue_depth)
+    metrics.counter("vision_inference_rejected_total", "Jobs rejected by a saturated pool", lambda: inference_pool.stats()["rejected"])
+    metrics.gauge("vision_events_pending", "Detection events waiting to be reported", lambda: event_reporter.stats()["pending"])
+    metrics.gauge("vision_events_spooled", "Events held in the on-disk spool",
+                  lambda: event_reporter.spool.stats()["pending"] if event_reporter.spool else 0)
     
     # Load known persons from database
     print("📥 Loading known persons from database...")
     await face_analyzer.load_known_persons()
     
+    if presence:
+        presence_sweeper = asyncio.create_task(_sweep_presence())
+    
     print("✅ Vision Service ready!")
     
     yield
     
     # Shutdown
     print("🛑 Shutting down Vision Service...")
+    if presence_sweeper:
+        presence_sweeper.cancel()
+    inference_pool.shutdown()
+    await event_reporter.stop()
 
 
 app = FastAPI(
@@ -70,27 +183,56 @@ async def health_check():
         "status": "healthy",
         "analyzer_loaded": face_analyzer is not None,
         "known_persons_count": len(face_analyzer.known_persons) if face_analyzer else 0,
-        "backend_url": BACKEND_URL
+        "backend_url": BACKEND_URL,
+        "inference_pool": inference_pool.stats() if inference_pool else None,
+        "admission": admission.stats() if admission else None,
+        "event_reporter": event_reporter.stats() if event_reporter else None,
+        "tracker": face_analyzer.tracker.stats() if face_analyzer and face_analyzer.tracker else None,
+        "quality_gate": face_analyzer.quality_gate.stats() if face_analyzer and face_analyzer.quality_gate else None,
+        "cascade": face_analyzer.cascade.stats() if face_analyzer else None,
+        "motion_gate": motion_gate.stats() if motion_gate else None,
+        "presence": presence.stats() if presence else None
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage latencies, throughput, queue depth and error counts in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/reload-persons")
-async def reload_persons():
+async def reload_persons(
+    full: bool = Query(False, description="Rebuild everything instead of applying only changes"),
+):
     """
-    Reload known persons from database
-    Useful when persons are added/updated in the backend
+    Sync known persons with the database
+    By default only added, updated and deleted persons are applied;
+    pass full=true to reload and rebuild the whole gallery
     """
     global face_analyzer
     
     if not face_analyzer:
         raise HTTPException(status_code=500, detail="Face analyzer not initialized")
     
-    await face_analyzer.load_known_persons()
+    started = time.perf_counter()
+    async with persons_lock:
+        if full:
+            await face_analyzer.load_known_persons()
+            changes = None
+        else:
+            try:
+                changes = await face_analyzer.sync_known_persons()
+            except Exception as e:
+                print(f"⚠️ Incremental person sync failed: {e}")
+                raise HTTPException(status_code=502, detail=f"Failed to sync persons from backend: {e}")
     
     return {
         "status": "success",
-        "message": "Known persons reloaded",
-        "count": len(face_analyzer.known_persons)
+        "message": "Known persons reloaded" if full else "Known persons synced",
+        "count": len(face_analyzer.known_persons),
+        "changes": changes,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
     }
 
 # Set DeepFace home to local directory for portability
@@ -100,61 +242,282 @@ os.environ["DEEPFACE_HOME"] = './model'
 async def analyze_frame(
     file: UploadFile = File(...),
     camera_id: int = Query(1, description="Camera ID for event tracking"),
+    captured_at: Optional[float] = Query(None, description="Capture time (unix seconds), to drop stale frames"),
+    frame_age_ms: Optional[float] = Query(None, description="Frame age at send time on the sender's clock; preferred over captured_at"),
 ):
     """
     Analyze a video frame for faces.
     Detections are reported to the backend events API automatically.
+    Frames over the camera's rate or the node's budget are shed with a
+    429/503 and a Retry-After hint instead of being queued.
     """
     global face_analyzer
     
     if not face_analyzer:
         raise HTTPException(status_code=500, detail="Face analyzer not initialized")
     
+    metrics.frame(camera_id)
+    # Shed before decoding and inference; FastAPI has already read the upload
+    try:
+        scale = _admit(camera_id, captured_at, _seconds(frame_age_ms))
+    except FrameShedError as e:
+        return _shed_response(e, camera_id)
+    
     try:
         # Read and decode image
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        with metrics.time("upload_read", camera_id):
+            contents = await file.read()
+        with metrics.time("decode", camera_id):
+            nparr = np.frombuffer(contents, np.uint8)
+            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
         if frame is None:
+            metrics.error("decode", camera_id)
             raise HTTPException(status_code=400, detail="Invalid image file")
         
-        # Analyze frame using modular analyzer
-        detections = face_analyzer.analyze(frame)
-        
-        # Format response
-        formatted_detections = []
-        for detection in detections:
-            formatted = {
-                "name": detection.get("person_name", "Unknown"),
-                "type": detection.get("person_type", "UNKNOWN"),
-                "confidence": detection.get("confidence", 0.0),
-                "x": detection["bbox"][0],
-                "y": detection["bbox"][1],
-                "w": detection["bbox"][2],
-                "h": detection["bbox"][3],
-            }
-            formatted_detections.append(formatted)
-        
-        # Report detections to backend events API
-        if formatted_detections:
-            await _report_to_backend(camera_id, detections)
+        return await _analyze_decoded(frame, camera_id, scale)
         
+    except HTTPException:
+        raise
+    except PoolSaturatedError as e:
+        metrics.error("busy", camera_id)
+        raise _busy_error(e)
+    except Exception as e:
+        metrics.error("analysis", camera_id)
+        print(f"❌ Analysis error: {e}")
         return {
-            "status": "success",
-            "detections": formatted_detections,
-            "count": len(formatted_detections)
+            "status": "error",
+            "message": str(e),
+            "detections": []
         }
+    finally:
+        if admission:
+            admission.release()
+
+
+@app.post("/analyze-raw")
+async def analyze_raw_frame(request: Request):
+    """
+    Analyze an uncompressed frame sent in the raw ingest format.
+    The body is a fixed header (width, height, camera_id, capture timestamp)
+    followed by BGR or YUV 4:2:0 pixels, so no image decode is needed.
+    An optional frame_age_ms query parameter gives the frame's age on the
+    sender's clock, which is used instead of the header timestamp.
+    """
+    global face_analyzer
+    
+    if not face_analyzer:
+        raise HTTPException(status_code=500, detail="Face analyzer not initialized")
+    
+    # The camera is only known once the header is parsed, so time both stages by hand
+    started = time.perf_counter()
+    body = await request.body()
+    read_at = time.perf_counter()
+    try:
+        header, frame = decode_raw_frame(body)
+    except RawFrameError as e:
+        metrics.error("decode")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    camera_id = header.camera_id
+    metrics.frame(camera_id)
+    metrics.observe("upload_read", read_at - started, camera_id)
+    metrics.observe("decode", time.perf_counter() - read_at, camera_id)
+    frame_age = _seconds(request.query_params.get("frame_age_ms"))
+    try:
+        scale = _admit(camera_id, header.timestamp, frame_age)
+    except FrameShedError as e:
+        return _shed_response(e, camera_id)
+    
+    try:
+        result = await _analyze_decoded(frame, camera_id, scale)
+        if frame_age is None:
+            result["frame_age_ms"] = round((time.time() - header.timestamp) * 1000, 1)
+        else:
+            result["frame_age_ms"] = round((frame_age + time.perf_counter() - started) * 1000, 1)
+        return result
         
-    except HTTPException:
-        raise
+    except PoolSaturatedError as e:
+        metrics.error("busy", camera_id)
+        raise _busy_error(e)
     except Exception as e:
+        metrics.error("analysis", camera_id)
         print(f"❌ Analysis error: {e}")
         return {
             "status": "error",
             "message": str(e),
             "detections": []
         }
+    finally:
+        if admission:
+            admission.release()
+
+
+async def _analyze_decoded(frame: np.ndarray, camera_id: int, scale: Optional[float] = None) -> dict:
+    """Run the analysis pipeline on a decoded frame and queue its events."""
+    # Static scene: nothing new to find, skip the expensive analysis
+    if motion_gate and not motion_gate.should_analyze(camera_id, frame):
+        if presence:
+            presence.touch(camera_id)
+        return {
+            "status": "success",
+            "detections": [],
+            "count": 0,
+            "skipped": "no_motion"
+        }
+    
+    # Make sure the camera's zones are known before restricting detection to them
+    if face_analyzer.zones:
+        await face_analyzer.zones.refresh(camera_id)
+    
+    # Analyze frame using modular analyzer, off the event loop; includes time queued for a worker
+    with metrics.time("inference", camera_id):
+        detections = await inference_pool.run(face_analyzer.analyze, frame, camera_id, scale)
+    
+    # Format response
+    formatted_detections = [_format_detection(detection) for detection in detections]
+    
+    # Queue detections for the backend events API; sent in the background
+    _report(camera_id, detections)
+    
+    result = {
+        "status": "success",
+        "detections": formatted_detections,
+        "count": len(formatted_detections)
+    }
+    if scale:
+        result["downsampled"] = True
+    return result
+
+
+@app.post("/analyze-batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(..., description="JPEG/PNG frames"),
+    camera_ids: Optional[List[int]] = Query(None, description="Camera ID per frame, or a single ID for all"),
+):
+    """
+    Analyze several frames in one request.
+    Frames may come from different cameras; faces from all frames are
+    matched against the gallery together. Returns one result per frame.
+    """
+    global face_analyzer
+    
+    if not face_analyzer:
+        raise HTTPException(status_code=500, detail="Face analyzer not initialized")
+    
+    if len(files) > MAX_BATCH_FRAMES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_FRAMES} frames per batch")
+    
+    if not camera_ids:
+        camera_ids = [1] * len(files)
+    elif len(camera_ids) == 1:
+        camera_ids = camera_ids * len(files)
+    elif len(camera_ids) != len(files):
+        raise HTTPException(status_code=400, detail="camera_ids must match the number of files")
+    
+    frames = []
+    errors = {}
+    static = set()
+    shed = {}
+    scales = {}
+    try:
+        # Decode every frame up front; undecodable frames get an error result.
+        # Inside the try, so the slots taken so far are released if a read fails
+        for index, file in enumerate(files):
+            metrics.frame(camera_ids[index])
+            try:
+                scales[index] = _admit(camera_ids[index])
+            except FrameShedError as e:
+                metrics.inc("vision_frames_shed_total", reason=e.reason, camera_id=camera_ids[index])
+                shed[index] = e
+                continue
+            with metrics.time("upload_read", camera_ids[index]):
+                contents = await file.read()
+            with metrics.time("decode", camera_ids[index]):
+                frame = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                metrics.error("decode", camera_ids[index])
+                errors[index] = "Invalid image file"
+            elif motion_gate and not motion_gate.should_analyze(camera_ids[index], frame):
+                static.add(index)
+            else:
+                frames.append((index, frame))
+        
+        if face_analyzer.zones:
+            for camera_id in {camera_ids[index] for index, _ in frames}:
+                await face_analyzer.zones.refresh(camera_id)
+        
+        batch_detections = await inference_pool.run(
+            face_analyzer.analyze_batch,
+            [frame for _, frame in frames],
+            [camera_ids[index] for index, _ in frames],
+            [scales[index] for index, _ in frames]
+        ) if frames else []
+    except PoolSaturatedError as e:
+        metrics.error("busy")
+        raise _busy_error(e)
+    except Exception as e:
+        metrics.error("analysis")
+        print(f"❌ Batch analysis error: {e}")
+        return {
+            "status": "error",
+            "message": str(e),
+            "results": []
+        }
+    finally:
+        if admission:
+            for _ in scales:
+                admission.release()
+    
+    detections_by_index = {index: detections for (index, _), detections in zip(frames, batch_detections)}
+    
+    results = []
+    for index, camera_id in enumerate(camera_ids):
+        if index in shed:
+            results.append({
+                "camera_id": camera_id,
+                "status": "shed",
+                "reason": shed[index].reason,
+                "retry_after": round(shed[index].retry_after, 3),
+                "detections": [],
+                "count": 0
+            })
+            continue
+        if index in errors:
+            results.append({
+                "camera_id": camera_id,
+                "status": "error",
+                "message": errors[index],
+                "detections": [],
+                "count": 0
+            })
+            continue
+        
+        detections = detections_by_index.get(index, [])
+        formatted_detections = [_format_detection(detection) for detection in detections]
+        if index in static:
+            if presence:
+                presence.touch(camera_id)
+        else:
+            _report(camera_id, detections)
+        
+        result = {
+            "camera_id": camera_id,
+            "status": "success",
+            "detections": formatted_detections,
+            "count": len(formatted_detections)
+        }
+        if index in static:
+            result["skipped"] = "no_motion"
+        if scales.get(index):
+            result["downsampled"] = True
+        results.append(result)
+    
+    return {
+        "status": "success",
+        "results": results,
+        "count": len(results)
+    }
 
 
 @app.post("/detect-only")
@@ -182,8 +545,8 @@ async def detect_faces_only(file: UploadFile = File(...)):
         if frame is None:
             raise HTTPException(status_code=400, detail="Invalid image file")
         
-        # Detect faces only (no recognition)
-        detections = face_analyzer.detect_faces(frame)
+        # Detect faces only (no recognition), off the event loop
+        detections = await inference_pool.run(face_analyzer.detect_faces, frame)
         
         return {
             "status": "success",
@@ -193,6 +556,8 @@ async def detect_faces_only(file: UploadFile = File(...)):
         
     except HTTPException:
         raise
+    except PoolSaturatedError as e:
+        raise _busy_error(e)
     except Exception as e:
         print(f"❌ Detection error: {e}")
         return {
@@ -202,28 +567,103 @@ async def detect_faces_only(file: UploadFile = File(...)):
         }
 
 
-async def _report_to_backend(camera_id: int, detections: list) -> None:
-    """Report detections to backend events API (fire-and-forget)."""
+def _admit(camera_id: int, captured_at: Optional[float] = None, age: Optional[float] = None) -> Optional[float]:
+    """
+    Admit a frame, returning the detection scale to use (None keeps the camera's).
+    Every admitted frame must be released with admission.release().
+    
+    Raises:
+        FrameShedError: If the frame is stale or over the camera's or node's budget
+    """
+    if admission is None:
+        return None
+    return DOWNSAMPLE_SCALE if admission.admit(camera_id, captured_at, age) else None
+
+
+def _seconds(milliseconds) -> Optional[float]:
+    """A millisecond query value in seconds, or None when absent or malformed."""
     try:
-        async with httpx.AsyncClient() as client:
-            for detection in detections:
-                event_data = {
-                    "camera_id": camera_id,
-                    "type": detection.get("type", "face_detected"),
-                    "event_metadata": {
-                        "person_name": detection.get("person_name", "Unknown"),
-                        "person_type": detection.get("person_type", "UNKNOWN"),
-                        "confidence": detection.get("confidence", 0.0),
-                        "bbox": detection.get("bbox", []),
-                    },
-                }
-                await client.post(
-                    f"{BACKEND_URL}/api/v1/events/",
-                    json=event_data,
-                    timeout=5.0,
-                )
-    except Exception as e:
-        print(f"⚠️ Failed to report event to backend: {e}")
+        return float(milliseconds) / 1000.0
+    except (TypeError, ValueError):
+        return None
+
+
+def _shed_response(error: FrameShedError, camera_id: int):
+    """Tell the sender a frame was dropped and, unless it was just stale, when to send again."""
+    metrics.inc("vision_frames_shed_total", reason=error.reason, camera_id=camera_id)
+    if error.reason == "stale":
+        return {
+            "status": "success",
+            "detections": [],
+            "count": 0,
+            "skipped": "stale"
+        }
+    
+    return JSONResponse(
+        status_code=429 if error.reason == "rate_limited" else 503,
+        content={
+            "status": "shed",
+            "reason": error.reason,
+            "retry_after": round(error.retry_after, 3),
+            "detections": []
+        },
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
+
+
+def _busy_error(error: PoolSaturatedError) -> HTTPException:
+    """503 telling the caller to retry once the inference pool drains."""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+
+def _format_detection(detection: dict) -> dict:
+    """Flatten an analyzer detection into the API response format."""
+    return {
+        "name": detection.get("person_name", "Unknown"),
+        "type": detection.get("person_type", "UNKNOWN"),
+        "confidence": detection.get("confidence", 0.0),
+        "x": detection["bbox"][0],
+        "y": detection["bbox"][1],
+        "w": detection["bbox"][2],
+        "h": detection["bbox"][3],
+        "track_id": detection.get("track_id"),
+        "rejected": detection.get("rejected"),
+    }
+
+
+def _reportable(detections: list) -> list:
+    """Detections worth an event; faces rejected by the quality gate are not."""
+    return [detection for detection in detections if not detection.get("rejected")]
+
+
+def _report(camera_id: int, detections: list) -> None:
+    """Queue a frame's events, deduplicated into presence transitions when enabled."""
+    reportable = _reportable(detections)
+    if presence is None:
+        if reportable:
+            event_reporter.enqueue(camera_id, reportable)
+        return
+    
+    _enqueue_presence(presence.update(camera_id, reportable))
+
+
+def _enqueue_presence(transitions: list) -> None:
+    """Queue presence transitions, grouped by the camera they belong to."""
+    by_camera = {}
+    for event_camera_id, detection in transitions:
+        by_camera.setdefault(event_camera_id, []).append(detection)
+    for event_camera_id, events in by_camera.items():
+        event_reporter.enqueue(event_camera_id, events)
+
+
+async def _sweep_presence() -> None:
+    """Emit "left" events for cameras that stopped sending frames."""
+    while True:
+        await asyncio.sleep(PRESENCE_SWEEP_INTERVAL)
+        try:
+            _enqueue_presence(presence.expire())
+        except Exception as e:
+            print(f"⚠️ Presence sweep failed: {e}")
 
 
 if __name__ == "__main__":
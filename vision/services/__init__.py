@@ -0,0 +1,18 @@
+"""
+Vision services package
+Runtime infrastructure shared by the vision API endpoints
+"""
+
+from .admission import AdmissionController, FrameShedError
+from .inference_pool import InferencePool, PoolSaturatedError
+from .event_reporter import EventReporter
+from .event_spool import EventSpool
+from .metrics import Metrics
+from .presence import PresenceFilter
+from .raw_frame import RawFrameError, decode_raw_frame, encode_raw_frame
+
+__all__ = [
+    'AdmissionController', 'FrameShedError',
+    'InferencePool', 'PoolSaturatedError', 'EventReporter', 'EventSpool',
+    'Metrics', 'PresenceFilter', 'RawFrameError', 'decode_raw_frame', 'encode_raw_frame'
+]
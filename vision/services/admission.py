@@ -0,0 +1,145 @@
+"""
+Admission Module
+Per-camera rate limits and a global in-flight budget for incoming frames
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+
+class FrameShedError(Exception):
+    """Raised when a frame is dropped instead of being analyzed."""
+
+    def __init__(self, reason: str, retry_after: float = 0.0):
+        super().__init__(f"Frame shed: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+    accepted: int = 0
+    downsampled: int = 0
+    shed_rate: int = 0
+    shed_overload: int = 0
+    shed_stale: int = 0
+
+
+class AdmissionController:
+    """
+    Frame admission control
+    Each camera has a token bucket refilled at `camera_fps`, so one busy
+    camera cannot starve the others, and all cameras share a budget of
+    `max_in_flight` frames being analyzed. Frames over budget or older than
+    `max_frame_age` are shed immediately instead of queueing; as the
+    budget fills up, admitted frames are flagged for cheaper, downsampled
+    detection. Shed frames carry a retry-after hint for the sender.
+    """
+
+    def __init__(self, camera_fps: float = 5.0, burst: float = 5.0, max_in_flight: int = 8,
+                 downsample_at: float = 0.75, max_frame_age: float = 2.0):
+        """
+        Initialize the controller
+
+        Args:
+            camera_fps: Sustained frames per second admitted per camera
+            burst: Frames a camera may send back-to-back before rate limiting applies
+            max_in_flight: Frames analyzed at once across all cameras
+            downsample_at: In-flight fraction of the budget from which frames are downsampled
+            max_frame_age: Frames captured longer ago than this (seconds) are dropped as stale
+        """
+        self.camera_fps = camera_fps
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.downsample_at = downsample_at
+        self.max_frame_age = max_frame_age
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def admit(self, camera_id: Hashable, captured_at: Optional[float] = None,
+              age: Optional[float] = None) -> bool:
+        """
+        Take a slot for one frame; pair every successful call with release()
+
+        Args:
+            camera_id: Camera the frame came from
+            captured_at: Capture time (unix seconds), when the sender knows it
+            age: Seconds since capture as measured by the sender; preferred over
+                 captured_at, which is only comparable if both clocks agree
+
+        Returns:
+            True if the frame should be analyzed downsampled
+
+        Raises:
+            FrameShedError: If the frame is stale, the camera is over its rate,
+                            or the node is at its in-flight budget
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(camera_id)
+            if bucket is None:
+                bucket = self._buckets[camera_id] = _Bucket(tokens=self.burst, updated_at=now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.camera_fps)
+            bucket.updated_at = now
+
+            if age is None and captured_at is not None:
+                age = time.time() - captured_at
+            if age is not None and age > self.max_frame_age:
+                bucket.shed_stale += 1
+                if bucket.shed_stale == 1:
+                    # Every frame of a sender with a skewed clock looks stale; make that visible
+                    print(f"⚠️ Camera {camera_id}: dropping frames as stale ({age:.1f}s old, "
+                          f"max {self.max_frame_age:g}s); if they are not late, check the sender's clock")
+                raise FrameShedError("stale")
+
+            if bucket.tokens < 1.0:
+                bucket.shed_rate += 1
+                raise FrameShedError("rate_limited", (1.0 - bucket.tokens) / self.camera_fps)
+
+            if self._in_flight >= self.max_in_flight:
+                bucket.shed_overload += 1
+                # Roughly one frame interval; by then a slot has likely freed up
+                raise FrameShedError("overloaded", 1.0 / self.camera_fps)
+
+            bucket.tokens -= 1.0
+            self._in_flight += 1
+            downsample = self._in_flight > self.downsample_at * self.max_in_flight
+            if downsample:
+                bucket.downsampled += 1
+            else:
+                bucket.accepted += 1
+            return downsample
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            cameras = {
+                str(camera_id): {
+                    "accepted": bucket.accepted,
+                    "downsampled": bucket.downsampled,
+                    "shed": {
+                        "rate_limited": bucket.shed_rate,
+                        "overloaded": bucket.shed_overload,
+                        "stale": bucket.shed_stale,
+                    },
+                }
+                for camera_id, bucket in self._buckets.items()
+            }
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "shed": sum(sum(camera["shed"].values()) for camera in cameras.values()),
+                "cameras": cameras,
+            }
@@ -0,0 +1,219 @@
+"""
+Event Reporter Module
+Batches detection events in the background and sends them to the backend in bulk
+"""
+
+import asyncio
+import time
+import httpx
+from typing import Dict, List, Optional
+
+from .event_spool import EventSpool
+from .metrics import Metrics
+
+
+class EventReporter:
+    """
+    Background reporter for detection events
+    Endpoints enqueue events without waiting on the backend. A single task
+    drains the queue and posts whatever accumulated to the bulk events API,
+    flushing once `batch_size` events are pending or `flush_interval` seconds
+    after the first one arrived. One pooled client is reused for every request.
+    With a spool attached, batches the backend fails to accept (or that would
+    only pile up while it is slow) are written to disk and replayed by a
+    second task once the backend answers again.
+    """
+
+    def __init__(self, backend_url: str, batch_size: int = 100, flush_interval: float = 1.0,
+                 max_pending: int = 10000, timeout: float = 5.0,
+                 spool: Optional[EventSpool] = None, replay_interval: float = 5.0,
+                 metrics: Optional[Metrics] = None):
+        """
+        Initialize the reporter
+
+        Args:
+            backend_url: URL of the backend API to report events to
+            batch_size: Events per bulk request; reaching it triggers a flush
+            flush_interval: Longest time an event waits before being sent
+            max_pending: Events held in memory before new ones are dropped
+            timeout: Timeout of each bulk request
+            spool: On-disk spool for batches that could not be delivered
+            replay_interval: Seconds between replay attempts while the backend is down
+            metrics: Registry receiving bulk request timings and failures
+        """
+        self.backend_url = backend_url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.spool = spool
+        self.replay_interval = replay_interval
+        self.metrics = metrics
+        self._backend_down = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._sent = 0
+        self._spooled = 0
+        self._failed = 0
+        self._dropped = 0
+        self._batches = 0
+
+    @property
+    def client(self) -> Optional[httpx.AsyncClient]:
+        """The pooled backend client, open between start() and stop()."""
+        return self._client
+
+    async def start(self) -> None:
+        """Open the pooled client and start the flush task."""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._client = httpx.AsyncClient(
+            base_url=self.backend_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4)
+        )
+        self._task = asyncio.create_task(self._run())
+        if self.spool is not None:
+            self._replay_task = asyncio.create_task(self._replay())
+
+    async def stop(self) -> None:
+        """Send (or spool) everything still queued, then close the client."""
+        for task in (self._task, self._replay_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._replay_task = None
+
+        if self._queue:
+            remaining = []
+            while not self._queue.empty():
+                remaining.append(self._queue.get_nowait())
+            for start in range(0, len(remaining), self.batch_size):
+                await self._deliver(remaining[start:start + self.batch_size])
+
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def enqueue(self, camera_id: int, detections: list) -> None:
+        """Queue one event per detection; never blocks the caller."""
+        if self._queue is None:
+            self._dropped += len(detections)
+            return
+
+        for detection in detections:
+            try:
+                self._queue.put_nowait(_to_event(camera_id, detection))
+            except asyncio.QueueFull:
+                self._dropped += 1
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            # Keep collecting until the batch is full or the oldest event is due
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: List[Dict]) -> None:
+        """Send a batch, falling back to the spool when the backend cannot take it."""
+        if self.spool is not None:
+            # Down or falling behind: go straight to disk instead of waiting on timeouts
+            lagging = self._queue is not None and self._queue.qsize() >= self.max_pending // 2
+            if self._backend_down or lagging:
+                await self._spool(batch)
+                return
+
+        if not await self._send(batch):
+            if self.spool is not None:
+                self._backend_down = True
+                await self._spool(batch)
+            else:
+                self._failed += len(batch)
+
+    async def _send(self, batch: List[Dict]) -> bool:
+        if not batch:
+            return True
+        started = time.perf_counter()
+        try:
+            response = await self._client.post("/api/v1/events/bulk", json={"events": batch})
+            response.raise_for_status()
+            self._sent += len(batch)
+            self._batches += 1
+            return True
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.error("report")
+            print(f"⚠️ Failed to report {len(batch)} events to backend: {e}")
+            return False
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe("report", time.perf_counter() - started)
+
+    async def _spool(self, batch: List[Dict]) -> None:
+        try:
+            await asyncio.to_thread(self.spool.append, batch)
+            self._spooled += len(batch)
+        except Exception as e:
+            self._failed += len(batch)
+            print(f"⚠️ Failed to spool {len(batch)} events: {e}")
+
+    async def _replay(self) -> None:
+        """Drain the spool in batches; doubles as the backend recovery probe."""
+        while True:
+            if len(self.spool) == 0:
+                await asyncio.sleep(self.replay_interval)
+                continue
+
+            batch, token = await asyncio.to_thread(self.spool.read_batch, self.batch_size)
+            if await self._send(batch):
+                await asyncio.to_thread(self.spool.ack, token)
+                if self._backend_down:
+                    print("✅ Backend reachable again, replaying spooled events")
+                self._backend_down = False
+            else:
+                self._backend_down = True
+                await asyncio.sleep(self.replay_interval)
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "sent": self._sent,
+            "batches": self._batches,
+            "spooled": self._spooled,
+            "failed": self._failed,
+            "dropped": self._dropped,
+            "backend_down": self._backend_down,
+            "spool": self.spool.stats() if self.spool is not None else None,
+        }
+
+
+def _to_event(camera_id: int, detection: dict) -> Dict:
+    """Backend event payload for one analyzer detection."""
+    return {
+        "camera_id": camera_id,
+        "type": detection.get("type", "face_detected"),
+        "event_metadata": {
+            "person_id": detection.get("person_id"),
+            "person_name": detection.get("person_name", "Unknown"),
+            "person_type": detection.get("person_type", "UNKNOWN"),
+            "confidence": detection.get("confidence", 0.0),
+            "bbox": detection.get("bbox", []),
+            "track_id": detection.get("track_id"),
+            "presence": detection.get("presence"),
+            "duration": detection.get("duration"),
+        },
+    }
@@ -0,0 +1,176 @@
+"""
+Event Spool Module
+Bounded append-only on-disk buffer for events the backend could not take
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class EventSpool:
+    """
+    Segmented JSON-lines spool
+    Events are appended to the newest segment file, which is rotated once it
+    reaches `segment_bytes`. Replay reads from the oldest segment and deletes
+    it once fully acknowledged. When the spool grows past `max_bytes` whole
+    segments are evicted oldest-first, so a long outage loses the oldest
+    events rather than the newest. Delivery is at-least-once: a crash between
+    a successful send and its acknowledgement replays that batch again.
+    """
+
+    SUFFIX = ".jsonl"
+
+    def __init__(self, path: str = "./event_spool", max_bytes: int = 64 * 1024 * 1024,
+                 segment_bytes: int = 1024 * 1024):
+        """
+        Initialize the spool, picking up segments left by a previous run
+
+        Args:
+            path: Directory holding the segment files
+            max_bytes: Total size above which the oldest segments are evicted
+            segment_bytes: Size at which the active segment is rotated
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.segment_bytes = min(segment_bytes, max_bytes)
+        self._lock = threading.Lock()
+        # Segment name -> [bytes, events], oldest first
+        self._segments: Dict[str, List[int]] = {}
+        self._next_segment = 0
+        self._replay_offset = 0
+        self._replay_consumed = 0
+        self._appended = 0
+        self._replayed = 0
+        self._evicted = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        for name in sorted(os.listdir(self.path)):
+            if not name.endswith(self.SUFFIX):
+                continue
+            with open(os.path.join(self.path, name), "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    # Torn write from a crash: drop the partial line so the next
+                    # append does not glue a good event onto it
+                    data = data[:data.rfind(b"\n") + 1]
+                    f.truncate(len(data))
+            self._segments[name] = [len(data), data.count(b"\n")]
+            self._next_segment = max(self._next_segment, int(name[:-len(self.SUFFIX)]) + 1)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._pending_locked()
+
+    def _pending_locked(self) -> int:
+        return sum(events for _, events in self._segments.values()) - self._replay_consumed
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(size for size, _ in self._segments.values())
+
+    def _segment_path(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _new_segment(self) -> str:
+        name = f"{self._next_segment:012d}{self.SUFFIX}"
+        self._next_segment += 1
+        self._segments[name] = [0, 0]
+        return name
+
+    def append(self, events: List[Dict]) -> None:
+        """Write events to the active segment, rotating and evicting as needed."""
+        if not events:
+            return
+        data = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events).encode()
+
+        with self._lock:
+            active = next(reversed(self._segments), None)
+            if active is None or self._segments[active][0] >= self.segment_bytes:
+                active = self._new_segment()
+
+            with open(self._segment_path(active), "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._segments[active][0] += len(data)
+            self._segments[active][1] += len(events)
+            self._appended += len(events)
+
+            while sum(size for size, _ in self._segments.values()) > self.max_bytes and len(self._segments) > 1:
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        oldest = next(iter(self._segments))
+        self._evicted += self._segments[oldest][1] - self._replay_consumed
+        self._drop_segment(oldest)
+
+    def _drop_segment(self, name: str) -> None:
+        del self._segments[name]
+        self._replay_offset = 0
+        self._replay_consumed = 0
+        try:
+            os.remove(self._segment_path(name))
+        except FileNotFoundError:
+            pass
+
+    def read_batch(self, limit: int) -> Tuple[List[Dict], Optional[Tuple[str, int, int]]]:
+        """
+        Read up to `limit` unacknowledged events from the oldest segment
+
+        Returns:
+            (events, token); pass the token to ack() once the events were delivered
+        """
+        with self._lock:
+            if not self._segments:
+                return [], None
+            oldest = next(iter(self._segments))
+
+            events: List[Dict] = []
+            lines = 0
+            with open(self._segment_path(oldest), "rb") as f:
+                f.seek(self._replay_offset)
+                while lines < limit:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    lines += 1
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        # Torn write from a crash; skip the line
+                        continue
+                offset = f.tell() if lines else self._replay_offset
+
+            return events, (oldest, offset, lines)
+
+    def ack(self, token: Optional[Tuple[str, int, int]]) -> None:
+        """Mark a batch returned by read_batch() as delivered."""
+        if token is None:
+            return
+        name, offset, lines = token
+
+        with self._lock:
+            # The segment may have been evicted while the batch was in flight
+            if name not in self._segments or next(iter(self._segments)) != name:
+                return
+            self._replay_offset = offset
+            self._replay_consumed += lines
+            self._replayed += lines
+
+            size, events = self._segments[name]
+            if offset >= size and self._replay_consumed >= events:
+                self._drop_segment(name)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending": self._pending_locked(),
+                "bytes": sum(size for size, _ in self._segments.values()),
+                "segments": len(self._segments),
+                "appended": self._appended,
+                "replayed": self._replayed,
+                "evicted": self._evicted,
+            }
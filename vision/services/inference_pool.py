@@ -0,0 +1,95 @@
+"""
+Inference Pool Module
+Runs CPU-bound analyzer calls off the event loop with bounded queueing
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the pool already holds as many jobs as it accepts."""
+
+
+class InferencePool:
+    """
+    Bounded worker pool for model inference
+    Jobs run in worker threads so the event loop keeps serving health checks
+    and uploads. Once `workers + max_queue` jobs are in flight, new jobs are
+    rejected immediately instead of piling up.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        """
+        Initialize the pool
+
+        Args:
+            workers: Number of worker threads (defaults to the CPU count)
+            max_queue: Jobs allowed to wait for a free worker (defaults to `workers`)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers if max_queue is None else max_queue
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    @property
+    def saturated(self) -> bool:
+        return self._in_flight >= self.capacity
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn(*args, **kwargs) on a worker thread
+
+        Raises:
+            PoolSaturatedError: If the pool is already at capacity
+        """
+        # Only touched from the event loop thread, so no lock is needed
+        if self.saturated:
+            self._rejected += 1
+            raise PoolSaturatedError(f"Inference pool is busy ({self._in_flight} jobs in flight)")
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(partial(fn, *args, **kwargs))
+        self._in_flight += 1
+        # Released when the job really finishes: if the awaiting request is
+        # cancelled the worker thread keeps running and must still be counted
+        future.add_done_callback(partial(self._on_done, loop))
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, _future) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # Event loop already closed at shutdown
+            pass
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,174 @@
+"""
+Metrics Module
+Per-stage latency histograms and counters rendered in the Prometheus text format
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+# Upper bounds in seconds, from sub-millisecond matching up to multi-second detection
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple((key, str(value)) for key, value in sorted(labels.items()) if value is not None)
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, buckets: Tuple[float, ...], value: float) -> None:
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    In-process metrics registry
+    Stage timings go into fixed-bucket histograms labeled by stage and camera,
+    counters track frames and errors, and gauges are read from callbacks at
+    scrape time. Frames per second is derived from a sliding window of frame
+    timestamps per camera.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, fps_window: float = 10.0):
+        """
+        Initialize an empty registry
+
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+            fps_window: Seconds of history used for the frames-per-second gauge
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.fps_window = fps_window
+        self._histograms: Dict[Labels, _Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._frame_times: Dict[str, Deque[float]] = {}
+        # (name, help, type, read) of metrics read from callbacks at scrape time
+        self._callbacks: List[Tuple[str, str, str, Callable[[], float]]] = []
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.describe("vision_frames_total", "Frames received")
+        self.describe("vision_errors_total", "Frames that failed, by kind")
+
+    def observe(self, stage: str, seconds: float, camera_id: Optional[Hashable] = None) -> None:
+        """Record one duration of a pipeline stage."""
+        key = _labels(stage=stage, camera_id=camera_id)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(self.buckets, seconds)
+
+    @contextmanager
+    def time(self, stage: str, camera_id: Optional[Hashable] = None) -> Iterator[None]:
+        """Time the enclosed block as one observation of `stage`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, camera_id)
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Set the HELP text rendered for a counter updated through inc()."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, _labels(**labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def frame(self, camera_id: Hashable) -> None:
+        """Count a received frame for the frames total and fps gauge."""
+        now = time.monotonic()
+        self.inc("vision_frames_total", camera_id=camera_id)
+        with self._lock:
+            times = self._frame_times.setdefault(str(camera_id), deque())
+            times.append(now)
+            while times and now - times[0] > self.fps_window:
+                times.popleft()
+
+    def error(self, kind: str, camera_id: Optional[Hashable] = None) -> None:
+        self.inc("vision_errors_total", kind=kind, camera_id=camera_id)
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Register a gauge whose value is read when metrics are rendered."""
+        self._callbacks.append((name, help_text, "gauge", read))
+
+    def counter(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Register a monotonically increasing count kept elsewhere, read when metrics are rendered."""
+        self._callbacks.append((name, help_text, "counter", read))
+
+    def fps(self) -> Dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            rates = {}
+            for camera_id, times in self._frame_times.items():
+                while times and now - times[0] > self.fps_window:
+                    times.popleft()
+                rates[camera_id] = len(times) / self.fps_window
+            return rates
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP vision_stage_seconds Time spent in each analysis stage",
+            "# TYPE vision_stage_seconds histogram",
+        ]
+        with self._lock:
+            histograms = [(labels, list(h.counts), h.sum, h.count) for labels, h in sorted(self._histograms.items())]
+            counters = sorted(self._counters.items())
+
+        for labels, counts, total, count in histograms:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"vision_stage_seconds_bucket{_format_labels(labels, ('le', repr(bound)))} {cumulative}")
+            lines.append(f"vision_stage_seconds_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+            lines.append(f"vision_stage_seconds_sum{_format_labels(labels)} {total}")
+            lines.append(f"vision_stage_seconds_count{_format_labels(labels)} {count}")
+
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        lines.append("# HELP vision_frames_per_second Frames received per second over the recent window")
+        lines.append("# TYPE vision_frames_per_second gauge")
+        for camera_id, rate in sorted(self.fps().items()):
+            lines.append(f"vision_frames_per_second{_format_labels(_labels(camera_id=camera_id))} {rate:g}")
+
+        for name, help_text, kind, read in self._callbacks:
+            try:
+                value = float(read())
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value:g}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,142 @@
+"""
+Presence Module
+Turns per-frame detections into appeared / still-present / left transitions
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class _Presence:
+    detection: Dict
+    first_seen: float
+    last_seen: float
+    last_reported: float
+
+
+def _identity(detection: Dict) -> Tuple:
+    """
+    Who a detection is within its camera: the person for matches, the face
+    track for unknowns. Persons are keyed by id, as two people can share a name.
+    """
+    if detection.get("type") == "person_detected":
+        person_id = detection.get("person_id")
+        return ("person", person_id) if person_id is not None else ("person_name", detection.get("person_name"))
+    if detection.get("track_id") is not None:
+        return ("track", detection["track_id"])
+    # Without tracking every unknown face on the camera looks alike
+    return (detection.get("type", "face_detected"),)
+
+
+class PresenceFilter:
+    """
+    Temporal deduplication of detection events
+    Each camera keeps one entry per identity. An identity's first detection
+    is reported as "appeared", later ones are suppressed except for a
+    "present" reminder every `cooldown` seconds, and once it has not been
+    seen for `absence_timeout` seconds a single "left" event is emitted.
+    Absences are checked on every update, for all cameras, and by expire(),
+    which the service also runs periodically so "left" events are emitted
+    even when no camera is sending frames.
+    """
+
+    def __init__(self, cooldown: float = 60.0, absence_timeout: float = 10.0):
+        """
+        Initialize the filter
+
+        Args:
+            cooldown: Seconds between "present" reminders for an identity still in view
+            absence_timeout: Seconds unseen after which an identity has left
+        """
+        self.cooldown = cooldown
+        self.absence_timeout = absence_timeout
+        self._cameras: Dict[Hashable, Dict[Tuple, _Presence]] = {}
+        self._lock = threading.Lock()
+        self._counts = {"appeared": 0, "present": 0, "left": 0, "suppressed": 0}
+
+    def update(self, camera_id: Hashable, detections: List[Dict],
+               now: Optional[float] = None) -> List[Tuple[Hashable, Dict]]:
+        """
+        Record a frame's detections
+
+        Args:
+            camera_id: Camera the frame came from
+            detections: The frame's reportable detections
+            now: Current time (unix seconds), for testing
+
+        Returns:
+            (camera_id, detection) pairs to report, each with a "presence"
+            of "appeared", "present" or "left"
+        """
+        now = time.time() if now is None else now
+        events = []
+        with self._lock:
+            present = self._cameras.setdefault(camera_id, {})
+            for detection in detections:
+                key = _identity(detection)
+                entry = present.get(key)
+                if entry is None:
+                    present[key] = _Presence(detection, now, now, now)
+                    events.append((camera_id, {**detection, "presence": "appeared"}))
+                    self._counts["appeared"] += 1
+                    continue
+
+                entry.detection = detection
+                entry.last_seen = now
+                if now - entry.last_reported >= self.cooldown:
+                    entry.last_reported = now
+                    events.append((camera_id, {**detection, "presence": "present",
+                                               "duration": round(now - entry.first_seen, 1)}))
+                    self._counts["present"] += 1
+                else:
+                    self._counts["suppressed"] += 1
+
+            events.extend(self._expire(now))
+        return events
+
+    def touch(self, camera_id: Hashable, now: Optional[float] = None) -> None:
+        """Mark everyone on the camera as still seen, e.g. for a frame skipped as static."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for entry in self._cameras.get(camera_id, {}).values():
+                entry.last_seen = now
+
+    def expire(self, now: Optional[float] = None) -> List[Tuple[Hashable, Dict]]:
+        """
+        Emit "left" events for identities unseen for `absence_timeout` seconds
+
+        Args:
+            now: Current time (unix seconds), for testing
+
+        Returns:
+            (camera_id, detection) pairs to report
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._expire(now)
+
+    def _expire(self, now: float) -> List[Tuple[Hashable, Dict]]:
+        events = []
+        for camera_id, present in self._cameras.items():
+            for key in [key for key, entry in present.items() if now - entry.last_seen >= self.absence_timeout]:
+                entry = present.pop(key)
+                events.append((camera_id, {
+                    **entry.detection,
+                    "type": "person_left",
+                    "presence": "left",
+                    "duration": round(entry.last_seen - entry.first_seen, 1),
+                }))
+                self._counts["left"] += 1
+        return events
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "cooldown": self.cooldown,
+                "absence_timeout": self.absence_timeout,
+                "present": sum(len(present) for present in self._cameras.values()),
+                **self._counts,
+            }
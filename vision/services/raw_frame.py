@@ -0,0 +1,94 @@
+"""
+Raw Frame Module
+Binary ingest format carrying uncompressed frames from the relay
+"""
+
+import struct
+import numpy as np
+import cv2
+from dataclasses import dataclass
+from typing import Tuple
+
+
+# magic, version, pixel format, width, height, camera_id, capture timestamp (unix seconds)
+HEADER = struct.Struct("<4sBBHHId")
+MAGIC = b"SSRF"
+VERSION = 1
+
+FORMAT_BGR = 0
+FORMAT_I420 = 1
+FORMAT_NV12 = 2
+
+FORMAT_NAMES = {"bgr": FORMAT_BGR, "i420": FORMAT_I420, "nv12": FORMAT_NV12}
+
+
+class RawFrameError(ValueError):
+    """Raised when a raw frame payload is malformed."""
+
+
+@dataclass
+class RawFrameHeader:
+    pixel_format: int
+    width: int
+    height: int
+    camera_id: int
+    timestamp: float
+
+
+def _payload_size(pixel_format: int, width: int, height: int) -> int:
+    if pixel_format == FORMAT_BGR:
+        return width * height * 3
+    if pixel_format in (FORMAT_I420, FORMAT_NV12):
+        if width % 2 or height % 2:
+            raise RawFrameError("YUV 4:2:0 frames need an even width and height")
+        return width * height * 3 // 2
+    raise RawFrameError(f"Unknown pixel format: {pixel_format}")
+
+
+def decode_raw_frame(body: bytes) -> Tuple[RawFrameHeader, np.ndarray]:
+    """
+    Parse a raw frame payload into its header and a BGR frame
+
+    BGR payloads are wrapped without copying; YUV payloads cost one color conversion.
+
+    Raises:
+        RawFrameError: If the header or payload size is invalid
+    """
+    if len(body) < HEADER.size:
+        raise RawFrameError("Payload is shorter than the frame header")
+
+    magic, version, pixel_format, width, height, camera_id, timestamp = HEADER.unpack_from(body)
+    if magic != MAGIC:
+        raise RawFrameError("Bad frame magic")
+    if version != VERSION:
+        raise RawFrameError(f"Unsupported frame version: {version}")
+    if not width or not height:
+        raise RawFrameError("Frame has no pixels")
+
+    expected = _payload_size(pixel_format, width, height)
+    if len(body) - HEADER.size != expected:
+        raise RawFrameError(f"Expected {expected} payload bytes, got {len(body) - HEADER.size}")
+
+    pixels = np.frombuffer(body, dtype=np.uint8, offset=HEADER.size)
+    if pixel_format == FORMAT_BGR:
+        frame = pixels.reshape(height, width, 3)
+    else:
+        code = cv2.COLOR_YUV2BGR_I420 if pixel_format == FORMAT_I420 else cv2.COLOR_YUV2BGR_NV12
+        frame = cv2.cvtColor(pixels.reshape(height * 3 // 2, width), code)
+
+    return RawFrameHeader(pixel_format, width, height, camera_id, timestamp), frame
+
+
+def encode_raw_frame(frame: np.ndarray, camera_id: int, timestamp: float,
+                     pixel_format: int = FORMAT_BGR) -> bytes:
+    """Pack a BGR frame into the raw ingest format."""
+    if frame.ndim != 3 or frame.shape[2] != 3 or frame.dtype != np.uint8:
+        raise RawFrameError(f"Expected an 8-bit 3-channel BGR frame, got {frame.dtype} {frame.shape}")
+    height, width = frame.shape[:2]
+    if pixel_format == FORMAT_BGR:
+        pixels = np.ascontiguousarray(frame)
+    elif pixel_format == FORMAT_I420:
+        pixels = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+    else:
+        raise RawFrameError(f"Cannot encode pixel format: {pixel_format}")
+    return HEADER.pack(MAGIC, VERSION, pixel_format, width, height, camera_id, timestamp) + pixels.tobytes()
@@ -0,0 +1,8 @@
+"""
+Pytest configuration for the vision service
+"""
+import os
+import sys
+
+# Import analyzers and services the way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+"""
+Tests for frame admission control
+"""
+import time
+
+import pytest
+
+import services.admission as admission_module
+from services.admission import AdmissionController, FrameShedError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"value": 1000.0}
+    monkeypatch.setattr(admission_module.time, "monotonic", lambda: now["value"])
+    return now
+
+
+class TestAdmission:
+    """Test rate limits, the in-flight budget and staleness"""
+
+    def test_rate_limit_and_refill(self, clock):
+        controller = AdmissionController(camera_fps=2, burst=2, max_in_flight=10)
+        for _ in range(2):
+            controller.admit(1)
+            controller.release()
+        with pytest.raises(FrameShedError) as shed:
+            controller.admit(1)
+        assert shed.value.reason == "rate_limited"
+        assert shed.value.retry_after == pytest.approx(0.5)
+
+        clock["value"] += 0.5
+        controller.admit(1)
+        # Other cameras have their own bucket
+        controller.admit(2)
+
+    def test_in_flight_budget(self, clock):
+        controller = AdmissionController(camera_fps=100, burst=100, max_in_flight=2, downsample_at=0.5)
+        assert controller.admit(1) is False
+        assert controller.admit(2) is True
+        with pytest.raises(FrameShedError) as shed:
+            controller.admit(3)
+        assert shed.value.reason == "overloaded"
+
+        controller.release()
+        controller.admit(3)
+        assert controller.in_flight == 2
+
+    def test_stale_by_sender_age(self, clock):
+        controller = AdmissionController(max_frame_age=2)
+        with pytest.raises(FrameShedError) as shed:
+            controller.admit(1, age=2.5)
+        assert shed.value.reason == "stale"
+        assert controller.in_flight == 0
+
+    def test_sender_age_wins_over_skewed_clock(self, clock):
+        controller = AdmissionController(max_frame_age=2)
+        # Sender's clock runs 30s behind ours, but the frame is fresh
+        controller.admit(1, captured_at=time.time() - 30, age=0.1)
+        assert controller.stats()["cameras"]["1"]["shed"]["stale"] == 0
+
+    def test_stale_by_captured_at(self, clock):
+        controller = AdmissionController(max_frame_age=2)
+        controller.admit(1, captured_at=time.time() - 0.5)
+        with pytest.raises(FrameShedError):
+            controller.admit(1, captured_at=time.time() - 5)
+        assert controller.stats()["cameras"]["1"]["shed"]["stale"] == 1
@@ -0,0 +1,119 @@
+"""
+Tests for the exact and IVF embedding indexes
+"""
+import numpy as np
+import pytest
+
+from analyzers.ann_index import ExactIndex, IVFIndex, create_index
+
+
+def _unit_vectors(rng, count, dim=64):
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _noisy(rng, vectors, scale=0.05):
+    noisy = vectors + scale * rng.standard_normal(vectors.shape).astype(np.float32)
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+class TestExactIndex:
+    """Test the brute-force index"""
+
+    def test_empty_search(self):
+        index = ExactIndex()
+        assert index.search(np.zeros((2, 8), dtype=np.float32)) == [None, None]
+
+    def test_add_remove(self):
+        rng = np.random.default_rng(0)
+        vectors = _unit_vectors(rng, 3, dim=8)
+        index = ExactIndex()
+        for item_id, vector in zip("abc", vectors):
+            index.add(item_id, vector)
+
+        assert index.remove("a")
+        assert not index.remove("a")
+        assert sorted(index.ids) == ["b", "c"]
+        assert [match[0] for match in index.search(vectors[1:])] == ["b", "c"]
+
+
+class TestIVFIndex:
+    """Test the inverted-file index against exact search"""
+
+    def test_recall_against_exact(self):
+        rng = np.random.default_rng(1)
+        vectors = _unit_vectors(rng, 2000)
+        ids = list(range(len(vectors)))
+        queries = _noisy(rng, vectors[:200])
+
+        exact = ExactIndex()
+        exact.build(ids, vectors)
+        ivf = IVFIndex(nprobe=8)
+        ivf.build(ids, vectors)
+
+        expected = [match[0] for match in exact.search(queries)]
+        found = [match[0] if match else None for match in ivf.search(queries)]
+        recall = np.mean([a == b for a, b in zip(expected, found)])
+        assert recall >= 0.9
+
+    def test_full_probe_is_exact(self):
+        rng = np.random.default_rng(2)
+        vectors = _unit_vectors(rng, 300)
+        ids = list(range(len(vectors)))
+        queries = _unit_vectors(rng, 50)
+
+        exact = ExactIndex()
+        exact.build(ids, vectors)
+        ivf = IVFIndex(nlist=16, nprobe=16)
+        ivf.build(ids, vectors)
+
+        for (exact_id, exact_sim), (ivf_id, ivf_sim) in zip(exact.search(queries), ivf.search(queries)):
+            assert ivf_id == exact_id
+            assert ivf_sim == pytest.approx(exact_sim, abs=1e-5)
+
+    def test_empty_gallery(self):
+        ivf = IVFIndex()
+        ivf.build([], np.empty((0, 64), dtype=np.float32))
+        assert len(ivf) == 0
+        assert ivf.search(np.zeros((3, 64), dtype=np.float32)) == [None, None, None]
+        assert ivf.export()[0] == []
+
+    def test_add_to_empty_then_remove_all(self):
+        rng = np.random.default_rng(3)
+        vector = _unit_vectors(rng, 1)[0]
+        ivf = IVFIndex()
+        ivf.add("a", vector)
+        assert ivf.search(vector[np.newaxis, :])[0][0] == "a"
+
+        assert ivf.remove("a")
+        assert ivf.search(vector[np.newaxis, :]) == [None]
+
+    def test_rebuild_after_growth(self):
+        rng = np.random.default_rng(4)
+        vectors = _unit_vectors(rng, 100)
+        ivf = IVFIndex(nprobe=100)
+        ivf.build(list(range(10)), vectors[:10])
+
+        # Doubling past the trained size retrains the centroids
+        for item_id in range(10, 100):
+            ivf.add(item_id, vectors[item_id])
+
+        assert len(ivf) == 100
+        assert sorted(ivf.ids) == list(range(100))
+        assert [match[0] for match in ivf.search(vectors)] == list(range(100))
+
+    def test_readd_replaces_vector(self):
+        rng = np.random.default_rng(5)
+        vectors = _unit_vectors(rng, 20)
+        ivf = IVFIndex(nprobe=20)
+        ivf.build(list(range(20)), vectors)
+
+        replacement = _unit_vectors(rng, 1)[0]
+        ivf.add(0, replacement)
+        assert len(ivf) == 20
+        assert ivf.search(replacement[np.newaxis, :])[0][0] == 0
+
+
+def test_create_index_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        create_index("hnsw")
@@ -0,0 +1,108 @@
+"""
+Tests for the two-stage detector cascade
+"""
+import numpy as np
+import pytest
+
+from analyzers.detector_cascade import DetectorCascade, _merge
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+class _Detector:
+    """Second-stage stand-in that finds one face per scanned region."""
+
+    def __init__(self):
+        self.scanned = []
+
+    def __call__(self, region):
+        self.scanned.append(region.shape[:2])
+        return [{"bbox": [5, 5, 20, 20], "confidence": 0.9}]
+
+
+def _cascade(mode="downscale", boxes=((100, 100, 40, 40),), **kwargs):
+    return DetectorCascade(mode=mode, coarse_detect=lambda frame: [list(box) for box in boxes], **kwargs)
+
+
+class TestProposals:
+    """Test which regions the second stage is asked to scan"""
+
+    def test_off_scans_whole_frame(self):
+        assert _cascade(mode="off").propose(1, FRAME) is None
+
+    def test_padded_proposal(self):
+        assert _cascade(roi_padding=0.5).propose(1, FRAME) == [(80, 80, 80, 80)]
+
+    def test_padding_is_clipped_to_frame(self):
+        assert _cascade(boxes=[(0, 0, 40, 40)], roi_padding=0.5).propose(1, FRAME) == [(0, 0, 60, 60)]
+
+    def test_no_proposal_skips_frame(self):
+        assert _cascade(boxes=[]).propose(1, FRAME) == []
+
+    def test_large_proposals_fall_back_to_whole_frame(self):
+        assert _cascade(boxes=[(0, 0, 600, 400)], roi_padding=0.0).propose(1, FRAME) is None
+
+    def test_overlapping_proposals_are_merged(self):
+        assert _merge([(0, 0, 10, 10), (5, 5, 10, 10), (50, 50, 5, 5)]) == [(0, 0, 15, 15), (50, 50, 5, 5)]
+
+    def test_camera_override(self):
+        cascade = DetectorCascade(mode="off", camera_modes={3: "downscale"},
+                                  coarse_detect=lambda frame: [[100, 100, 40, 40]])
+        assert cascade.propose(1, FRAME) is None
+        assert cascade.propose(3, FRAME) is not None
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            DetectorCascade(mode="yolo")
+
+    def test_downscale_needs_coarse_detector(self):
+        with pytest.raises(RuntimeError):
+            DetectorCascade(mode="downscale").propose(1, FRAME)
+
+
+class TestFallback:
+    """Test the order in which first stages are tried"""
+
+    def test_haar_falls_back_to_downscale(self):
+        cascade = _cascade(mode="haar")
+        # Cached "unavailable", as on OpenCV builds without cascade files
+        cascade._haar = False
+        assert cascade.propose(1, FRAME) == [(80, 80, 80, 80)]
+
+    def test_haar_without_classifier_or_coarse_detector(self):
+        cascade = DetectorCascade(mode="haar")
+        cascade._haar = False
+        with pytest.raises(RuntimeError):
+            cascade.propose(1, FRAME)
+
+    def test_haar_used_when_available(self):
+        class Classifier:
+            def detectMultiScale(self, gray, **kwargs):
+                return [(10, 10, 20, 20)]
+
+        cascade = _cascade(mode="haar", haar_width=320, roi_padding=0.0)
+        cascade._haar = Classifier()
+        # Boxes found on the half-size copy are mapped back to the frame
+        assert cascade.propose(1, FRAME) == [(20, 20, 40, 40)]
+
+
+class TestDetect:
+    """Test running the second stage on proposals"""
+
+    def test_faces_are_mapped_to_frame_coordinates(self):
+        detector = _Detector()
+        faces = _cascade(roi_padding=0.5).detect(1, FRAME, detector)
+        assert detector.scanned == [(80, 80)]
+        assert faces[0]["bbox"] == [85, 85, 20, 20]
+
+    def test_skipped_frame_runs_no_detector(self):
+        detector = _Detector()
+        assert _cascade(boxes=[]).detect(1, FRAME, detector) == []
+        assert detector.scanned == []
+
+    def test_stats(self):
+        cascade = _cascade()
+        cascade.detect(1, FRAME, _Detector())
+        cascade.detect(1, FRAME, lambda region: [])
+        stats = cascade.stats()["cameras"]["1"]
+        assert (stats["frames"], stats["fire_rate"], stats["confirm_rate"]) == (2, 1.0, 0.5)
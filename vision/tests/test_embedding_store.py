@@ -0,0 +1,151 @@
+"""
+Tests for the checksum-keyed embedding store
+"""
+import json
+import os
+
+import httpx
+import numpy as np
+import pytest
+
+from analyzers.embedding_store import EmbeddingStore, file_checksum
+from analyzers.face_analyzer import FaceAnalyzer
+
+
+def _vector(seed, dim=8):
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(path=str(tmp_path / "cache"))
+
+
+class TestEmbeddingStore:
+    """Test persisting and reloading embeddings"""
+
+    def test_round_trip(self, store):
+        store.put("a", _vector(0))
+        store.put("b", _vector(1))
+        store.save()
+
+        reloaded = EmbeddingStore(path=store.path)
+        assert reloaded.load() == 2
+        assert isinstance(reloaded._matrix, np.memmap)
+        assert np.allclose(reloaded.get("a"), _vector(0))
+        assert np.allclose(reloaded.take(["b", "a"]), np.stack([_vector(1), _vector(0)]))
+        assert reloaded.get("missing") is None
+
+    def test_save_keeps_only_listed_checksums(self, store):
+        store.put("a", _vector(0))
+        store.put("b", _vector(1))
+        store.save(keep=["b"])
+
+        assert "a" not in store
+        assert np.allclose(store.get("b"), _vector(1))
+
+    def test_other_model_is_ignored(self, store):
+        store.put("a", _vector(0))
+        store.save()
+
+        assert EmbeddingStore(path=store.path, model_name="ArcFace").load() == 0
+
+    def test_index_and_matrix_disagree(self, store):
+        store.put("a", _vector(0))
+        store.put("b", _vector(1))
+        store.save()
+        # An index left behind by a crash that lists fewer rows than the matrix
+        with open(store._index_path, "w", encoding="utf-8") as f:
+            json.dump({"model": store.model_name, "checksums": ["a"]}, f)
+
+        reloaded = EmbeddingStore(path=store.path)
+        assert reloaded.load() == 0
+        assert "a" not in reloaded
+
+    def test_truncated_matrix(self, store):
+        store.put("a", _vector(0))
+        store.save()
+        store._matrix = None
+        with open(store._matrix_path, "r+b") as f:
+            f.truncate(os.path.getsize(store._matrix_path) // 2)
+
+        reloaded = EmbeddingStore(path=store.path)
+        assert reloaded.load() == 0
+
+        # The next save rewrites a usable cache
+        reloaded.put("c", _vector(2))
+        reloaded.save()
+        assert EmbeddingStore(path=store.path).load() == 1
+
+
+class TestPersonEmbeddingCache:
+    """Test that enrollment photos are only embedded when their checksum is new"""
+
+    @pytest.fixture
+    def analyzer(self, tmp_path, monkeypatch):
+        def make():
+            analyzer = FaceAnalyzer(backend_url="http://backend")
+            analyzer.db_path = str(tmp_path / "known_faces")
+            analyzer.embedding_store = EmbeddingStore(path=str(tmp_path / "cache"))
+            analyzer.embedding_store.load()
+            analyzer.embedded = []
+
+            def embed(photo):
+                analyzer.embedded.append(photo)
+                with open(photo, "rb") as f:
+                    return _vector(len(f.read()), dim=128)
+
+            monkeypatch.setattr(analyzer, "_embed_photo", embed)
+            return analyzer
+        return make
+
+    @pytest.fixture
+    def photo(self, tmp_path):
+        person_dir = tmp_path / "known_faces" / "Ann"
+        person_dir.mkdir(parents=True)
+        photo = person_dir / "photo.jpg"
+        photo.write_bytes(b"first photo")
+        return photo
+
+    def test_checksum_hit_skips_embedding(self, analyzer, photo):
+        first = analyzer()
+        first._load_from_filesystem()
+        assert first.embedded == [str(photo)]
+
+        second = analyzer()
+        second._load_from_filesystem()
+        assert second.embedded == []
+        assert second.known_persons["Ann"]["checksum"] == file_checksum(str(photo))
+        assert second.gallery.ids == ["Ann"]
+
+    def test_changed_photo_is_embedded_again(self, analyzer, photo):
+        analyzer()._load_from_filesystem()
+        photo.write_bytes(b"a different photo")
+
+        reloaded = analyzer()
+        reloaded._load_from_filesystem()
+        assert reloaded.embedded == [str(photo)]
+        # Only the current photo's embedding is kept
+        assert len(reloaded.embedding_store) == 1
+
+    async def test_sync_without_backend_checksum_is_stable(self, analyzer, monkeypatch):
+        # Persons enrolled before the backend stored photo checksums
+        persons = [
+            {"id": 1, "name": "Ann", "type": "EMPLOYEE", "photo_path": "/uploads/ann.jpg", "photo_checksum": None},
+            {"id": 2, "name": "Bob", "type": "EMPLOYEE", "photo_path": "/uploads/bob.jpg", "photo_checksum": None},
+        ]
+
+        def backend(request):
+            if request.url.path == "/api/v1/persons":
+                return httpx.Response(200, json=persons)
+            return httpx.Response(200, content=request.url.path.encode())
+
+        synced = analyzer()
+        monkeypatch.setattr(synced, "_photo_client",
+                            lambda: httpx.AsyncClient(transport=httpx.MockTransport(backend)))
+        await synced.load_known_persons()
+        assert len(synced.embedded) == 2
+
+        for _ in range(2):
+            assert await synced.sync_known_persons() == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2}
+        assert len(synced.embedded) == 2
@@ -0,0 +1,102 @@
+"""
+Tests for the on-disk event spool
+"""
+import os
+
+from services.event_spool import EventSpool
+
+
+def _events(start, count):
+    return [{"camera_id": 1, "type": "unknown_face", "seq": seq} for seq in range(start, start + count)]
+
+
+def _drain(spool, limit=1000):
+    seqs = []
+    while True:
+        events, token = spool.read_batch(limit)
+        if token is None or token[2] == 0:
+            return seqs
+        seqs.extend(event["seq"] for event in events)
+        spool.ack(token)
+
+
+class TestEventSpool:
+    """Test segment rotation, eviction and replay"""
+
+    def test_append_and_replay_in_order(self, tmp_path):
+        spool = EventSpool(path=str(tmp_path))
+        spool.append(_events(0, 5))
+        spool.append(_events(5, 5))
+
+        assert len(spool) == 10
+        assert _drain(spool, limit=3) == list(range(10))
+        assert len(spool) == 0
+        assert spool.stats()["replayed"] == 10
+
+    def test_segment_rollover(self, tmp_path):
+        spool = EventSpool(path=str(tmp_path), segment_bytes=200)
+        for start in range(0, 30, 3):
+            spool.append(_events(start, 3))
+
+        assert spool.stats()["segments"] > 1
+        assert len(os.listdir(tmp_path)) == spool.stats()["segments"]
+        assert _drain(spool) == list(range(30))
+        # Fully acknowledged segments are deleted
+        assert os.listdir(tmp_path) == []
+
+    def test_eviction_drops_oldest(self, tmp_path):
+        spool = EventSpool(path=str(tmp_path), max_bytes=1000, segment_bytes=200)
+        for start in range(0, 100, 2):
+            spool.append(_events(start, 2))
+
+        stats = spool.stats()
+        assert stats["bytes"] <= 1000
+        assert stats["evicted"] > 0
+        replayed = _drain(spool)
+        assert replayed == list(range(100 - len(replayed), 100))
+        assert stats["evicted"] + len(replayed) == 100
+
+    def test_unacked_batch_is_replayed_again(self, tmp_path):
+        spool = EventSpool(path=str(tmp_path))
+        spool.append(_events(0, 4))
+
+        events, _ = spool.read_batch(2)
+        assert [event["seq"] for event in events] == [0, 1]
+        # Not acknowledged (send failed): the same events come back
+        assert _drain(spool) == [0, 1, 2, 3]
+
+    def test_reopen_after_torn_tail(self, tmp_path):
+        spool = EventSpool(path=str(tmp_path))
+        spool.append(_events(0, 3))
+        segment = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+        # Crash mid-write: a partial line without its newline
+        with open(segment, "ab") as f:
+            f.write(b'{"camera_id": 1, "seq"')
+
+        reopened = EventSpool(path=str(tmp_path))
+        assert reopened.stats()["segments"] == 1
+        reopened.append(_events(3, 2))
+        assert _drain(reopened) == [0, 1, 2, 3, 4]
+
+    def test_reopen_skips_corrupt_line(self, tmp_path):
+        spool = EventSpool(path=str(tmp_path))
+        spool.append(_events(0, 2))
+        segment = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+        with open(segment, "ab") as f:
+            f.write(b"not json\n")
+        spool.append(_events(2, 1))
+
+        reopened = EventSpool(path=str(tmp_path))
+        assert _drain(reopened) == [0, 1, 2]
+
+    def test_ack_after_eviction_is_ignored(self, tmp_path):
+        spool = EventSpool(path=str(tmp_path), max_bytes=600, segment_bytes=200)
+        spool.append(_events(0, 2))
+        _, token = spool.read_batch(2)
+
+        for start in range(2, 60, 2):
+            spool.append(_events(start, 2))
+        spool.ack(token)
+
+        assert spool.stats()["replayed"] == 0
+        assert _drain(spool)[0] > 1
@@ -0,0 +1,66 @@
+"""
+Tests for the pre-embedding face quality gate
+"""
+import numpy as np
+import pytest
+
+from analyzers.face_quality import FaceQualityGate
+
+BOX = [0, 0, 112, 112]
+CENTERED_EYES = {"left_eye": (36, 45), "right_eye": (76, 45)}
+
+
+def _noise(low, high, seed=0, shape=(112, 112, 3)):
+    return np.random.default_rng(seed).integers(low, high, size=shape).astype(np.uint8)
+
+
+@pytest.fixture
+def gate():
+    return FaceQualityGate(min_size=40, min_sharpness=30, min_brightness=40, max_brightness=220, max_pose=0.4)
+
+
+class TestQualityGate:
+    """Test each rejection reason and the pass path"""
+
+    def test_good_face_passes(self, gate):
+        assert gate.check(_noise(60, 200), BOX, CENTERED_EYES) is None
+
+    def test_float_crop_is_rescaled(self, gate):
+        crop = _noise(60, 200).astype(np.float32) / 255.0
+        assert gate.check(crop, BOX, CENTERED_EYES) is None
+
+    def test_too_small(self, gate):
+        assert gate.check(_noise(60, 200), [0, 0, 30, 112], CENTERED_EYES) == "too_small"
+
+    def test_blurry(self, gate):
+        assert gate.check(np.full((112, 112, 3), 128, dtype=np.uint8), BOX, CENTERED_EYES) == "blurry"
+
+    def test_too_dark(self, gate):
+        assert gate.check(_noise(0, 40), BOX, CENTERED_EYES) == "too_dark"
+
+    def test_too_bright(self, gate):
+        assert gate.check(_noise(215, 256), BOX, CENTERED_EYES) == "too_bright"
+
+    def test_pose_from_landmarks(self, gate):
+        # Both eyes pushed to one side of the box: turned head
+        profile_eyes = {"left_eye": (70, 45), "right_eye": (100, 45)}
+        assert gate.check(_noise(60, 200), BOX, profile_eyes) == "pose"
+
+    def test_pose_from_symmetry(self, gate):
+        crop = _noise(60, 200)
+        symmetric = np.concatenate([crop[:, :56], crop[:, :56][:, ::-1]], axis=1)
+        # One side lit, the other in shadow, as in a profile view
+        lopsided = np.concatenate([_noise(150, 210, shape=(112, 56, 3)), _noise(40, 70, shape=(112, 56, 3))], axis=1)
+
+        assert gate.check(symmetric, BOX) is None
+        assert gate.check(lopsided, BOX) == "pose"
+
+    def test_first_failing_reason_wins(self, gate):
+        # Small and blurry: size is checked first
+        assert gate.check(np.full((112, 112, 3), 128, dtype=np.uint8), [0, 0, 20, 20]) == "too_small"
+
+    def test_stats_count_reasons(self, gate):
+        gate.check(_noise(60, 200), BOX, CENTERED_EYES)
+        gate.check(_noise(0, 40), BOX, CENTERED_EYES)
+        gate.check(_noise(0, 40), BOX, CENTERED_EYES)
+        assert gate.stats() == {"passed": 1, "rejected": 2, "reasons": {"too_dark": 2}}
@@ -0,0 +1,122 @@
+"""
+Tests for the per-camera face tracker
+"""
+import pytest
+
+from analyzers.face_tracker import FaceTracker
+
+
+@pytest.fixture
+def tracker():
+    return FaceTracker(iou_threshold=0.3, max_misses=2, reembed_interval=3, min_confidence=0.407)
+
+
+class TestAssociation:
+    """Test matching detections to tracks"""
+
+    def test_overlapping_box_continues_track(self, tracker):
+        [first] = tracker.update(1, [[100, 100, 50, 50]])
+        [second] = tracker.update(1, [[105, 102, 50, 50]])
+        assert second is first
+        assert second.hits == 2
+
+    def test_distant_box_starts_new_track(self, tracker):
+        [first] = tracker.update(1, [[100, 100, 50, 50]])
+        [second] = tracker.update(1, [[400, 300, 50, 50]])
+        assert second is not first
+        assert tracker.stats()["active_tracks"] == 2
+
+    def test_each_detection_gets_its_best_track(self, tracker):
+        left, right = tracker.update(1, [[0, 0, 50, 50], [200, 0, 50, 50]])
+        # Same faces reported in the opposite order
+        second_right, second_left = tracker.update(1, [[205, 0, 50, 50], [5, 0, 50, 50]])
+        assert (second_left, second_right) == (left, right)
+
+    def test_velocity_follows_fast_motion(self, tracker):
+        # After the first step the face moves 30px per frame; consecutive boxes
+        # overlap with IoU 0.25, below the threshold, but the constant-velocity
+        # prediction stays close enough to keep the track
+        [track] = tracker.update(1, [[0, 0, 50, 50]])
+        for x in (20, 50, 80, 110, 140):
+            [next_track] = tracker.update(1, [[x, 0, 50, 50]])
+            assert next_track is track
+        assert track.velocity[0] > 20
+
+    def test_without_motion_history_fast_step_is_new_track(self, tracker):
+        [track] = tracker.update(1, [[0, 0, 50, 50]])
+        [next_track] = tracker.update(1, [[30, 0, 50, 50]])
+        assert next_track is not track
+
+    def test_cameras_are_independent(self, tracker):
+        [first] = tracker.update(1, [[100, 100, 50, 50]])
+        [other] = tracker.update(2, [[100, 100, 50, 50]])
+        assert other is not first
+
+
+class TestExpiry:
+    """Test dropping tracks that stop being detected"""
+
+    def test_track_survives_short_gap(self, tracker):
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        tracker.update(1, [])
+        tracker.update(1, [])
+        [again] = tracker.update(1, [[100, 100, 50, 50]])
+        assert again is track
+
+    def test_track_expires_after_max_misses(self, tracker):
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        for _ in range(3):
+            tracker.update(1, [])
+        assert tracker.stats()["active_tracks"] == 0
+        [again] = tracker.update(1, [[100, 100, 50, 50]])
+        assert again is not track
+
+    def test_reset_drops_tracks(self, tracker):
+        tracker.update(1, [[100, 100, 50, 50]])
+        tracker.update(2, [[100, 100, 50, 50]])
+        tracker.reset(1)
+        assert tracker.stats()["cameras"] == 1
+        tracker.reset()
+        assert tracker.stats()["active_tracks"] == 0
+
+
+class TestEmbeddingSkip:
+    """Test when a track's identity is reused instead of re-embedded"""
+
+    def test_new_track_needs_embedding(self, tracker):
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        assert tracker.needs_embedding(track)
+
+    def test_confident_track_is_reused_until_interval(self, tracker):
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        tracker.assign(track, ("ann", 0.5))
+
+        for _ in range(2):
+            [track] = tracker.update(1, [[100, 100, 50, 50]])
+            assert not tracker.needs_embedding(track)
+            assert tracker.reuse(track) == ("ann", 0.5)
+
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        assert tracker.needs_embedding(track)
+        assert tracker.stats()["embeddings_run"] == 1
+        assert tracker.stats()["embeddings_skipped"] == 2
+
+    def test_match_just_inside_cutoff_is_reused(self, tracker):
+        # Distance 0.59 is accepted by SFace's 0.593 cutoff
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        tracker.assign(track, ("ann", 0.59))
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        assert not tracker.needs_embedding(track)
+
+    def test_weak_match_is_reembedded(self):
+        strict = FaceTracker(min_confidence=0.8)
+        [track] = strict.update(1, [[100, 100, 50, 50]])
+        strict.assign(track, ("ann", 0.3))
+        [track] = strict.update(1, [[100, 100, 50, 50]])
+        assert strict.needs_embedding(track)
+
+    def test_unknown_track_is_reused(self, tracker):
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        tracker.assign(track, None)
+        [track] = tracker.update(1, [[100, 100, 50, 50]])
+        assert not tracker.needs_embedding(track)
@@ -0,0 +1,83 @@
+"""
+Tests for the bounded inference pool
+"""
+import asyncio
+import threading
+
+import pytest
+
+from services.inference_pool import InferencePool, PoolSaturatedError
+
+
+async def _settle():
+    # Releases are scheduled onto the loop from the worker thread
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+class TestInferencePool:
+    """Test admission and in-flight accounting"""
+
+    async def test_runs_on_worker_thread(self):
+        pool = InferencePool(workers=1, max_queue=0)
+        try:
+            name = await pool.run(lambda: threading.current_thread().name)
+            assert name.startswith("inference")
+            await _settle()
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
+
+    async def test_rejects_when_saturated(self):
+        pool = InferencePool(workers=1, max_queue=1)
+        release = threading.Event()
+        try:
+            jobs = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0)
+            assert pool.saturated
+            assert pool.queue_depth == 1
+
+            with pytest.raises(PoolSaturatedError):
+                await pool.run(lambda: None)
+            assert pool.stats()["rejected"] == 1
+
+            release.set()
+            await asyncio.gather(*jobs)
+            await _settle()
+            assert pool.in_flight == 0
+            assert await pool.run(lambda: "accepted") == "accepted"
+        finally:
+            release.set()
+            pool.shutdown()
+
+    async def test_releases_on_exception(self):
+        pool = InferencePool(workers=1, max_queue=0)
+
+        def fail():
+            raise ValueError("model error")
+
+        try:
+            with pytest.raises(ValueError):
+                await pool.run(fail)
+            await _settle()
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
+
+    async def test_cancelled_job_counts_until_it_finishes(self):
+        pool = InferencePool(workers=1, max_queue=0)
+        release = threading.Event()
+        try:
+            job = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0)
+            job.cancel()
+            await _settle()
+            # The worker thread is still busy, so the slot stays taken
+            assert pool.in_flight == 1
+
+            release.set()
+            await _settle()
+            assert pool.in_flight == 0
+        finally:
+            release.set()
+            pool.shutdown()
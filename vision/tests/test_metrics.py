@@ -0,0 +1,43 @@
+"""
+Tests for the Prometheus metrics registry
+"""
+from services.metrics import Metrics
+
+
+class TestMetrics:
+    """Test the text exposition format"""
+
+    def test_counter_has_help_and_type(self):
+        metrics = Metrics()
+        metrics.describe("vision_frames_shed_total", "Frames shed by admission control")
+        metrics.inc("vision_frames_shed_total", reason="stale", camera_id=3)
+        metrics.inc("vision_frames_shed_total", reason="stale", camera_id=3)
+
+        text = metrics.render()
+        assert "# HELP vision_frames_shed_total Frames shed by admission control" in text
+        assert "# TYPE vision_frames_shed_total counter" in text
+        assert 'vision_frames_shed_total{camera_id="3",reason="stale"} 2' in text
+
+    def test_builtin_counters_are_described(self):
+        metrics = Metrics()
+        metrics.frame(1)
+        metrics.error("decode", 1)
+
+        text = metrics.render()
+        assert "# HELP vision_frames_total Frames received" in text
+        assert "# HELP vision_errors_total" in text
+
+    def test_callback_counter_and_gauge_types(self):
+        metrics = Metrics()
+        metrics.counter("vision_inference_rejected_total", "Jobs rejected", lambda: 4)
+        metrics.gauge("vision_inference_in_flight", "Jobs in flight", lambda: 2)
+
+        lines = metrics.render().splitlines()
+        assert lines[lines.index("# TYPE vision_inference_rejected_total counter") + 1] == "vision_inference_rejected_total 4"
+        assert lines[lines.index("# TYPE vision_inference_in_flight gauge") + 1] == "vision_inference_in_flight 2"
+        assert "# HELP vision_inference_rejected_total Jobs rejected" in lines
+
+    def test_failing_callback_is_skipped(self):
+        metrics = Metrics()
+        metrics.gauge("vision_broken", "Raises", lambda: 1 / 0)
+        assert "vision_broken" not in metrics.render()
@@ -0,0 +1,87 @@
+"""
+Tests for the per-camera motion gate
+"""
+import numpy as np
+import pytest
+
+import analyzers.motion_gate as motion_gate
+from analyzers.motion_gate import MotionGate
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(motion_gate.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def gate(clock):
+    return MotionGate(pixel_threshold=25, min_changed_fraction=0.01, downscale_width=160, max_skip_seconds=10)
+
+
+def _frame(value=100, patch=None):
+    frame = np.full((240, 320, 3), value, dtype=np.uint8)
+    if patch is not None:
+        (y0, y1, x0, x1), patch_value = patch
+        frame[y0:y1, x0:x1] = patch_value
+    return frame
+
+
+class TestMotionGate:
+    """Test motion detection and the periodic re-check"""
+
+    def test_first_frame_is_analyzed(self, gate):
+        assert gate.should_analyze(1, _frame())
+
+    def test_static_frame_is_skipped(self, gate):
+        gate.should_analyze(1, _frame())
+        assert not gate.should_analyze(1, _frame())
+        assert gate.stats()["cameras"]["1"] == {"analyzed": 1, "skipped": 1}
+
+    def test_moving_object_is_analyzed(self, gate):
+        gate.should_analyze(1, _frame())
+        # A bright 60x60 block covers ~5% of the frame
+        assert gate.should_analyze(1, _frame(patch=((90, 150, 130, 190), 255)))
+
+    def test_change_below_pixel_threshold_is_ignored(self, gate):
+        gate.should_analyze(1, _frame(100))
+        # Sensor noise / slow lighting drift: every pixel changes, but only slightly
+        assert not gate.should_analyze(1, _frame(110))
+
+    def test_change_below_min_fraction_is_ignored(self, gate):
+        gate.should_analyze(1, _frame())
+        # A 10x10 block is ~0.1% of the frame
+        assert not gate.should_analyze(1, _frame(patch=((100, 110, 100, 110), 255)))
+
+    def test_keyframe_after_max_skip(self, gate, clock):
+        gate.should_analyze(1, _frame())
+        clock.now += 9.9
+        assert not gate.should_analyze(1, _frame())
+        clock.now += 0.1
+        assert gate.should_analyze(1, _frame())
+        # The re-check restarts the interval
+        clock.now += 1
+        assert not gate.should_analyze(1, _frame())
+
+    def test_cameras_have_separate_backgrounds(self, gate):
+        gate.should_analyze(1, _frame(100))
+        assert gate.should_analyze(2, _frame(100))
+        assert not gate.should_analyze(1, _frame(100))
+
+    def test_resolution_change_resets_background(self, gate):
+        gate.should_analyze(1, _frame())
+        assert gate.should_analyze(1, np.full((480, 640, 3), 100, dtype=np.uint8)[:, :200])
+
+    def test_reset_forgets_background(self, gate):
+        gate.should_analyze(1, _frame())
+        gate.reset(1)
+        assert gate.should_analyze(1, _frame())
@@ -0,0 +1,102 @@
+"""
+Tests for presence deduplication of detection events
+"""
+import pytest
+
+from services.presence import PresenceFilter
+
+
+def _person(person_id, name="Ann"):
+    return {"type": "person_detected", "person_id": person_id, "person_name": name, "confidence": 0.8}
+
+
+def _unknown(track_id):
+    return {"type": "unknown_face", "person_name": "Unknown", "track_id": track_id}
+
+
+def _presence(events):
+    return [(camera_id, detection["presence"]) for camera_id, detection in events]
+
+
+@pytest.fixture
+def presence():
+    return PresenceFilter(cooldown=60, absence_timeout=10)
+
+
+class TestTransitions:
+    """Test appeared / present / left transitions"""
+
+    def test_enter_then_suppressed(self, presence):
+        assert _presence(presence.update(1, [_person(7)], now=0)) == [(1, "appeared")]
+        assert presence.update(1, [_person(7)], now=1) == []
+        assert presence.stats()["suppressed"] == 1
+
+    def test_reminder_after_cooldown(self, presence):
+        presence.update(1, [_person(7)], now=0)
+        for now in range(5, 60, 5):
+            assert presence.update(1, [_person(7)], now=now) == []
+        [(_, event)] = presence.update(1, [_person(7)], now=60)
+        assert (event["presence"], event["duration"]) == ("present", 60.0)
+
+    def test_leave_after_timeout(self, presence):
+        presence.update(1, [_person(7)], now=0)
+        presence.update(1, [_person(7)], now=4)
+        assert presence.update(1, [], now=13) == []
+        [(camera_id, event)] = presence.update(1, [], now=14)
+        assert (camera_id, event["type"], event["presence"], event["duration"]) == (1, "person_left", "left", 4.0)
+
+    def test_short_gap_does_not_leave(self, presence):
+        # Hysteresis: a few missed frames are not an exit and re-entry
+        presence.update(1, [_person(7)], now=0)
+        presence.update(1, [], now=9)
+        assert presence.update(1, [_person(7)], now=9.5) == []
+
+    def test_reentry_after_leaving(self, presence):
+        presence.update(1, [_person(7)], now=0)
+        presence.update(1, [], now=20)
+        assert _presence(presence.update(1, [_person(7)], now=21)) == [(1, "appeared")]
+
+    def test_touch_keeps_identity_present(self, presence):
+        presence.update(1, [_person(7)], now=0)
+        # Static frames skipped by the motion gate still count as seen
+        presence.touch(1, now=8)
+        assert presence.update(1, [], now=15) == []
+
+
+class TestIdentity:
+    """Test how detections are told apart"""
+
+    def test_namesakes_are_separate(self, presence):
+        events = presence.update(1, [_person(7, "Alex Kim"), _person(8, "Alex Kim")], now=0)
+        assert _presence(events) == [(1, "appeared"), (1, "appeared")]
+
+        presence.update(1, [_person(7, "Alex Kim")], now=8)
+        [(_, left)] = presence.update(1, [_person(7, "Alex Kim")], now=12)
+        assert left["person_id"] == 8
+
+    def test_unknowns_by_track(self, presence):
+        events = presence.update(1, [_unknown(1), _unknown(2)], now=0)
+        assert len(events) == 2
+        assert presence.update(1, [_unknown(1), _unknown(2)], now=1) == []
+
+    def test_cameras_are_separate(self, presence):
+        presence.update(1, [_person(7)], now=0)
+        assert _presence(presence.update(2, [_person(7)], now=1)) == [(2, "appeared")]
+
+
+class TestExpiry:
+    """Test "left" events without new frames"""
+
+    def test_expire_without_updates(self, presence):
+        presence.update(1, [_person(7)], now=0)
+        presence.update(2, [_person(8)], now=5)
+        assert presence.expire(now=9) == []
+        assert _presence(presence.expire(now=10)) == [(1, "left")]
+        assert _presence(presence.expire(now=15)) == [(2, "left")]
+        assert presence.stats()["present"] == 0
+
+    def test_left_is_reported_once(self, presence):
+        presence.update(1, [_person(7)], now=0)
+        assert len(presence.expire(now=10)) == 1
+        assert presence.expire(now=11) == []
+        assert presence.update(1, [], now=12) == []
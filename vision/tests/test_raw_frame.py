@@ -0,0 +1,101 @@
+"""
+Tests for the raw frame ingest format
+"""
+import numpy as np
+import pytest
+
+from services.raw_frame import (
+    FORMAT_BGR, FORMAT_I420, FORMAT_NV12, HEADER, MAGIC, VERSION,
+    RawFrameError, decode_raw_frame, encode_raw_frame,
+)
+
+
+def _frame(height=48, width=64, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+def _header(pixel_format=FORMAT_BGR, width=64, height=48, magic=MAGIC, version=VERSION):
+    return HEADER.pack(magic, version, pixel_format, width, height, 7, 1700000000.5)
+
+
+class TestRoundTrip:
+    """Test encoding and decoding valid frames"""
+
+    def test_bgr_round_trip(self):
+        frame = _frame()
+        header, decoded = decode_raw_frame(encode_raw_frame(frame, camera_id=7, timestamp=1700000000.5))
+
+        assert (header.width, header.height, header.camera_id) == (64, 48, 7)
+        assert header.pixel_format == FORMAT_BGR
+        assert header.timestamp == 1700000000.5
+        assert np.array_equal(decoded, frame)
+
+    def test_i420_round_trip_is_close(self):
+        frame = np.full((48, 64, 3), (40, 120, 200), dtype=np.uint8)
+        header, decoded = decode_raw_frame(encode_raw_frame(frame, 1, 0.0, pixel_format=FORMAT_I420))
+
+        assert header.pixel_format == FORMAT_I420
+        assert decoded.shape == frame.shape
+        assert np.abs(decoded.astype(int) - frame.astype(int)).max() <= 4
+
+    def test_nv12_decodes(self):
+        body = _header(FORMAT_NV12) + np.full(64 * 48 * 3 // 2, 128, dtype=np.uint8).tobytes()
+        _, decoded = decode_raw_frame(body)
+        assert decoded.shape == (48, 64, 3)
+
+    def test_strided_view_is_packed(self):
+        # A crop of a larger frame has row strides wider than its width
+        frame = _frame(96, 128)[10:58, 20:84]
+        assert not frame.flags["C_CONTIGUOUS"]
+        _, decoded = decode_raw_frame(encode_raw_frame(frame, 1, 0.0))
+        assert np.array_equal(decoded, frame)
+
+
+class TestValidation:
+    """Test rejection of malformed payloads"""
+
+    def test_short_payload(self):
+        with pytest.raises(RawFrameError):
+            decode_raw_frame(b"SSRF")
+
+    def test_bad_magic(self):
+        with pytest.raises(RawFrameError, match="magic"):
+            decode_raw_frame(_header(magic=b"JPEG") + bytes(64 * 48 * 3))
+
+    def test_unsupported_version(self):
+        with pytest.raises(RawFrameError, match="version"):
+            decode_raw_frame(_header(version=VERSION + 1) + bytes(64 * 48 * 3))
+
+    def test_unknown_pixel_format(self):
+        with pytest.raises(RawFrameError, match="pixel format"):
+            decode_raw_frame(_header(pixel_format=9) + bytes(64 * 48 * 3))
+
+    def test_zero_size(self):
+        with pytest.raises(RawFrameError):
+            decode_raw_frame(_header(width=0))
+
+    @pytest.mark.parametrize("extra", [-1, 1])
+    def test_length_mismatch(self, extra):
+        with pytest.raises(RawFrameError, match="payload bytes"):
+            decode_raw_frame(_header() + bytes(64 * 48 * 3 + extra))
+
+    def test_stride_mismatch(self):
+        # Rows padded to a wider stride than the header's width
+        padded = np.zeros((48, 72, 3), dtype=np.uint8)
+        with pytest.raises(RawFrameError, match="payload bytes"):
+            decode_raw_frame(_header(width=64) + padded.tobytes())
+
+    def test_channel_mismatch_on_decode(self):
+        # BGRA pixels sent under a BGR header
+        with pytest.raises(RawFrameError, match="payload bytes"):
+            decode_raw_frame(_header() + bytes(64 * 48 * 4))
+
+    @pytest.mark.parametrize("shape", [(48, 64), (48, 64, 4), (48, 64, 1)])
+    def test_channel_mismatch_on_encode(self, shape):
+        with pytest.raises(RawFrameError, match="3-channel"):
+            encode_raw_frame(np.zeros(shape, dtype=np.uint8), 1, 0.0)
+
+    def test_odd_size_yuv(self):
+        body = _header(FORMAT_I420, width=63) + bytes(63 * 48 * 3 // 2)
+        with pytest.raises(RawFrameError, match="even"):
+            decode_raw_frame(body)
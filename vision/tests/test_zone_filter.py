@@ -0,0 +1,110 @@
+"""
+Tests for the per-camera zone filter
+"""
+import httpx
+import numpy as np
+import pytest
+
+import analyzers.zone_filter as zone_filter
+from analyzers.zone_filter import ZoneFilter
+
+SHAPE = (200, 400, 3)
+
+
+@pytest.fixture
+def zones():
+    return ZoneFilter(backend_url="http://backend", refresh_seconds=60)
+
+
+class TestPolygons:
+    """Test polygon inclusion and cropping"""
+
+    def test_camera_without_zones_is_unfiltered(self, zones):
+        frame = np.ones(SHAPE, dtype=np.uint8)
+        region, offset = zones.crop(1, frame)
+        assert region is frame and offset == (0, 0)
+        assert zones.contains(1, [0, 0, 10, 10], SHAPE)
+
+    def test_pixel_polygon(self, zones):
+        zones.set_zones(1, [[[100, 50], [300, 50], [300, 150], [100, 150]]])
+        assert zones.contains(1, [180, 80, 40, 40], SHAPE)
+        assert not zones.contains(1, [10, 10, 20, 20], SHAPE)
+
+    def test_fractional_polygon_scales_with_frame(self, zones):
+        zones.set_zones(1, [[[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]]])
+        assert zones.contains(1, [300, 100, 10, 10], SHAPE)
+        assert not zones.contains(1, [50, 100, 10, 10], SHAPE)
+        # Same zone on a frame of another size
+        assert zones.contains(1, [600, 300, 10, 10], (480, 800, 3))
+
+    def test_box_is_judged_by_its_center(self, zones):
+        zones.set_zones(1, [[[100, 50], [300, 50], [300, 150], [100, 150]]])
+        # Mostly outside, but centered just inside the zone
+        assert zones.contains(1, [60, 60, 90, 20], SHAPE)
+
+    def test_crop_returns_masked_bounding_rect(self, zones):
+        zones.set_zones(1, [[[100, 50], [300, 50], [100, 150]]])
+        frame = np.full(SHAPE, 255, dtype=np.uint8)
+        region, (x, y) = zones.crop(1, frame)
+
+        assert (x, y) == (100, 50)
+        assert region.shape[:2] == (101, 201)
+        # Top-left corner is inside the triangle, bottom-right is blacked out
+        assert region[2, 2].all()
+        assert not region[-2, -2].any()
+
+    def test_degenerate_polygons_are_ignored(self, zones):
+        zones.set_zones(1, [[[0, 0], [10, 10]]])
+        assert zones.contains(1, [300, 150, 10, 10], SHAPE)
+
+    def test_set_zones_replaces_cached_mask(self, zones):
+        zones.set_zones(1, [[[0, 0], [100, 0], [100, 100], [0, 100]]])
+        assert zones.contains(1, [40, 40, 10, 10], SHAPE)
+        zones.set_zones(1, [[[200, 0], [400, 0], [400, 200], [200, 200]]])
+        assert not zones.contains(1, [40, 40, 10, 10], SHAPE)
+
+
+class TestRefresh:
+    """Test fetching zones from the backend"""
+
+    @pytest.fixture
+    def backend(self):
+        requests = []
+        polygons = {"value": [{"polygon": [[0, 0], [100, 0], [100, 100], [0, 100]]}]}
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=polygons["value"])
+
+        return requests, polygons, httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def test_refresh_fetches_active_zones(self, zones, backend):
+        requests, _, zones.client = backend
+        await zones.refresh(3)
+
+        assert requests[0].url.params["camera_id"] == "3"
+        assert requests[0].url.params["active"] == "true"
+        assert zones.contains(3, [40, 40, 10, 10], SHAPE)
+        assert not zones.contains(3, [300, 150, 10, 10], SHAPE)
+
+    async def test_refresh_is_rate_limited(self, zones, backend, monkeypatch):
+        requests, polygons, zones.client = backend
+        now = {"value": 1000.0}
+        monkeypatch.setattr(zone_filter.time, "monotonic", lambda: now["value"])
+
+        await zones.refresh(3)
+        await zones.refresh(3)
+        assert len(requests) == 1
+
+        # Zones deleted in the backend are dropped on the next refresh
+        polygons["value"] = []
+        now["value"] += 60
+        await zones.refresh(3)
+        assert len(requests) == 2
+        assert zones.contains(3, [300, 150, 10, 10], SHAPE)
+
+    async def test_failed_refresh_keeps_zones(self, zones):
+        zones.set_zones(3, [[[0, 0], [100, 0], [100, 100], [0, 100]]])
+        zones.client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+        await zones.refresh(3)
+        assert not zones.contains(3, [300, 150, 10, 10], SHAPE)